@@ -0,0 +1,62 @@
+"""墙钟时间预算
+
+包含:
+TimeBudget: run_scheduler(time_limit=...) 的截止时间; 以指数滑动平均估计每代耗时,
+            下一代预计会超出截止时间时提前停止 (anytime: 始终返回当前最优)。
+"""
+from __future__ import annotations
+
+import time
+
+__all__ = ['TimeBudget']
+
+# 每代耗时滑动平均系数 / 预估留出的余量倍数
+_EMA_ALPHA = 0.3
+_SAFETY = 1.2
+
+
+class TimeBudget:
+    def __init__(self, time_limit: float | None, start: float | None = None):
+        self.start = time.perf_counter() if start is None else start
+        self.deadline = None if not time_limit or time_limit <= 0 else self.start + time_limit
+        self.per_gen: float | None = None
+        self._mark = time.perf_counter()
+
+    @property
+    def limited(self) -> bool:
+        return self.deadline is not None
+
+    def remaining(self) -> float:
+        if self.deadline is None:
+            return float('inf')
+        return self.deadline - time.perf_counter()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def mark(self):
+        """从此刻开始计时下一段 (例如一代或一个迁移纪元)。"""
+        self._mark = time.perf_counter()
+
+    def record(self, gens: int = 1):
+        """记录自 mark 以来完成的 gens 代, 更新每代耗时估计并重新 mark。"""
+        now = time.perf_counter()
+        if gens > 0:
+            cost = (now - self._mark) / gens
+            self.per_gen = cost if self.per_gen is None else _EMA_ALPHA * cost + (1 - _EMA_ALPHA) * self.per_gen
+        self._mark = now
+
+    def gens_left(self) -> int | None:
+        """预算内还能完成的代数估计; 无限制时为 None。"""
+        if self.deadline is None:
+            return None
+        rem = self.remaining()
+        if rem <= 0:
+            return 0
+        if not self.per_gen:
+            return 1
+        return int(rem / (self.per_gen * _SAFETY))
+
+    def allows_next(self) -> bool:
+        left = self.gens_left()
+        return left is None or left >= 1
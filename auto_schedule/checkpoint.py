@@ -0,0 +1,89 @@
+"""GA 断点续跑
+
+包含:
+1. GACheckpoint: 某一代开始时的完整进化状态 (种群基因+适配度 / 随机数状态 / 历史最优 / 代数 / CONFIG 快照)
+2. save_checkpoint / load_checkpoint: gzip 压缩的 pickle 文件, 临时文件写完后原子替换
+
+续跑时还原随机数状态 (data.CLASS_SLOT_CACHE 在运行中只读, 无需保存),
+因此从断点继续与不中断运行逐位一致。源 Excel 内容哈希不一致时拒绝续跑。
+"""
+from __future__ import annotations
+
+import gzip
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .data_cache import file_fingerprint
+
+__all__ = [
+    'CHECKPOINT_VERSION',
+    'GACheckpoint',
+    'save_checkpoint',
+    'load_checkpoint',
+    'data_digest',
+]
+
+CHECKPOINT_VERSION = 1
+
+
+@dataclass
+class GACheckpoint:
+    generation: int
+    population: List[Tuple[list, Optional[tuple]]]
+    rng_state: Any
+    best: Optional[Tuple[list, tuple]]
+    best_fit: float
+    initial_fit: Optional[float]
+    no_improve: int
+    config: Dict[str, Any]
+    data_sha256: Optional[str] = None
+    ls_stats: Any = None
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    def check_data(self, data):
+        """源 Excel 内容与断点不一致时抛出 ValueError。"""
+        if not self.data_sha256:
+            return
+        digest = data_digest(data)
+        if digest and digest != self.data_sha256:
+            raise ValueError('断点对应的排课数据与当前 Excel 内容不一致, 无法续跑')
+
+
+def data_digest(data) -> Optional[str]:
+    path = getattr(data, 'excel_file_path', None)
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return file_fingerprint(path)[0]
+    except Exception:
+        return None
+
+
+def save_checkpoint(path: str, ckpt: GACheckpoint) -> str:
+    d = os.path.dirname(os.path.abspath(path))
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=d, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6) as f:
+            pickle.dump({'version': CHECKPOINT_VERSION, 'checkpoint': ckpt}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return path
+
+
+def load_checkpoint(path: str, data=None) -> GACheckpoint:
+    """读取断点; 传入 data 时校验源 Excel 内容哈希。不兼容时抛出 ValueError。"""
+    with gzip.open(path, 'rb') as f:
+        payload = pickle.load(f)
+    if payload.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"断点版本不兼容: {payload.get('version')} (当前 {CHECKPOINT_VERSION})")
+    ckpt: GACheckpoint = payload['checkpoint']
+    if data is not None:
+        ckpt.check_data(data)
+    return ckpt
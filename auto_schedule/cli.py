@@ -3,12 +3,25 @@
 示例:
   python -m auto_schedule.cli --pop 60 --gen 150 --out 结果.xlsx
   python -m auto_schedule.cli --sweep_scales 5,10,20
+  python -m auto_schedule.cli --pop 200 --gen 500 --workers 8
+  python -m auto_schedule.cli --pop 60 --gen 1000 --islands 16 --migration_interval 20
+  python -m auto_schedule.cli --pop 200 --seeding parallel --seed_order constrained
+  python -m auto_schedule.cli --local_search tabu --ls_top_k 3 --ls_final_steps 20000
+  python -m auto_schedule.cli --gen 2000 --checkpoint run.ckpt
+  python -m auto_schedule.cli --gen 3000 --resume run.ckpt
+  python -m auto_schedule.cli --gen 100000 --time_limit 60
+  python -m auto_schedule.cli --telemetry run.jsonl
+  python -m auto_schedule.cli --gen 50 --profile prof/run
+  python -m auto_schedule.cli --fitness_cache_mb 256
+  python -m auto_schedule.cli --partition ga --workers 8
 """
 from __future__ import annotations
 
 import argparse
+import contextlib
 from .config import CONFIG
 from .ga_engine import run_scheduler
+from .profiling import Profiler
 
 
 def build_parser():
@@ -24,6 +37,27 @@ def build_parser():
     p.add_argument('--sweep_scales', type=str, help='逗号分隔多个scale进行快速扫描')
     p.add_argument('--teacher_balance_weight', type=float, help='教师负载均衡罚分系数')
     p.add_argument('--early_stop', type=int, help='早停耐心代数')
+    p.add_argument('--eval_backend', choices=['incremental', 'numpy', 'full'], help='适配度评估后端(默认 incremental 增量评估)')
+    p.add_argument('--workers', type=int, default=None, help='并行评估进程数(默认单进程)')
+    p.add_argument('--islands', type=int, default=None, help='岛屿模型子种群数(每岛一个进程, --pop 为每岛种群大小)')
+    p.add_argument('--migration_interval', type=int, default=None, help='岛间迁移间隔代数')
+    p.add_argument('--migrants', type=int, default=None, help='每次迁出的最优个体数')
+    p.add_argument('--seeding', choices=['serial', 'parallel'], help='初始种群构造方式(parallel: 派生种子+进程池)')
+    p.add_argument('--seed_order', choices=['random', 'constrained'], help='基因构造顺序(constrained: 最受限优先)')
+    p.add_argument('--crossover', choices=['class', 'course', 'two_point'], help='交叉算子(默认 class: 按班级整体课表交换)')
+    p.add_argument('--local_search', choices=['none', 'hill', 'tabu'], help='精英个体局部搜索策略(默认 none 关闭)')
+    p.add_argument('--ls_top_k', type=int, help='每代做局部搜索的最优个体数')
+    p.add_argument('--ls_steps', type=int, help='每个精英个体每代的局部搜索步数')
+    p.add_argument('--ls_final_steps', type=int, help='对最终最优个体的局部搜索步数(0 关闭)')
+    p.add_argument('--fitness_cache_mb', type=float, help='适配度缓存内存上限 MB(0 关闭)')
+    p.add_argument('--partition', choices=['none', 'ga', 'construct'], help='按教师连通分组独立求解(进程数取 --workers, 默认 CPU 核数)')
+    p.add_argument('--checkpoint', type=str, help='断点文件路径(每 --checkpoint_interval 代及结束时写入)')
+    p.add_argument('--checkpoint_interval', type=int, help='断点写入间隔代数')
+    p.add_argument('--resume', type=str, help='从断点文件续跑(沿用断点参数, --gen 为总代数)')
+    p.add_argument('--time_limit', type=float, default=None, help='墙钟时间预算(秒), 到期返回并导出当前最优')
+    p.add_argument('--telemetry', type=str, default=None, help='逐代遥测 JSON Lines 输出路径(追加写入)')
+    p.add_argument('--profile', type=str, default=None,
+                   help='性能剖析输出前缀: 打印分阶段汇总表, 写出 <前缀>.txt / .pstats / .collapsed(火焰图折叠栈)')
     p.add_argument('--launch_manual', action='store_true', help='完成后启动手动界面并载入结果')
     return p
 
@@ -39,12 +73,32 @@ def apply_overrides(args):
         CONFIG['TEACHER_BALANCE_WEIGHT'] = args.teacher_balance_weight
     if args.early_stop is not None:
         CONFIG['EARLY_STOP_PATIENCE'] = args.early_stop
+    if args.eval_backend is not None:
+        CONFIG['EVAL_BACKEND'] = args.eval_backend
+    if args.seeding is not None:
+        CONFIG['SEEDING'] = args.seeding
+    if args.seed_order is not None:
+        CONFIG['SEED_ORDER'] = args.seed_order
+    if args.crossover is not None:
+        CONFIG['CROSSOVER'] = args.crossover
+    if args.local_search is not None:
+        CONFIG['LOCAL_SEARCH'] = args.local_search
+    if args.ls_top_k is not None:
+        CONFIG['LS_TOP_K'] = args.ls_top_k
+    if args.ls_steps is not None:
+        CONFIG['LS_STEPS'] = args.ls_steps
+    if args.ls_final_steps is not None:
+        CONFIG['LS_FINAL_STEPS'] = args.ls_final_steps
+    if args.fitness_cache_mb is not None:
+        CONFIG['FITNESS_CACHE_MB'] = args.fitness_cache_mb
+    if args.partition is not None:
+        CONFIG['PARTITION'] = args.partition
+    if args.checkpoint_interval is not None:
+        CONFIG['CHECKPOINT_INTERVAL'] = args.checkpoint_interval
 
 
-def main(argv=None):
-    parser = build_parser()
-    args = parser.parse_args(argv)
-    apply_overrides(args)
+def _run(args):
+    """执行扫描或单次运行; 扫描模式返回 None。"""
     if args.sweep_scales:
         scales = [float(x) for x in args.sweep_scales.split(',') if x.strip()]
         orig_scale = CONFIG['PRACTICAL_EARLY_WEIGHT_SCALE']
@@ -57,8 +111,27 @@ def main(argv=None):
             sd = met['soft_details']
             print(f"scale={sc} weighted={sd.get('practical_early_weighted_penalty')} early={sd.get('practical_early_penalty')} consec={sd.get('consecutive_reward')} prereq={sd.get('prereq_violation_penalty')} hard_ok={met['hard_ok']}")
         CONFIG['PRACTICAL_EARLY_WEIGHT_SCALE'] = orig_scale
+        return None
+    _, metrics = run_scheduler(pop_size=args.pop, ngen=args.gen, excel_out=args.out, seed=args.seed, verbose=args.verbose, workers=args.workers,
+                               islands=args.islands, migration_interval=args.migration_interval, migrants=args.migrants,
+                               checkpoint=args.checkpoint, resume=args.resume, time_limit=args.time_limit,
+                               telemetry=args.telemetry)
+    return metrics
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    apply_overrides(args)
+    profiler = Profiler() if args.profile else None
+    with profiler or contextlib.nullcontext():
+        metrics = _run(args)
+    if profiler is not None:
+        print('[PROFILE]\n' + profiler.report(top=20))
+        for path in profiler.write(args.profile):
+            print(f'[INFO] 剖析结果已写入 {path}')
+    if metrics is None:
         return
-    _, metrics = run_scheduler(pop_size=args.pop, ngen=args.gen, excel_out=args.out, seed=args.seed, verbose=args.verbose)
     if not metrics['hard_ok']:
         print('[ERROR] 排课结果不符合硬性条件')
     else:
@@ -1,3 +1,7 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+
 CONFIG = {
     'HARD_PENALTY': 10000,
     'SOFT_PREREQ_PENALTY': 2000,
@@ -19,6 +23,39 @@ CONFIG = {
     'NON_THEORY_LATE_THRESHOLD': 0.75,      # 非理论课理想开始占比 (靠后)
     'TEACHER_SWITCH_PENALTY': 12,           # 下调教师切换罚分，减少其在总分中的占比
     'THEORY_TEACHER_CHANGE_HARD': 2000,     # 理论课教师不唯一时的高额罚分(软中体现, 不是硬冲突)
+    # 适配度评估后端: incremental(增量, 仅重算变化基因) / numpy(整型数组向量化) / full(每次整体重建 build_absolute)
+    'EVAL_BACKEND': 'incremental',
+    # 岛屿模型: 每隔多少代迁移一次, 每次迁出的最优个体数
+    'ISLAND_MIGRATION_INTERVAL': 10,
+    'ISLAND_MIGRANTS': 2,
+    # Excel 解析结果快照缓存(按文件内容哈希失效), 目录可用环境变量 SEAFARER_CACHE_DIR 指定
+    'DATA_CACHE': True,
+    # 初始种群构造: serial(默认, 与原随机流一致) / parallel(按派生种子在进程池中构造, 结果与进程数无关)
+    'SEEDING': 'serial',
+    # 基因构造顺序: random(随机) / constrained(最受限优先: 可选时段×教师组合数少的先排)
+    'SEED_ORDER': 'random',
+    # parallel 构造且未开启 --workers 时使用的进程数 (None 为 CPU 核数)
+    'SEED_WORKERS': None,
+    # 交叉算子: class(按班级整体课表均匀交换) / course(按 班级-课程 区段均匀交换) / two_point(原两点交叉)
+    'CROSSOVER': 'class',
+    # class / course 交叉时每个区段的交换概率
+    'CX_INDPB': 0.5,
+    # 模因局部搜索: none(关闭) / hill(首次改进爬山) / tabu(禁忌搜索); 邻域为 move / swap / teacher
+    'LOCAL_SEARCH': 'none',
+    # 每 LS_INTERVAL 代对前 LS_TOP_K 个个体各做 LS_STEPS 步; 结束后对最终最优做 LS_FINAL_STEPS 步
+    'LS_TOP_K': 2,
+    'LS_STEPS': 200,
+    'LS_INTERVAL': 1,
+    'LS_FINAL_STEPS': 5000,
+    # tabu: 禁忌期 (最近改动的基因数) 与每步采样的候选移动数
+    'LS_TABU_TENURE': 10,
+    'LS_TABU_SAMPLE': 20,
+    # 断点续跑: 指定断点文件时每隔多少代写入一次 (结束时总会再写一次)
+    'CHECKPOINT_INTERVAL': 10,
+    # 适配度记忆化: 按基因摘要缓存评估结果的 LRU 内存上限 (MB), 0 关闭
+    'FITNESS_CACHE_MB': 64,
+    # 按教师连通分组求解: none(关闭) / ga(各组独立 GA) / construct(各组构造取优); 组间无共同教师, 进程池并行
+    'PARTITION': 'none',
 }
 
 # --- 参数调优实验批次说明 ---
@@ -32,3 +69,29 @@ CONFIG = {
 #   不破坏: hard_ok True 且 missing_co_teacher 仍为 0
 # 后续若需要继续：可再试 SWITCH 10/8, BALANCE 2; 或增加同教师聚类启发(生成/修复阶段)。
 CONFIG.setdefault('SOFT_REWARD_SEQUENCE', CONFIG.get('CONSECUTIVE_REWARD', 2))
+
+
+def soft_weights() -> dict:
+    """软约束权重的唯一来源 (GA 适配度与手动排课软约束报告共用)。"""
+    return {
+        'CONSECUTIVE_REWARD': CONFIG.get('SOFT_REWARD_SEQUENCE', CONFIG.get('CONSECUTIVE_REWARD', 2)),
+        'SOFT_PREREQ_PENALTY': CONFIG['SOFT_PREREQ_PENALTY'],
+        'THEORY_EARLY_REWARD': CONFIG.get('THEORY_EARLY_REWARD', 5),
+        'NON_THEORY_LATE_THRESHOLD': CONFIG.get('NON_THEORY_LATE_THRESHOLD', 0.75),
+        'TEACHER_SWITCH_PENALTY': CONFIG.get('TEACHER_SWITCH_PENALTY', 20),
+        'THEORY_TEACHER_CHANGE_HARD': CONFIG.get('THEORY_TEACHER_CHANGE_HARD', 2000),
+        'TEACHER_BALANCE_WEIGHT': CONFIG.get('TEACHER_BALANCE_WEIGHT', 0),
+    }
+
+
+@contextmanager
+def config_scope(values: dict | None = None):
+    """在作用域内以 values 覆盖 CONFIG, 退出时整体还原 (续跑断点参数 / 分组子问题使用)。"""
+    saved = dict(CONFIG)
+    if values:
+        CONFIG.update(values)
+    try:
+        yield CONFIG
+    finally:
+        CONFIG.clear()
+        CONFIG.update(saved)
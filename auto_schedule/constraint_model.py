@@ -0,0 +1,63 @@
+"""统一约束模型 (GA 与手动排课共用)
+
+包含:
+1. soft_weights: 软约束权重 (config.soft_weights, 唯一来源为 CONFIG; 手动排课不再单独维护一套权重)
+2. compiled_model: 每个 TimetableData 只编译一次的整数化查找表 (vectorized.EncodedProblem), 缓存在 data 上
+3. encode_blocks: 绝对表示的块 (class_id, course, t1, t2, date, period, ...) -> 整型数组
+4. soft_score: 软约束 (adjust, details), constraints.soft_adjust 与 manual_soft.evaluate_soft 均基于它
+
+手动排课的数据模型可通过 auto_view() 提供 CLASSES / COURSE_DATA / TEACHER_UNAVAILABLE_SLOTS 视图后编译。
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, Tuple
+import numpy as np
+
+from .config import soft_weights
+from .vectorized import EncodedProblem, soft_adjust_np
+
+__all__ = [
+    'soft_weights',
+    'compiled_model',
+    'encode_blocks',
+    'soft_score',
+]
+
+_CACHE_ATTR = '_compiled_model'
+
+
+def compiled_model(data) -> EncodedProblem:
+    """返回 data 对应的 EncodedProblem (首次调用时编译并缓存在 data 上)。"""
+    prob = getattr(data, _CACHE_ATTR, None)
+    if prob is None or prob.data is not data:
+        prob = EncodedProblem(data)
+        setattr(data, _CACHE_ATTR, prob)
+    return prob
+
+
+def encode_blocks(blocks: Iterable[tuple], prob: EncodedProblem) -> np.ndarray:
+    """绝对表示的块 -> int64 数组 (n, 5); date 为 None 的块记为未排 (slot=-1)。
+
+    早于全局原点的日期整体平移偶数个时段, 不影响按时间排序与同日上午/下午判定。
+    """
+    rows, slots = [], []
+    origin = prob.origin_day
+    for b in blocks:
+        class_id, course, t1, t2, date, period = b[:6]
+        slots.append(None if date is None else (date.toordinal() - origin) * 2 + int(period))
+        rows.append((prob.class_code(class_id), prob.course_index[course],
+                     prob.teacher_code(t1), prob.teacher_code(t2), -1))
+    if not rows:
+        return np.zeros((0, 5), dtype=np.int64)
+    placed = [s for s in slots if s is not None]
+    shift = 0
+    if placed and min(placed) < 0:
+        shift = ((-min(placed) + 1) // 2) * 2
+    arr = np.array(rows, dtype=np.int64)
+    arr[:, 4] = [-1 if s is None else s + shift for s in slots]
+    return arr
+
+
+def soft_score(blocks: Iterable[tuple], data) -> Tuple[int, Dict[str, int]]:
+    prob = compiled_model(data)
+    return soft_adjust_np(encode_blocks(blocks, prob), prob)
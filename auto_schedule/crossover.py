@@ -0,0 +1,126 @@
+"""结构感知交叉算子
+
+包含:
+1. GeneLayout: 规范基因顺序 — 按 (班级, 课程, 块序号) 排列, 记录每个班级 / (班级, 课程) 在个体中的区段
+2. canonicalize: 将个体原地重排为规范顺序 (同一 (班级, 课程) 内按时间先后, 未排块在后)
+3. cx_class / cx_course: 按班级整体课表 / 按 (班级, 课程) 区段做均匀交叉
+4. make_crossover: 按 CONFIG['CROSSOVER'] 返回 toolbox.mate 使用的算子
+
+原 cxTwoPoint 下两个个体同一位置的基因属于不同 (班级, 课程) (构造时 positions 被打乱),
+交换后块数被破坏, 需大量修复/硬罚。规范顺序下区段对齐, 交换后每个 (班级, 课程) 的块数保持不变。
+"""
+from __future__ import annotations
+
+import random
+from typing import Dict, List, Tuple
+
+from deap import tools
+
+from .config import CONFIG
+from .data_model import TimetableData
+
+__all__ = [
+    'GeneLayout',
+    'gene_layout',
+    'canonicalize',
+    'cx_class',
+    'cx_course',
+    'cx_two_point',
+    'make_crossover',
+]
+
+_CACHE_ATTR = '_gene_layout'
+
+
+class GeneLayout:
+    def __init__(self, data: TimetableData):
+        # 规范顺序下每个位置对应的 (班级, 课程)
+        self.keys: List[Tuple[str, str]] = []
+        self.rank: Dict[Tuple[str, str], int] = {}
+        self.class_segments: List[Tuple[int, int]] = []
+        self.course_segments: List[Tuple[int, int]] = []
+        for class_id, info in data.CLASSES.items():
+            class_start = len(self.keys)
+            for course in info['courses']:
+                key = (class_id, course)
+                if key in self.rank:
+                    # 课程在班级中重复列出时块已按首次出现的区段计入
+                    continue
+                self.rank[key] = len(self.course_segments)
+                start = len(self.keys)
+                n = data.COURSE_DATA[course]['blocks'] * info['courses'].count(course)
+                self.keys.extend([key] * n)
+                if n:
+                    self.course_segments.append((start, start + n))
+            if len(self.keys) > class_start:
+                self.class_segments.append((class_start, len(self.keys)))
+
+    def aligned(self, individual) -> bool:
+        if len(individual) != len(self.keys):
+            return False
+        return all(g[0] == k[0] and g[1] == k[1] for g, k in zip(individual, self.keys))
+
+
+def gene_layout(data: TimetableData) -> GeneLayout:
+    layout = getattr(data, _CACHE_ATTR, None)
+    if layout is None:
+        layout = GeneLayout(data)
+        setattr(data, _CACHE_ATTR, layout)
+    return layout
+
+
+def canonicalize(individual, data: TimetableData):
+    """原地重排为规范顺序: (班级, 课程) 区段顺序 -> 已排块按时间先后 -> 未排块。"""
+    rank = gene_layout(data).rank
+    individual[:] = sorted(individual, key=lambda g: (
+        rank[(g[0], g[1])], g[4] is None or g[4] < 0, g[4] if g[4] is not None else 0))
+    return individual
+
+
+def _ensure_aligned(ind1, ind2, data: TimetableData) -> bool:
+    layout = gene_layout(data)
+    for ind in (ind1, ind2):
+        if not layout.aligned(ind):
+            canonicalize(ind, data)
+    return layout.aligned(ind1) and layout.aligned(ind2)
+
+
+def _swap_segments(ind1, ind2, segments, indpb):
+    for a, b in segments:
+        if random.random() < indpb:
+            ind1[a:b], ind2[a:b] = ind2[a:b], ind1[a:b]
+    return ind1, ind2
+
+
+def cx_class(ind1, ind2, data: TimetableData, indpb: float = 0.5):
+    """班级级均匀交叉: 每个班级的整体课表以 indpb 概率互换 (班内时间线保持完整)。"""
+    if not _ensure_aligned(ind1, ind2, data):
+        return cx_two_point(ind1, ind2)
+    return _swap_segments(ind1, ind2, gene_layout(data).class_segments, indpb)
+
+
+def cx_course(ind1, ind2, data: TimetableData, indpb: float = 0.5):
+    """课程级均匀交叉: 每个 (班级, 课程) 的全部块以 indpb 概率互换。"""
+    if not _ensure_aligned(ind1, ind2, data):
+        return cx_two_point(ind1, ind2)
+    return _swap_segments(ind1, ind2, gene_layout(data).course_segments, indpb)
+
+
+def cx_two_point(ind1, ind2):
+    """原两点交叉 (位置不对齐, 仅为兼容保留)。"""
+    if len(ind1) < 2 or len(ind2) < 2:
+        return ind1, ind2
+    return tools.cxTwoPoint(ind1, ind2)
+
+
+def make_crossover(data: TimetableData, kind: str | None = None):
+    """按 CONFIG['CROSSOVER'] (class / course / two_point) 返回 mate(ind1, ind2)。"""
+    kind = kind or CONFIG.get('CROSSOVER', 'class')
+    indpb = CONFIG.get('CX_INDPB', 0.5)
+    if kind == 'class':
+        return lambda a, b: cx_class(a, b, data, indpb)
+    if kind == 'course':
+        return lambda a, b: cx_course(a, b, data, indpb)
+    if kind == 'two_point':
+        return cx_two_point
+    raise ValueError(f"未知交叉算子: {kind}")
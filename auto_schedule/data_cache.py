@@ -0,0 +1,196 @@
+"""TimetableData 解析结果缓存
+
+包含:
+1. cache_dir: 缓存目录 (SEAFARER_CACHE_DIR -> ~/.cache/seafarer_paike -> 系统临时目录), 只接受当前用户私有的目录
+2. file_fingerprint: 源 Excel 的 (sha256, mtime, size)
+3. load_snapshot / save_snapshot: 以内容哈希为键的 pickle 快照 (课程/班级/教师不可用/班级不可用)
+4. UploadIndex: 上传目录索引 path -> (mtime, size, 评分), 仅对新增/变更文件重新打开打分
+
+源文件内容变化 -> 哈希变化 -> 自动失效; 快照中记录 mtime/size 供诊断。
+CACHE_VERSION 随解析逻辑变更递增, 旧快照自动作废。
+
+快照以 pickle 读取, 目录与文件必须属于当前用户且不可被组/其他用户写入 (_is_private),
+否则视为不可用 (目录) 或未命中 (文件); 新建目录权限为 0o700。
+共享的系统临时目录中若已存在他人创建的同名目录, 则不使用该目录, 缓存关闭。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import stat
+import tempfile
+from typing import Any, Dict, Optional
+
+__all__ = [
+    'CACHE_VERSION',
+    'cache_dir',
+    'file_fingerprint',
+    'load_snapshot',
+    'save_snapshot',
+    'UploadIndex',
+]
+
+CACHE_VERSION = 1
+_MAX_SNAPSHOTS = 64
+
+
+def _is_private(path: str) -> bool:
+    """path 非符号链接, 属于当前用户, 且组/其他用户不可写 (无 getuid 的平台只检查符号链接)。"""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if stat.S_ISLNK(st.st_mode):
+        return False
+    if hasattr(os, 'getuid'):
+        if st.st_uid != os.getuid() or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            return False
+    return True
+
+
+def cache_dir() -> Optional[str]:
+    candidates = []
+    env_dir = os.environ.get('SEAFARER_CACHE_DIR')
+    if env_dir:
+        candidates.append(env_dir)
+    candidates.append(os.path.join(os.path.expanduser('~'), '.cache', 'seafarer_paike'))
+    candidates.append(os.path.join(tempfile.gettempdir(), 'seafarer_paike_cache'))
+    for d in candidates:
+        try:
+            os.makedirs(d, mode=0o700, exist_ok=True)
+            if _is_private(d) and os.access(d, os.W_OK):
+                return d
+        except Exception:
+            continue
+    return None
+
+
+def file_fingerprint(path: str):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    st = os.stat(path)
+    return h.hexdigest(), st.st_mtime, st.st_size
+
+
+def _snapshot_path(d: str, digest: str) -> str:
+    return os.path.join(d, f'timetable_{digest[:40]}.pkl')
+
+
+def load_snapshot(path: str) -> Optional[Dict[str, Any]]:
+    """命中返回解析结果字典, 否则 None (任何异常都视为未命中)。"""
+    d = cache_dir()
+    if not d:
+        return None
+    try:
+        digest, _, _ = file_fingerprint(path)
+        snap = _snapshot_path(d, digest)
+        if not os.path.exists(snap) or not _is_private(snap):
+            return None
+        with open(snap, 'rb') as f:
+            payload = pickle.load(f)
+        if payload.get('version') != CACHE_VERSION or payload.get('sha256') != digest:
+            return None
+        return payload['data']
+    except Exception:
+        return None
+
+
+def save_snapshot(path: str, data: Dict[str, Any]) -> Optional[str]:
+    d = cache_dir()
+    if not d:
+        return None
+    try:
+        digest, mtime, size = file_fingerprint(path)
+        payload = {
+            'version': CACHE_VERSION,
+            'sha256': digest,
+            'source': os.path.abspath(path),
+            'mtime': mtime,
+            'size': size,
+            'data': data,
+        }
+        snap = _snapshot_path(d, digest)
+        fd, tmp = tempfile.mkstemp(dir=d, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, snap)
+        _prune(d)
+        return snap
+    except Exception:
+        return None
+
+
+def _prune(d: str):
+    """只保留最近使用的 _MAX_SNAPSHOTS 个快照。"""
+    try:
+        snaps = [os.path.join(d, f) for f in os.listdir(d) if f.startswith('timetable_') and f.endswith('.pkl')]
+        if len(snaps) <= _MAX_SNAPSHOTS:
+            return
+        snaps.sort(key=os.path.getmtime, reverse=True)
+        for f in snaps[_MAX_SNAPSHOTS:]:
+            os.remove(f)
+    except Exception:
+        pass
+
+
+class UploadIndex:
+    """上传目录 Excel 索引 (持久化为缓存目录下的 JSON)。
+
+    score(path, scorer): 若 path 的 mtime/size 与索引一致直接返回缓存评分,
+    否则调用 scorer(path) 重新打分并记录; save() 时剔除已不存在的文件。
+    多会话并发写入时以原子替换落盘, 丢失的更新下次惰性补算即可。
+    """
+    FILE_NAME = 'upload_index.json'
+
+    def __init__(self, directory: Optional[str] = None):
+        d = directory or cache_dir()
+        self.path = os.path.join(d, self.FILE_NAME) if d else None
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        if self.path and os.path.exists(self.path) and _is_private(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    raw = json.load(f)
+                if raw.get('version') == CACHE_VERSION:
+                    self.entries = raw.get('entries', {})
+            except Exception:
+                self.entries = {}
+
+    def score(self, path: str, scorer):
+        """返回 (score, mtime)。"""
+        key = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return scorer(path)
+        e = self.entries.get(key)
+        if e and e.get('mtime') == st.st_mtime and e.get('size') == st.st_size:
+            self.hits += 1
+            return e['score'], st.st_mtime
+        self.misses += 1
+        score, mtime = scorer(path)
+        self.entries[key] = {'mtime': st.st_mtime, 'size': st.st_size, 'score': score}
+        self._dirty = True
+        return score, mtime
+
+    def save(self):
+        stale = [k for k in self.entries if not os.path.exists(k)]
+        for k in stale:
+            del self.entries[k]
+        if not self.path or not (self._dirty or stale):
+            return
+        try:
+            d = os.path.dirname(self.path)
+            fd, tmp = tempfile.mkstemp(dir=d, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'entries': self.entries}, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except Exception:
+            pass
@@ -1,12 +1,110 @@
+import copy
 import datetime
 import re
+import time
 import pandas as pd
 import os
 import glob
 from .config import CONFIG
+from .data_cache import load_snapshot, save_snapshot, UploadIndex
+
+
+class WorkbookReader:
+    """一次读取工作簿全部工作表, 供各解析器及手动/自动两个数据模型共享。
+
+    惰性: 首次访问 sheets/sheet_names 时才解析 (快照缓存命中时不会触发读取)。
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._names = None
+        self._sheets = None
+        self.elapsed = 0.0
+
+    def _load(self):
+        if self._sheets is None:
+            t0 = time.perf_counter()
+            with pd.ExcelFile(self.path, engine='openpyxl') as xls:
+                self._names = list(xls.sheet_names)
+                self._sheets = pd.read_excel(xls, sheet_name=None, engine='openpyxl')
+            self.elapsed = time.perf_counter() - t0
+
+    @property
+    def loaded(self) -> bool:
+        return self._sheets is not None
+
+    @property
+    def sheet_names(self) -> list:
+        self._load()
+        return self._names
+
+    @property
+    def sheets(self) -> dict:
+        """工作表名 -> DataFrame (共享对象, 使用方如需原地修改请先 copy)。"""
+        self._load()
+        return self._sheets
+
+    def same_file(self, path: str) -> bool:
+        return os.path.abspath(self.path) == os.path.abspath(path)
+
+
+
+class SlotAxis:
+    """全局整数时段轴与不可用位图。
+
+    slot = (date.toordinal() - origin) * 2 + period, 原点取开班日期与所有不可用日期中最早的一天,
+    因此轴外的时段一定可用。班级基因的相对下标 idx 对应全局 slot = class_offset[class_id] + idx。
+    teacher_busy / class_busy: 名称 -> Python int 位图 (第 s 位为 1 表示 slot s 不可用);
+    teacher_bit: 教师 -> 位序号, 覆盖 teachers 与 teacher_unavailable 中的全部教师, 供各模块共用同一教师位空间;
+    slot_busy_teachers: slot -> 该时段不可用教师的位图 (按 teacher_bit 编号), 用于一次取出空闲教师。
+    """
+    def __init__(self, class_ranges: dict, teacher_unavailable: dict, class_unavailable: dict, teachers=()):
+        days = [d.toordinal() for start, end in class_ranges.values() for d in (start, end)]
+        for slots in list(teacher_unavailable.values()) + list(class_unavailable.values()):
+            days.extend(date.toordinal() for date, _ in slots)
+        self.origin = min(days) if days else 0
+        self.n_slots = (max(days) - self.origin + 1) * 2 if days else 0
+        self.class_offset = {cid: (start.toordinal() - self.origin) * 2 for cid, (start, _) in class_ranges.items()}
+        self.teacher_busy = {t: self._bits(slots) for t, slots in teacher_unavailable.items()}
+        self.class_busy = {cid: self._bits(slots) for cid, slots in class_unavailable.items()}
+        self.teacher_bit = {t: i for i, t in enumerate(sorted(set(teacher_unavailable) | set(teachers)))}
+        self.slot_busy_teachers = {}
+        for t, slots in teacher_unavailable.items():
+            tb = 1 << self.teacher_bit[t]
+            for date, p in slots:
+                s = self.slot(date, p)
+                self.slot_busy_teachers[s] = self.slot_busy_teachers.get(s, 0) | tb
+
+    def _bits(self, slots) -> int:
+        bits = 0
+        for date, p in slots:
+            bits |= 1 << self.slot(date, p)
+        return bits
+
+    def slot(self, date: datetime.date, period: int) -> int:
+        return (date.toordinal() - self.origin) * 2 + period
+
+    def date_period(self, s: int):
+        return datetime.date.fromordinal(self.origin + s // 2), s % 2
+
+    def teacher_free(self, teacher, s: int) -> bool:
+        return s < 0 or not (self.teacher_busy.get(teacher, 0) >> s) & 1
+
+    def class_free(self, class_id, s: int) -> bool:
+        return s < 0 or not (self.class_busy.get(class_id, 0) >> s) & 1
+
+    def free_teachers(self, s: int, candidates) -> list:
+        """candidates 中 slot s 可用的教师 (保持原顺序)。"""
+        busy = self.slot_busy_teachers.get(s, 0)
+        if not busy:
+            return list(candidates)
+        bit = self.teacher_bit
+        return [t for t in candidates if t not in bit or not (busy >> bit[t]) & 1]
+
 
 class TimetableData:
-    def __init__(self, excel_file_path='排课数据.xlsx'):
+    def __init__(self, excel_file_path='排课数据.xlsx', workbook: WorkbookReader | None = None):
+        t_start = time.perf_counter()
+        self.LOAD_TIMINGS = {}
         # 优先从可写/云端目录查找最新上传文件，其次项目根 uploaded_data，最后落回默认文件
         root_dir = os.path.dirname(os.path.dirname(__file__))
         search_dirs = []
@@ -56,16 +154,24 @@ class TimetableData:
         latest_file = None
         best_score = -9999
         best_mtime = -1
+        # 显式给出存在的绝对路径时直接使用, 不再扫描上传目录 (与 manual_core.TimetableData 一致)
+        if excel_file_path and os.path.isabs(excel_file_path) and os.path.exists(excel_file_path):
+            search_dirs = []
+        # 评分结果按 (mtime, size) 持久化索引, 只有新增/变更的文件才会被重新打开
+        index = UploadIndex() if CONFIG.get('DATA_CACHE', True) else None
+        score = index.score if index is not None else (lambda f, scorer: scorer(f))
         for d in search_dirs:
             try:
                 if d and os.path.exists(d):
                     files = glob.glob(os.path.join(d, '*.xlsx'))
                     for f in files:
-                        s, m = _score_excel(f)
+                        s, m = score(f, _score_excel)
                         if (s > best_score) or (s == best_score and m > best_mtime):
                             best_score, best_mtime, latest_file = s, m, f
             except Exception:
                 continue
+        if index is not None:
+            index.save()
         # 选择最终 Excel 路径：优先最新上传；否则将相对路径锚定到仓库根，避免云端 CWD 差异
         if latest_file:
             self.excel_file_path = latest_file
@@ -76,15 +182,63 @@ class TimetableData:
             else:
                 candidate = excel_file_path
             self.excel_file_path = candidate if os.path.exists(candidate) else os.path.join(root_dir, '排课数据.xlsx')
-        
+        self.LOAD_TIMINGS['select_source'] = time.perf_counter() - t_start
+        # 调用方已打开同一文件时复用其读取结果, 否则新建 (惰性读取)
+        if workbook is None or not workbook.same_file(self.excel_file_path):
+            workbook = WorkbookReader(self.excel_file_path)
+        self._workbook = workbook
+
+        t0 = time.perf_counter()
+        snapshot = load_snapshot(self.excel_file_path) if CONFIG.get('DATA_CACHE', True) else None
+        self.LOAD_TIMINGS['snapshot'] = time.perf_counter() - t0
+        if snapshot is not None:
+            self.COURSE_DATA = snapshot['COURSE_DATA']
+            self.CLASSES = snapshot['CLASSES']
+            self.TEACHER_UNAVAILABLE_SLOTS = snapshot['TEACHER_UNAVAILABLE_SLOTS']
+            self.CLASS_UNAVAILABLE_SLOTS = snapshot['CLASS_UNAVAILABLE_SLOTS']
+        else:
+            self._parse_workbook()
+            if CONFIG.get('DATA_CACHE', True):
+                save_snapshot(self.excel_file_path, {
+                    'COURSE_DATA': self.COURSE_DATA,
+                    'CLASSES': self.CLASSES,
+                    'TEACHER_UNAVAILABLE_SLOTS': self.TEACHER_UNAVAILABLE_SLOTS,
+                    'CLASS_UNAVAILABLE_SLOTS': self.CLASS_UNAVAILABLE_SLOTS,
+                })
+        all_teachers_from_courses = set(t for c in self.COURSE_DATA.values() for t in c['available_teachers'])
+        all_teachers_from_availability = set(self.TEACHER_UNAVAILABLE_SLOTS.keys())
+        all_teachers = all_teachers_from_courses.union(all_teachers_from_availability)
+        self.TEACHERS = {name: {} for name in all_teachers}
+        self.TIMES_PER_DAY = ['上午','下午']
+        t0 = time.perf_counter()
+        self.validate()
+        self.CLASS_SLOT_CACHE = self._precompute_class_slots()
+        # 按共同可授教师连通的班级分组: 组间没有共享教师, 可作为独立子问题求解
+        self.CLASS_COMPONENTS = self._class_components()
+        self.LOAD_TIMINGS['validate'] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        self.SLOT_AXIS = SlotAxis(
+            {cid: (info['start_date'], info['end_date']) for cid, info in self.CLASSES.items()},
+            self.TEACHER_UNAVAILABLE_SLOTS, self.CLASS_UNAVAILABLE_SLOTS, teachers=self.TEACHERS)
+        self.LOAD_TIMINGS['slot_axis'] = time.perf_counter() - t0
+        self.LOAD_TIMINGS['total'] = time.perf_counter() - t_start
+        # 解析完成后释放工作表 (避免随 data 被 pickle 到工作进程)
+        self._workbook = None
+
+    def timing_report(self) -> str:
+        """加载耗时分解, 如 'select_source=0.012s snapshot=0.001s ... total=0.150s'。"""
+        return ' '.join(f"{k}={v:.3f}s" for k, v in self.LOAD_TIMINGS.items())
+
+    def _parse_workbook(self):
+        """解析 Excel 得到 COURSE_DATA / CLASSES / 教师与班级不可用时段 (工作簿只读取一次)。"""
+        timings = self.LOAD_TIMINGS
+        t0 = time.perf_counter()
         try:
             self.COURSE_DATA = self._load_course_data()
         except ValueError as e:
             # 如果当前文件看起来是导出结果，给出更明确的指引
             try:
-                import pandas as _pd
-                with _pd.ExcelFile(self.excel_file_path, engine='openpyxl') as _xls:
-                    _names = set(_xls.sheet_names)
+                _names = set(self._workbook.sheet_names)
                 def _n(s): return str(s).strip().lower().replace(' ','')
                 ns = {_n(n) for n in _names}
                 if any(x in ns for x in {'排课明细','教师课时','课程进度'}):
@@ -92,21 +246,23 @@ class TimetableData:
             except Exception:
                 pass
             raise
+        # 首个解析器触发工作簿读取, 单独记账
+        timings['read_workbook'] = self._workbook.elapsed
+        timings['courses'] = time.perf_counter() - t0 - self._workbook.elapsed
+        t0 = time.perf_counter()
         self.CLASSES = self._load_classes_data()
+        timings['classes'] = time.perf_counter() - t0
+        t0 = time.perf_counter()
         self.TEACHER_UNAVAILABLE_SLOTS = self._load_teacher_availability()
+        timings['teacher_unavailable'] = time.perf_counter() - t0
+        t0 = time.perf_counter()
         self.CLASS_UNAVAILABLE_SLOTS = self._load_class_availability()
-        all_teachers_from_courses = set(t for c in self.COURSE_DATA.values() for t in c['available_teachers'])
-        all_teachers_from_availability = set(self.TEACHER_UNAVAILABLE_SLOTS.keys())
-        all_teachers = all_teachers_from_courses.union(all_teachers_from_availability)
-        self.TEACHERS = {name: {} for name in all_teachers}
-        self.TIMES_PER_DAY = ['上午','下午']
-        self.validate()
-        self.CLASS_SLOT_CACHE = self._precompute_class_slots()
+        timings['class_unavailable'] = time.perf_counter() - t0
 
     def _read_sheet(self, sheet_candidates, col_alias: dict, required_keys: set):
         """从 Excel 中解析符合条件的数据表。
         策略：
-        1) 一次性读取全部工作表（sheet_name=None）避免名字匹配差异引发错误；
+        1) 使用 self._workbook 共享的全部工作表（整个加载过程只读取一次）；
         2) 先按候选名进行规范化匹配（忽略空格/大小写），直接返回该表；
         3) 否则遍历所有表，按别名重命名后检测是否包含必需列，命中则返回；
         4) 否则报错并列出实际可用的表名。
@@ -115,10 +271,8 @@ class TimetableData:
             return str(s).strip().lower().replace(' ', '')
         cand_norm = {norm(c): c for c in sheet_candidates}
         try:
-            with pd.ExcelFile(self.excel_file_path, engine='openpyxl') as xls:
-                names = list(xls.sheet_names)
-                # 一次性读取所有表，避免逐表读取时的名字不一致问题
-                all_sheets = pd.read_excel(xls, sheet_name=None, engine='openpyxl')
+            names = self._workbook.sheet_names
+            all_sheets = self._workbook.sheets
         except Exception as e:
             raise ValueError(f"无法打开Excel文件: {self.excel_file_path}; 错误: {e}")
         # 1) 候选名直接匹配
@@ -163,6 +317,46 @@ class TimetableData:
             cache[class_id] = indices
         return cache
 
+    def _class_components(self):
+        """并查集: 两个班级的课程有任一共同可授教师即连通。组内保持 CLASSES 顺序, 组按班级数降序。"""
+        parent = {cid: cid for cid in self.CLASSES}
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+        owner = {}
+        for cid, info in self.CLASSES.items():
+            for course in info['courses']:
+                for t in self.COURSE_DATA[course]['available_teachers']:
+                    if t in owner:
+                        a, b = find(owner[t]), find(cid)
+                        if a != b:
+                            parent[b] = a
+                    else:
+                        owner[t] = cid
+        groups = {}
+        for cid in self.CLASSES:
+            groups.setdefault(find(cid), []).append(cid)
+        return sorted(groups.values(), key=len, reverse=True)
+
+    def subset(self, class_ids) -> 'TimetableData':
+        """只含 class_ids 的视图 (课程/教师数据与时段轴共享引用), 用于按分组独立求解。
+
+        挂在 data 上的派生缓存 (下划线属性, 如候选表/修复引擎) 不带入, 由使用方按子集重新构建。
+        """
+        wanted = set(class_ids)
+        keep = [cid for cid in self.CLASSES if cid in wanted]
+        sub = copy.copy(self)
+        sub.__dict__ = {k: v for k, v in self.__dict__.items() if not k.startswith('_')}
+        sub._workbook = None
+        sub.CLASSES = {cid: self.CLASSES[cid] for cid in keep}
+        sub.CLASS_UNAVAILABLE_SLOTS = {cid: v for cid, v in self.CLASS_UNAVAILABLE_SLOTS.items() if cid in sub.CLASSES}
+        sub.CLASS_SLOT_CACHE = {cid: self.CLASS_SLOT_CACHE[cid] for cid in keep}
+        sub.CLASS_COMPONENTS = [keep]
+        return sub
+
     def _load_course_data(self):
         # 先尝试根据 sheet 候选与必需列自动识别
         alias = {
@@ -0,0 +1,86 @@
+"""适配度记忆化缓存
+
+包含:
+1. genome_key: 基因序列的 128 位 BLAKE2b 摘要 (marshal 序列化, 跨进程稳定)
+2. FitnessCache: 按内存上限 (CONFIG['FITNESS_CACHE_MB']) 淘汰的 LRU 缓存, 记录命中/未命中/淘汰次数
+
+个体基因按规范顺序排列 (crossover.canonicalize), 交叉/变异后与已有个体相同的子代得到相同的键。
+键取整个有序基因序列 (而非集合): 同一时段内的冲突按基因顺序判定, 顺序不同的个体适配度可能不同。
+评估不消耗随机数, 因此命中缓存不改变进化过程, 固定 seed 时结果与关闭缓存一致。
+
+共享范围: --workers 时缓存在主进程中查找, 只把未命中的个体发给工作进程;
+岛屿模型每个岛进程各有一份缓存 (迁入个体自带适配度, 无需重复评估)。
+"""
+from __future__ import annotations
+
+import hashlib
+import marshal
+import sys
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+__all__ = [
+    'genome_key',
+    'FitnessCache',
+]
+
+# 每个条目的估算内存: 16 字节摘要 + 单元素适配度元组 + float + OrderedDict 节点开销
+_ENTRY_BYTES = sys.getsizeof(b'\0' * 16) + sys.getsizeof((0.0,)) + sys.getsizeof(0.0) + 104
+
+
+def genome_key(individual) -> bytes:
+    return hashlib.blake2b(marshal.dumps(list(individual)), digest_size=16).digest()
+
+
+class FitnessCache:
+    """LRU 适配度缓存; max_mb 为估算内存上限 (条目数 = max_mb / 每条目字节数)。"""
+
+    def __init__(self, max_mb: float):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_entries = max(1, self.max_bytes // _ENTRY_BYTES)
+        self._store: 'OrderedDict[bytes, Tuple[float, ...]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    key = staticmethod(genome_key)
+
+    def __len__(self):
+        return len(self._store)
+
+    def get(self, key: bytes) -> Optional[Tuple[float, ...]]:
+        fit = self._store.get(key)
+        if fit is None:
+            self.misses += 1
+            return None
+        self._store.move_to_end(key)
+        self.hits += 1
+        return fit
+
+    def put(self, key: bytes, fit):
+        store = self._store
+        store[key] = tuple(fit)
+        store.move_to_end(key)
+        while len(store) > self.max_entries:
+            store.popitem(last=False)
+            self.evictions += 1
+
+    @property
+    def hit_rate(self) -> float:
+        n = self.hits + self.misses
+        return self.hits / n if n else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hit_rate, 4),
+            'entries': len(self._store),
+            'evictions': self.evictions,
+            'approx_mb': round(len(self._store) * _ENTRY_BYTES / 1024 / 1024, 3),
+        }
+
+    def summary(self) -> str:
+        s = self.stats()
+        return (f"命中率 {s['hit_rate']:.1%} (命中 {s['hits']} / 查询 {s['hits'] + s['misses']}), "
+                f"条目 {s['entries']}/{self.max_entries}, 淘汰 {s['evictions']}, 约 {s['approx_mb']:.1f}MB")
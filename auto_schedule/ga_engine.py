@@ -5,22 +5,46 @@ generate_individual / repair_individual / normalize_single_teacher / mutate_indi
 evaluate_schedule / quick_self_check / run_scheduler
 
 依赖 constraints.build_absolute, hard_penalties, soft_adjust
+个体基因按规范顺序 (班级, 课程, 块序号) 排列, 交叉算子见 crossover (CONFIG['CROSSOVER'])
+增量评估见 incremental.IncrementalEvaluator, 向量化评估见 vectorized.VectorizedEvaluator (CONFIG['EVAL_BACKEND'])
+适配度记忆化见 fitness_cache.FitnessCache (CONFIG['FITNESS_CACHE_MB'])
+未排基因修复见 repair.RepairEngine (个体上的增量占用状态, 不修改 CLASS_SLOT_CACHE)
+精英/最终个体的局部搜索见 memetic.LocalSearch (CONFIG['LOCAL_SEARCH'])
+断点续跑见 checkpoint (run_scheduler(checkpoint=..., resume=...)), 墙钟预算见 budget.TimeBudget (time_limit)
+逐代遥测 (JSON Lines / 回调) 见 telemetry.GATelemetry, 分阶段剖析 (--profile) 见 profiling
 """
 from __future__ import annotations
 
+import os
 import random
 import datetime
+import time
 from typing import Tuple, Dict, Any
 from deap import base, creator, tools
 import pandas as pd
 
-from .config import CONFIG
+from .config import CONFIG, config_scope
 from .data_model import TimetableData
 from .constraints import build_absolute, hard_penalties, soft_adjust
+from .incremental import IncrementalEvaluator
+from .vectorized import VectorizedEvaluator
+from .parallel import EvaluationPool, evaluate_in_worker
+from .teacher_pairs import teacher_pair_table
+from .seeding import seed_candidates, order_positions, generate_population
+from .crossover import canonicalize, make_crossover
+from .memetic import LocalSearch, LocalSearchStats
+from .checkpoint import GACheckpoint, save_checkpoint, load_checkpoint, data_digest
+from .budget import TimeBudget
+from .telemetry import GATelemetry, PhaseTimer
+from .fitness_cache import FitnessCache
+from .repair import RepairEngine, repair_engine
+from . import profiling
 
 __all__ = [
-    'generate_individual', 'repair_individual', 'normalize_single_teacher', 'mutate_individual',
-    'evaluate_schedule', 'quick_self_check', 'run_scheduler'
+    'generate_individual', 'repair_individual', 'normalize_single_teacher', 'mutate_individual', 'repair_mutated',
+    'evaluate_schedule', 'make_evaluator', 'quick_self_check', 'run_scheduler',
+    'ensure_creator', 'build_toolbox', 'init_population', 'evaluate_invalid', 'next_generation',
+    'improve_elite', 'export_best', 'clone_individual',
 ]
 
 
@@ -30,22 +54,22 @@ def set_random_seed(seed: int | None):
     random.seed(seed)
 
 
-def generate_individual(data: TimetableData):
-    import itertools
+def generate_individual(data: TimetableData, order: str | None = None):
+    """构造一个个体; order 为基因构造顺序 (默认 CONFIG['SEED_ORDER'], 见 seeding.order_positions)。"""
     positions = []
     for class_id, info in data.CLASSES.items():
         for course in info['courses']:
             for _ in range(data.COURSE_DATA[course]['blocks']):
                 positions.append((class_id, course))
-    random.shuffle(positions)
+    order_positions(positions, data, order)
     individual = []
-    occupancy = {}
-
-    def slot_to_date_idx(class_id, idx):
-        class_info = data.CLASSES[class_id]
-        date = class_info['start_date'] + datetime.timedelta(days=idx // 2)
-        period = idx % 2
-        return date, period
+    # 占用: 全局 slot -> 班级集合 / 教师位图
+    occ_classes: Dict[int, set] = {}
+    occ_teachers: Dict[int, int] = {}
+    axis = data.SLOT_AXIS
+    pairs = teacher_pair_table(data)
+    tbit = pairs.tbit
+    cands = seed_candidates(data)
 
     for class_id, course in positions:
         base_indices = data.CLASS_SLOT_CACHE.get(class_id, [])
@@ -55,12 +79,8 @@ def generate_individual(data: TimetableData):
         course_info = data.COURSE_DATA[course]
         # 现在 is_theory 已由 data_model 派生: 单师 => True
         is_theory = course_info.get('is_theory', False)
-        # 生成候选时间索引：理论课尽量靠前，其它课程靠后(双师视为实操靠后)
-        idx_candidates = base_indices[:]
-        if is_theory:
-            idx_candidates.sort()  # 前置
-        else:
-            idx_candidates.sort(reverse=True)  # 后置
+        # 候选时间索引(预排序)：理论课尽量靠前，其它课程靠后(双师视为实操靠后)
+        idx_candidates = cands.ordered(class_id, is_theory)
         is_two = course_info.get('is_two_teacher', False)
         teachers = list(course_info['available_teachers'])
         # 若是理论课并且非双师，固定第一教师；若既是理论又是双师，则仍需两个教师
@@ -69,125 +89,43 @@ def generate_individual(data: TimetableData):
         else:
             random.shuffle(teachers)
         assigned = False
+        offset = axis.class_offset[class_id]
+        class_busy = axis.class_busy.get(class_id, 0)
         for idx in idx_candidates:
-            date, period = slot_to_date_idx(class_id, idx)
-            if class_id in data.CLASS_UNAVAILABLE_SLOTS and (date, period) in data.CLASS_UNAVAILABLE_SLOTS[class_id]:
+            s = offset + idx
+            if (class_busy >> s) & 1:
                 continue
-            key = (date, period)
-            occ = occupancy.setdefault(key, {'classes': set(), 'teachers': set()})
-            if class_id in occ['classes']:
+            if class_id in occ_classes.get(s, ()):
                 continue
+            occupied = occ_teachers.get(s, 0)
             if is_two:
-                for t1, t2 in itertools.permutations(teachers, 2):
-                    if t1 in data.TEACHER_UNAVAILABLE_SLOTS and (date, period) in data.TEACHER_UNAVAILABLE_SLOTS[t1]:
-                        continue
-                    if t2 in data.TEACHER_UNAVAILABLE_SLOTS and (date, period) in data.TEACHER_UNAVAILABLE_SLOTS[t2]:
-                        continue
-                    if t1 in occ['teachers'] or t2 in occ['teachers']:
-                        continue
+                pair = pairs.first_pair(course, s, teachers, occupied)
+                if pair:
+                    t1, t2 = pair
                     individual.append((class_id, course, t1, t2, idx))
-                    occ['classes'].add(class_id)
-                    occ['teachers'].add(t1)
-                    occ['teachers'].add(t2)
+                    occ_classes.setdefault(s, set()).add(class_id)
+                    occ_teachers[s] = occupied | tbit[t1] | tbit[t2]
                     assigned = True
                     break
-                if assigned:
-                    break
             else:
-                for t in teachers:
-                    if t in data.TEACHER_UNAVAILABLE_SLOTS and (date, period) in data.TEACHER_UNAVAILABLE_SLOTS[t]:
-                        continue
-                    if t in occ['teachers']:
-                        continue
+                t = pairs.first_single(s, teachers, occupied)
+                if t is not None:
                     individual.append((class_id, course, t, None, idx))
-                    occ['classes'].add(class_id)
-                    occ['teachers'].add(t)
+                    occ_classes.setdefault(s, set()).add(class_id)
+                    occ_teachers[s] = occupied | tbit[t]
                     assigned = True
                     break
-                if assigned:
-                    break
         if not assigned:
             individual.append((class_id, course, teachers[0] if teachers else None, None, -1))
     individual = repair_individual(individual, data)
     individual = normalize_single_teacher(individual, data)
-    return individual
+    # 规范顺序: 不同个体同一位置对应同一 (班级, 课程), 交叉时区段对齐
+    return canonicalize(individual, data)
 
 
-def repair_individual(individual, data: TimetableData, max_pass=2):
-    import itertools
-    for _ in range(max_pass):
-        occupancy = {}
-        for i, (cid, course, t1, t2, idx) in enumerate(individual):
-            if idx is None or idx < 0:
-                continue
-            date = data.CLASSES[cid]['start_date'] + datetime.timedelta(days=idx // 2)
-            period = idx % 2
-            key = (date, period)
-            occ = occupancy.setdefault(key, {'classes': set(), 'teachers': set()})
-            occ['classes'].add(cid)
-            if t1:
-                occ['teachers'].add(t1)
-            if t2:
-                occ['teachers'].add(t2)
-        modified = False
-        for i, (cid, course, t1, t2, idx) in enumerate(individual):
-            if idx >= 0 and t1 is not None:
-                continue
-            base_indices = data.CLASS_SLOT_CACHE.get(cid, [])
-            if not base_indices:
-                continue
-            random.shuffle(base_indices)
-            is_two = data.COURSE_DATA[course].get('is_two_teacher', False)
-            course_info = data.COURSE_DATA[course]
-            teachers = list(course_info['available_teachers'])
-            if course_info.get('is_theory', False) and not is_two:
-                # 理论单师固定第一教师
-                teachers = [teachers[0]]
-            else:
-                random.shuffle(teachers)
-            placed = False
-            for cand in base_indices:
-                date = data.CLASSES[cid]['start_date'] + datetime.timedelta(days=cand // 2)
-                period = cand % 2
-                if cid in data.CLASS_UNAVAILABLE_SLOTS and (date, period) in data.CLASS_UNAVAILABLE_SLOTS[cid]:
-                    continue
-                key = (date, period)
-                occ = occupancy.setdefault(key, {'classes': set(), 'teachers': set()})
-                if cid in occ['classes']:
-                    continue
-                if is_two:
-                    for ta, tb in itertools.permutations(teachers, 2):
-                        if ta in data.TEACHER_UNAVAILABLE_SLOTS and (date, period) in data.TEACHER_UNAVAILABLE_SLOTS[ta]:
-                            continue
-                        if tb in data.TEACHER_UNAVAILABLE_SLOTS and (date, period) in data.TEACHER_UNAVAILABLE_SLOTS[tb]:
-                            continue
-                        if ta in occ['teachers'] or tb in occ['teachers']:
-                            continue
-                        individual[i] = (cid, course, ta, tb, cand)
-                        occ['classes'].add(cid)
-                        occ['teachers'].add(ta)
-                        occ['teachers'].add(tb)
-                        placed = True
-                        modified = True
-                        break
-                    if placed:
-                        break
-                else:
-                    for ta in teachers:
-                        if ta in data.TEACHER_UNAVAILABLE_SLOTS and (date, period) in data.TEACHER_UNAVAILABLE_SLOTS[ta]:
-                            continue
-                        if ta in occ['teachers']:
-                            continue
-                        individual[i] = (cid, course, ta, None, cand)
-                        occ['classes'].add(cid)
-                        occ['teachers'].add(ta)
-                        placed = True
-                        modified = True
-                        break
-                    if placed:
-                        break
-        if not modified:
-            break
+def repair_individual(individual, data: TimetableData, max_pass=2, engine: RepairEngine | None = None):
+    """把未排基因 (idx < 0 或缺第一教师) 放到随机可行时段 (原地), 见 repair.RepairEngine。"""
+    (engine or repair_engine(data)).repair(individual, max_pass)
     return individual
 
 
@@ -198,7 +136,8 @@ def normalize_single_teacher(individual, data: TimetableData):
     return individual
 
 
-def mutate_individual(individual, data: TimetableData, indpb=0.05):
+def mutate_individual(individual, data: TimetableData, indpb=0.05, repair=True):
+    """随机改时间下标 (及补齐教师); repair=False 时不做修复, 由调用方随后调用 repair_mutated。"""
     for i in range(len(individual)):
         if random.random() < indpb:
             class_id, course, teacher1, teacher2, old_idx = individual[i]
@@ -229,11 +168,17 @@ def mutate_individual(individual, data: TimetableData, indpb=0.05):
                         teacher2 = candidates[0] if candidates else None
                 # 写回（非理论单师 / 理论双师 / 非理论双师）
                 individual[i] = (class_id, course, teacher1, teacher2 if is_two else (None if (is_theory and not is_two) else teacher2), new_idx)
-    individual = repair_individual(individual, data, max_pass=1)
-    individual = normalize_single_teacher(individual, data)
+    if repair:
+        repair_mutated(individual, data)
     return (individual,)
 
 
+def repair_mutated(individual, data: TimetableData, engine: RepairEngine | None = None):
+    """变异后的单轮修复 + 单师归一 (原地)。"""
+    individual = repair_individual(individual, data, max_pass=1, engine=engine)
+    return normalize_single_teacher(individual, data)
+
+
 def evaluate_schedule(individual, data: TimetableData):
     absolute = build_absolute(individual, data)
     hard = hard_penalties(absolute, data)
@@ -241,6 +186,18 @@ def evaluate_schedule(individual, data: TimetableData):
     return (hard + soft_total,)
 
 
+def make_evaluator(data: TimetableData, backend: str | None = None):
+    """按 CONFIG['EVAL_BACKEND'] 返回评估函数 individual -> (fitness,)。"""
+    backend = backend or CONFIG.get('EVAL_BACKEND', 'incremental')
+    if backend == 'incremental':
+        return IncrementalEvaluator(data).evaluate
+    if backend == 'numpy':
+        return VectorizedEvaluator(data).evaluate
+    if backend == 'full':
+        return lambda ind: evaluate_schedule(ind, data)
+    raise ValueError(f"未知评估后端: {backend}")
+
+
 def quick_self_check(individual, data: TimetableData):
     HARD = CONFIG['HARD_PENALTY']
     miss_t_pen = CONFIG['MISSING_TEACHER_PENALTY']
@@ -249,9 +206,10 @@ def quick_self_check(individual, data: TimetableData):
     teacher_conflicts = class_conflicts = teacher_unavailable = 0
     missing_blocks = missing_teacher = missing_co_teacher = extra_second_teacher = 0
     block_mismatch = 0
-    time_slot_map = {}
+    time_slot_map = {}  # 全局 slot -> {'teachers', 'classes'}
+    axis = data.SLOT_AXIS
     scheduled_blocks = {(cid, c): 0 for cid in data.CLASSES for c in data.CLASSES[cid]['courses']}
-    for entry in absolute:
+    for gene, entry in zip(individual, absolute):
         class_id, course, t1, t2, date, period_idx, is_two = entry
         if date is None:
             missing_blocks += 1
@@ -260,7 +218,7 @@ def quick_self_check(individual, data: TimetableData):
             if is_two:
                 missing_co_teacher += 1
             continue
-        key = (date, period_idx)
+        key = axis.class_offset[class_id] + gene[4]
         if key not in time_slot_map:
             time_slot_map[key] = {'teachers': set(), 'classes': set()}
         if t1 in time_slot_map[key]['teachers']:
@@ -274,9 +232,9 @@ def quick_self_check(individual, data: TimetableData):
         if t2:
             time_slot_map[key]['teachers'].add(t2)
         time_slot_map[key]['classes'].add(class_id)
-        if t1 and t1 in data.TEACHER_UNAVAILABLE_SLOTS and (date, period_idx) in data.TEACHER_UNAVAILABLE_SLOTS[t1]:
+        if t1 and not axis.teacher_free(t1, key):
             teacher_unavailable += 1
-        if t2 and t2 in data.TEACHER_UNAVAILABLE_SLOTS and (date, period_idx) in data.TEACHER_UNAVAILABLE_SLOTS[t2]:
+        if t2 and not axis.teacher_free(t2, key):
             teacher_unavailable += 1
         scheduled_blocks[(class_id, course)] += 1
         if t1 is None:
@@ -317,18 +275,24 @@ def quick_self_check(individual, data: TimetableData):
     }
 
 
-def run_scheduler(pop_size=CONFIG['DEFAULT_POP'], ngen=CONFIG['DEFAULT_GEN'], excel_out=CONFIG['DEFAULT_OUTPUT'], seed=CONFIG['DEFAULT_SEED'], verbose=1, excel_path: str | None = None):
-    from .constraints import build_absolute
-    from deap import creator
-    def log(msg, level='INFO'):
-        if verbose >= 1 or level == 'ERROR':
-            print(f"[{level}] {msg}")
-    if verbose:
-        print(f"[INFO] 启动 GA: pop={pop_size} gen={ngen} seed={seed}")
-    set_random_seed(seed)
-    data = TimetableData(excel_path or '排课数据.xlsx')
-    if verbose:
-        print('[INFO] 数据加载完成')
+def clone_individual(individual, memo=None):
+    """个体克隆 (注册为 toolbox.clone, 同时作为 Individual.__deepcopy__)。
+
+    基因是不可变元组, 只浅拷贝列表; 适配度直接复制 wvalues;
+    增量评估状态 inc_state 与修复占用状态 occ_state 按引用共享, 首次修改时再复制 (写时复制)。
+    """
+    new = individual.__class__(individual)
+    new.fitness.wvalues = individual.fitness.wvalues
+    for attr in ('inc_state', 'occ_state'):
+        state = getattr(individual, attr, None)
+        if state is not None:
+            state.shares += 1
+            setattr(new, attr, state)
+    return new
+
+
+def ensure_creator():
+    """注册 DEAP 的 FitnessMin / Individual (重复调用安全)。"""
     try:
         creator.FitnessMin
     except Exception:
@@ -336,62 +300,368 @@ def run_scheduler(pop_size=CONFIG['DEFAULT_POP'], ngen=CONFIG['DEFAULT_GEN'], ex
     try:
         creator.Individual
     except Exception:
-        creator.create('Individual', list, fitness=creator.FitnessMin)
+        creator.create('Individual', list, fitness=creator.FitnessMin, __deepcopy__=clone_individual)
+
+
+def build_toolbox(data: TimetableData):
+    ensure_creator()
     toolbox = base.Toolbox()
     toolbox.register('individual_gen', generate_individual, data)
     def create_individual():
         return creator.Individual(toolbox.individual_gen())
     toolbox.register('individual', create_individual)
     toolbox.register('population', tools.initRepeat, list, toolbox.individual)
-    toolbox.register('evaluate', evaluate_schedule, data=data)
-    def safe_cx(ind1, ind2):
-        if len(ind1) < 2 or len(ind2) < 2:
-            return ind1, ind2
-        return tools.cxTwoPoint(ind1, ind2)
-    toolbox.register('mate', safe_cx)
-    toolbox.register('mutate', mutate_individual, data=data, indpb=0.08)
+    toolbox.register('evaluate', make_evaluator(data))
+    toolbox.register('mate', make_crossover(data))
+    toolbox.register('mutate', mutate_individual, data=data, indpb=0.08, repair=False)
+    # 每次运行一个修复引擎 (个体上的占用状态与修复统计按运行隔离)
+    toolbox.repair_engine = RepairEngine(data)
+    toolbox.register('repair', repair_mutated, data=data, engine=toolbox.repair_engine)
     toolbox.register('select', tools.selTournament, tournsize=3)
-    pop = toolbox.population(n=pop_size)
-    if verbose:
-        print('[INFO] 初始种群生成完成')
+    toolbox.register('clone', clone_individual)
+    # 局部搜索器 (非 toolbox.register 的函数, 直接挂为属性; 关闭时为 None)
+    mode = CONFIG.get('LOCAL_SEARCH', 'none')
+    toolbox.local_search = LocalSearch(data, mode) if mode and mode != 'none' else None
+    cache_mb = CONFIG.get('FITNESS_CACHE_MB', 0)
+    toolbox.fitness_cache = FitnessCache(cache_mb) if cache_mb and cache_mb > 0 else None
+    # --profile: 各算子替换为计时包装 (未启用时为空操作)
+    profiling.instrument(toolbox, ('evaluate', 'clone', 'select', 'mate', 'mutate', 'repair'))
+    return toolbox
+
+
+def improve_elite(pop, toolbox, gen: int, deadline: float | None = None) -> float:
+    """每 LS_INTERVAL 代对前 LS_TOP_K 个个体做 LS_STEPS 步局部搜索 (原地改写), 返回适配度改进总量。"""
+    searcher = getattr(toolbox, 'local_search', None)
+    if searcher is None or gen % max(1, CONFIG.get('LS_INTERVAL', 1)):
+        return 0
+    total = 0
+    for ind in tools.selBest(pop, CONFIG.get('LS_TOP_K', 2)):
+        genes, fit, gain = searcher.improve(ind, CONFIG.get('LS_STEPS', 200), 'elite', deadline)
+        if gain > 0:
+            ind[:] = genes
+            ind.fitness.values = (fit,)
+            total += gain
+    return total
+
+
+def evaluate_invalid(pop, toolbox) -> int:
+    """评估 fitness 失效的个体, 返回实际评估数量。
+
+    toolbox.fitness_cache 存在时先按基因摘要查缓存, 同一批内重复的基因组只评估一次。
+    """
+    invalid = [ind for ind in pop if not ind.fitness.valid]
+    cache = getattr(toolbox, 'fitness_cache', None)
+    if cache is None:
+        fits = toolbox.map(toolbox.evaluate, invalid)
+        for ind, fit in zip(invalid, fits):
+            ind.fitness.values = fit
+        return len(invalid)
+    pending: Dict[bytes, list] = {}
+    for ind in invalid:
+        key = cache.key(ind)
+        if key in pending:
+            cache.hits += 1
+            pending[key].append(ind)
+            continue
+        fit = cache.get(key)
+        if fit is not None:
+            ind.fitness.values = fit
+        else:
+            pending[key] = [ind]
+    todo = [group[0] for group in pending.values()]
+    fits = toolbox.map(toolbox.evaluate, todo)
+    for (key, group), fit in zip(pending.items(), fits):
+        cache.put(key, fit)
+        for ind in group:
+            ind.fitness.values = fit
+    return len(todo)
+
+
+def next_generation(pop, toolbox, timer: PhaseTimer | None = None):
+    """选择 -> 克隆 -> 交叉 -> 变异 -> 修复, 返回子代 (变动个体的 fitness 已失效)。
+
+    timer: 传入时累计 select / vary / repair 各阶段耗时。
+    """
+    t0 = time.perf_counter()
+    offspring = toolbox.select(pop, len(pop))
+    offspring = list(map(toolbox.clone, offspring))
+    t1 = time.perf_counter()
+    repair_time = 0.0
+    for c1, c2 in zip(offspring[::2], offspring[1::2]):
+        if random.random() < 0.6:
+            toolbox.mate(c1, c2)
+            del c1.fitness.values
+            del c2.fitness.values
+    for mut in offspring:
+        if random.random() < 0.2:
+            toolbox.mutate(mut)
+            r0 = time.perf_counter()
+            toolbox.repair(mut)
+            repair_time += time.perf_counter() - r0
+            del mut.fitness.values
+    if timer is not None:
+        timer.add('select', t1 - t0)
+        timer.add('vary', time.perf_counter() - t1 - repair_time)
+        timer.add('repair', repair_time)
+    return offspring
+
+
+def init_population(data: TimetableData, toolbox, pop_size, workers=None, pool=None):
+    """初始种群; CONFIG['SEEDING'] = 'parallel' 时按派生种子在进程池中构造 (默认 serial 与原随机流一致)。"""
+    if CONFIG.get('SEEDING', 'serial') == 'parallel':
+        genes = generate_population(data, pop_size, workers=workers or CONFIG.get('SEED_WORKERS') or os.cpu_count(), pool=pool)
+        return [creator.Individual(g) for g in genes]
+    return toolbox.population(n=pop_size)
+
+
+def _snapshot(toolbox, pop, g, best, best_fit, initial_fit, no_improve, digest) -> GACheckpoint:
+    """第 g 代开始时的进化状态。"""
+    return GACheckpoint(
+        generation=g,
+        population=[(list(ind), ind.fitness.values if ind.fitness.valid else None) for ind in pop],
+        rng_state=random.getstate(),
+        best=(list(best), best.fitness.values) if best is not None else None,
+        best_fit=best_fit,
+        initial_fit=initial_fit,
+        no_improve=no_improve,
+        config=dict(CONFIG),
+        data_sha256=digest,
+        ls_stats=toolbox.local_search.stats if toolbox.local_search is not None else None,
+    )
+
+
+def _restore(ckpt: GACheckpoint, toolbox):
+    """由断点还原 (pop, best) 与随机数状态。"""
+    pop = []
+    for genes, fit in ckpt.population:
+        ind = creator.Individual(genes)
+        if fit is not None:
+            ind.fitness.values = fit
+        pop.append(ind)
+    best = None
+    if ckpt.best is not None:
+        best = creator.Individual(ckpt.best[0])
+        best.fitness.values = ckpt.best[1]
+    if toolbox.local_search is not None and ckpt.ls_stats is not None:
+        toolbox.local_search.stats = ckpt.ls_stats
+    random.setstate(ckpt.rng_state)
+    return pop, best
+
+
+def _telemetry_extra(toolbox) -> Dict[str, Any]:
+    extra = {'repair': toolbox.repair_engine.stats.snapshot()}
+    cache = getattr(toolbox, 'fitness_cache', None)
+    if cache is not None:
+        extra['fitness_cache'] = cache.stats()
+    return extra
+
+
+def _evolve_single(data: TimetableData, pop_size, ngen, verbose, workers, checkpoint: str | None = None,
+                   resume: GACheckpoint | None = None, budget: TimeBudget | None = None,
+                   telemetry: GATelemetry | None = None, check_cancel=None):
+    toolbox = build_toolbox(data)
+    budget = budget or TimeBudget(None)
+    telemetry = (telemetry or GATelemetry()).bind(data)
+    timer = telemetry.timer
+    # 并行评估: 每个工作进程通过 initializer 获得一份 data, 之后只传基因列表
+    pool = None
+    if workers and workers > 1:
+        pool = EvaluationPool(data, workers)
     best = None
     best_fit = float('inf')
+    initial_fit = None
     patience = CONFIG.get('EARLY_STOP_PATIENCE', None)
     no_improve = 0
-    for g in range(ngen):
-        invalid = [ind for ind in pop if not ind.fitness.valid]
-        fits = map(toolbox.evaluate, invalid)
-        for ind, fit in zip(invalid, fits):
-            ind.fitness.values = fit
-        current_best = tools.selBest(pop, 1)[0]
-        cur_fit = current_best.fitness.values[0]
-        if cur_fit < best_fit:
-            best_fit = cur_fit
-            best = toolbox.clone(current_best)
-            no_improve = 0
+    start = 0
+    interval = max(1, CONFIG.get('CHECKPOINT_INTERVAL', 10))
+    digest = data_digest(data) if checkpoint else None
+    try:
+        if resume is not None:
+            pop, best = _restore(resume, toolbox)
+            start, best_fit, initial_fit, no_improve = resume.generation, resume.best_fit, resume.initial_fit, resume.no_improve
+            if verbose:
+                print(f'[INFO] 从断点续跑: 第 {start} 代, 历史最优={best_fit}')
         else:
-            no_improve += 1
-        if verbose >= 2:
-            print(f"[INFO] Gen {g} best={best_fit}")
-        if patience is not None and no_improve >= patience:
+            t0 = time.perf_counter()
+            with profiling.phase('init_population'):
+                pop = init_population(data, toolbox, pop_size, workers, pool)
             if verbose:
-                print(f"[INFO] 早停: 连续 {patience} 代无改进")
-            break
-        offspring = toolbox.select(pop, len(pop))
-        offspring = list(map(toolbox.clone, offspring))
-        for c1, c2 in zip(offspring[::2], offspring[1::2]):
-            if random.random() < 0.6:
-                toolbox.mate(c1, c2)
-                del c1.fitness.values
-                del c2.fitness.values
-        for mut in offspring:
-            if random.random() < 0.2:
-                toolbox.mutate(mut)
-                del mut.fitness.values
-        pop[:] = offspring
+                print(f'[INFO] 初始种群生成完成 ({time.perf_counter() - t0:.2f}s, seeding={CONFIG.get("SEEDING", "serial")} order={CONFIG.get("SEED_ORDER", "random")})')
+        if pool is not None:
+            toolbox.register('map', pool.map)
+            toolbox.register('evaluate', evaluate_in_worker)
+            # evaluate 需可 pickle 到工作进程, 改为对 map 计时
+            profiling.instrument(toolbox, ('map',), label='evaluate')
+            if verbose:
+                print(f'[INFO] 并行评估: workers={workers}')
+        budget.mark()
+        for g in range(start, ngen):
+            if check_cancel is not None:
+                check_cancel()
+            # 预计下一代会超出时间预算: 停止并返回当前最优 (至少完成一代)
+            if g > start and not budget.allows_next():
+                if verbose:
+                    print(f"[INFO] 时间预算用尽: 已完成 {g} 代 (每代约 {budget.per_gen:.3f}s)")
+                if checkpoint:
+                    save_checkpoint(checkpoint, _snapshot(toolbox, pop, g, best, best_fit, initial_fit, no_improve, digest))
+                break
+            if checkpoint and g > start and g % interval == 0:
+                save_checkpoint(checkpoint, _snapshot(toolbox, pop, g, best, best_fit, initial_fit, no_improve, digest))
+            with timer.phase('evaluate'):
+                n_eval = evaluate_invalid(pop, toolbox)
+            if initial_fit is None:
+                initial_fit = tools.selBest(pop, 1)[0].fitness.values[0]
+            with timer.phase('local_search'), profiling.phase('local_search'):
+                improve_elite(pop, toolbox, g, budget.deadline)
+            current_best = tools.selBest(pop, 1)[0]
+            cur_fit = current_best.fitness.values[0]
+            if cur_fit < best_fit:
+                best_fit = cur_fit
+                best = toolbox.clone(current_best)
+                no_improve = 0
+            else:
+                no_improve += 1
+            if verbose >= 2:
+                print(f"[INFO] Gen {g} best={best_fit}")
+            if patience is not None and no_improve >= patience:
+                telemetry.record(g, pop, n_eval, best_fit, ngen, **_telemetry_extra(toolbox))
+                if verbose:
+                    print(f"[INFO] 早停: 连续 {patience} 代无改进")
+                break
+            # 记录本代种群统计, 耗时含产生下一代的 select / vary / repair
+            stats_pop = list(pop)
+            pop[:] = next_generation(pop, toolbox, timer)
+            telemetry.record(g, stats_pop, n_eval, best_fit, ngen, **_telemetry_extra(toolbox))
+            budget.record()
+        else:
+            # 正常跑完: 保存第 ngen 代开始时的状态, 之后可用更大的 --gen 续跑
+            if checkpoint and ngen > start:
+                save_checkpoint(checkpoint, _snapshot(toolbox, pop, ngen, best, best_fit, initial_fit, no_improve, digest))
+    finally:
+        if pool is not None:
+            pool.close()
+    if verbose and toolbox.fitness_cache is not None:
+        print(f'[INFO] 适配度缓存: {toolbox.fitness_cache.summary()}')
+    if verbose:
+        print(f'[INFO] 变异后修复: {toolbox.repair_engine.stats.summary()}')
+    stats = toolbox.local_search.stats if toolbox.local_search is not None else None
+    return best, initial_fit, stats
+
+
+def run_scheduler(pop_size=CONFIG['DEFAULT_POP'], ngen=CONFIG['DEFAULT_GEN'], excel_out=CONFIG['DEFAULT_OUTPUT'], seed=CONFIG['DEFAULT_SEED'], verbose=1, excel_path: str | None = None, workers: int | None = None,
+                  islands: int | None = None, migration_interval: int | None = None, migrants: int | None = None,
+                  checkpoint: str | None = None, resume: str | None = None, time_limit: float | None = None,
+                  telemetry: str | None = None, on_generation=None, partition: str | None = None, check_cancel=None):
+    """运行 GA 并导出最优排课。
+
+    workers>1: 单种群 + 进程池并行评估
+    islands>1: 岛屿模型, 每个岛一个进程、各自种子, 每 migration_interval 代环形迁移 migrants 个最优个体
+    checkpoint: 每 CHECKPOINT_INTERVAL 代及结束时写入断点文件 (仅单种群)
+    resume: 从断点文件继续 (种群与断点时的 CONFIG 快照, ngen 为总代数; 未指定 checkpoint 时继续写回该文件)。
+            快照只在本次运行内生效, 返回后 CONFIG 还原; 当前设置与快照不同的项打印 WARN 后以快照为准
+    time_limit: 墙钟预算 (秒, 含数据加载); 预计下一代会超时即停止, 照常返回并导出当前最优。
+                excel_out 为空时不导出
+    telemetry / on_generation: 逐代记录写入 JSON Lines 文件 / 传给回调 (字段见 telemetry 模块);
+                岛屿模型按迁移纪元记录
+    partition: 按教师连通分组求解器 (ga / construct, 默认 CONFIG['PARTITION']; none 关闭);
+               各组在进程池 (workers 个进程) 中独立求解后合并, 见 partition.solve_partitioned。
+               只有一组时按整体求解; 不支持断点续跑与岛屿模型, 不输出逐代遥测
+    check_cancel: 无参回调, 在每代 / 岛屿模型与分组求解等待结果期间 / 最终局部搜索中周期性调用,
+                  抛出异常即中止运行 (后台作业取消, 见 jobs)
+    """
+    if not resume:
+        return _run_scheduler(pop_size, ngen, excel_out, seed, verbose, excel_path, workers, islands, migration_interval,
+                              migrants, checkpoint, None, time_limit, telemetry, on_generation, partition, check_cancel)
+    ckpt = load_checkpoint(resume)
+    # 续跑使用断点时的参数, 保证与不中断运行一致; 只作用于本次运行, 不污染调用方进程中后续的 run_scheduler
+    conflicts = [f'{k}={CONFIG[k]!r} (断点 {v!r})' for k, v in ckpt.config.items() if k in CONFIG and CONFIG[k] != v]
+    if conflicts:
+        print('[WARN] 续跑沿用断点时的参数, 以下当前设置被忽略: ' + ', '.join(conflicts))
+    with config_scope(ckpt.config):
+        return _run_scheduler(len(ckpt.population), ngen, excel_out, seed, verbose, excel_path, workers, islands,
+                              migration_interval, migrants, checkpoint or resume, ckpt, time_limit, telemetry,
+                              on_generation, partition, check_cancel)
+
+
+def _run_scheduler(pop_size, ngen, excel_out, seed, verbose, excel_path, workers, islands, migration_interval, migrants,
+                   checkpoint, ckpt, time_limit, telemetry, on_generation, partition, check_cancel):
+    from .constraints import build_absolute
+    budget = TimeBudget(time_limit)
+    ls_mode = CONFIG.get('LOCAL_SEARCH', 'none')
+    ls_stats = LocalSearchStats()
+    initial_fit = None
+    def log(msg, level='INFO'):
+        if verbose >= 1 or level == 'ERROR':
+            print(f"[{level}] {msg}")
+    if verbose:
+        print(f"[INFO] 启动 GA: pop={pop_size} gen={ngen} seed={seed}")
+    set_random_seed(seed)
+    with profiling.phase('load'):
+        data = TimetableData(excel_path or '排课数据.xlsx')
+    if verbose:
+        print('[INFO] 数据加载完成')
+        print(f'[INFO] 数据加载耗时: {data.timing_report()}')
+    if ckpt is not None:
+        ckpt.check_data(data)
+    partition = partition or CONFIG.get('PARTITION', 'none')
+    if partition == 'none':
+        partition = None
+    elif len(data.CLASS_COMPONENTS) < 2:
+        log('班级按教师连通只有 1 组, 按整体求解')
+        partition = None
+    elif checkpoint or ckpt is not None or (islands and islands > 1):
+        log('分组求解暂不支持断点续跑与岛屿模型, 忽略 checkpoint/resume/islands', 'WARN')
+        checkpoint = ckpt = islands = None
+    if islands and islands > 1 and (checkpoint or ckpt is not None):
+        log('岛屿模型暂不支持断点续跑, 忽略 checkpoint/resume', 'WARN')
+        checkpoint = ckpt = None
+    tele = GATelemetry(telemetry, on_generation).bind(data)
+    try:
+        if partition:
+            from .partition import solve_partitioned
+            best_genes = solve_partitioned(data, pop_size, ngen, seed, engine=partition, workers=workers,
+                                           verbose=verbose, ls_stats=ls_stats, budget=budget, check_cancel=check_cancel)
+            ensure_creator()
+            best = creator.Individual(best_genes)
+            elite_stats = None
+        elif islands and islands > 1:
+            from .islands import run_islands
+            best_genes, _ = run_islands(
+                data, pop_size=pop_size, ngen=ngen, seed=seed, n_islands=islands,
+                migration_interval=migration_interval or CONFIG['ISLAND_MIGRATION_INTERVAL'],
+                migrants=migrants or CONFIG['ISLAND_MIGRANTS'], verbose=verbose, ls_stats=ls_stats, budget=budget,
+                telemetry=tele, check_cancel=check_cancel,
+            )
+            ensure_creator()
+            best = creator.Individual(best_genes)
+            elite_stats = None
+        else:
+            best, initial_fit, elite_stats = _evolve_single(data, pop_size, ngen, verbose, workers, checkpoint, ckpt, budget, tele,
+                                                          check_cancel)
+    finally:
+        tele.close()
+    if elite_stats is not None:
+        ls_stats.merge(elite_stats)
     if verbose:
         print('[INFO] 进化完成, 选择最佳个体')
-    metrics = quick_self_check(best, data)
+    if ls_mode and ls_mode != 'none':
+        # 最终最优再做一轮更长的局部搜索, 并报告各阶段对适配度的贡献
+        searcher = LocalSearch(data, ls_mode)
+        ga_fit = fit = searcher.ev.evaluate(list(best))[0]
+        if CONFIG.get('LS_FINAL_STEPS', 0) > 0:
+            with profiling.phase('local_search'):
+                genes, fit, gain = searcher.improve(best, CONFIG['LS_FINAL_STEPS'], 'final', budget.deadline,
+                                                    check_cancel)
+            if gain > 0:
+                best[:] = genes
+            ls_stats.merge(searcher.stats)
+        if verbose:
+            start = f'初始最优={initial_fit:g} ' if initial_fit is not None else ''
+            print(f"[INFO] 改进来源: {start}GA后={ga_fit:g} (其中精英局部搜索累计 {ls_stats.gain.get('elite', 0):g}) 最终局部搜索后={fit:g}")
+            for line in ls_stats.summary():
+                print(f'[INFO] 局部搜索 {line}')
+    with profiling.phase('self_check'):
+        metrics = quick_self_check(best, data)
     if verbose:
         print('[INFO] 自检结果: ' + ', '.join([f"{k}={v}" for k,v in metrics.items() if k != 'total_fitness']))
         print('[INFO] 软约束细分: ' + ', '.join([f"{k}={v}" for k,v in metrics.get('soft_details', {}).items()]))
@@ -406,7 +676,15 @@ def run_scheduler(pop_size=CONFIG['DEFAULT_POP'], ngen=CONFIG['DEFAULT_GEN'], ex
                 print(f"[WARN] 存在{len(missing_dual)}个双师块缺第二教师或重复教师, 这将被硬罚, 需检查数据 available_teachers 或增加教师可用性")
             else:
                 print('[INFO] 双师课程全部分配两位不同教师')
-    # 导出
+    if not excel_out:
+        return best, metrics
+    with profiling.phase('export'):
+        export_best(best, data, excel_out, verbose)
+    return best, metrics
+
+
+def export_best(best, data: TimetableData, excel_out: str, verbose=1):
+    """导出排课明细 / 教师课时 / 课程进度三张表。"""
     rows = []
     for slot in best:
         class_id, course, teacher1, teacher2, time_idx = slot
@@ -465,4 +743,3 @@ def run_scheduler(pop_size=CONFIG['DEFAULT_POP'], ngen=CONFIG['DEFAULT_GEN'], ex
         course_df.to_excel(writer, sheet_name='课程进度', index=False)
     if verbose:
         print(f"[INFO] 已导出最优排课到 {excel_out}")
-    return best, metrics
@@ -0,0 +1,360 @@
+"""增量 (delta) 适配度评估
+
+包含:
+1. IncrementalEvaluator: 每次运行构建一次, 预计算班级起始日序号/课程属性/教师不可用绝对时段
+2. EvalState: 挂在个体上的评估状态 (时段占用 / 班级时间线 / 教师负载 / 各分项罚分)
+
+思路: 状态保存上次评分时的基因快照, 再次评分时与当前个体逐位比较, 仅对变化基因做
+"移除旧基因 + 加入新基因", 并只重算受影响的时段冲突、受影响班级的时间线软约束与受影响日期的连排奖励。
+软约束本身不在这里实现: 受影响的班级/日期交给 vectorized.class_soft_np / consecutive_np 重算,
+教师负载均衡用 vectorized.balance_penalty (与 constraint_model.soft_score 同一内核), 本模块只做簿记。
+结果与 constraints.build_absolute + hard_penalties + soft_adjust 完全一致 (含同一时段内按基因顺序判定冲突的细节)。
+
+克隆个体 (toolbox.clone -> deepcopy) 时状态按引用共享, 首次需要修改时才复制 (写时复制)。
+"""
+from __future__ import annotations
+
+from typing import Dict, List
+
+import numpy as np
+
+from .config import CONFIG
+from .constraint_model import compiled_model
+from .data_model import TimetableData
+from .vectorized import CLASS_SOFT_KEYS, balance_penalty, class_soft_np, consecutive_np
+
+__all__ = [
+    'IncrementalEvaluator',
+    'EvalState',
+    'SOFT_DETAIL_KEYS',
+]
+
+# 与 constraints.soft_adjust 输出的 soft_details 顺序保持一致
+SOFT_DETAIL_KEYS = (
+    'consecutive_reward',
+    'theory_early_reward',
+    'non_theory_early_penalty',
+    'prereq_violation_penalty',
+    'teacher_switch_penalty',
+    'theory_teacher_inconsistent_penalty',
+    'teacher_balance_penalty',
+)
+
+# 变化基因超过该比例时直接整体重建 (交叉后常见), 避免逐个 delta 反而更慢
+_REBUILD_RATIO = 0.5
+
+
+class IncrementalEvaluator:
+    """增量评估器: 可直接注册为 toolbox.evaluate。"""
+
+    def __init__(self, data: TimetableData):
+        self.data = data
+        cfg = CONFIG
+        self.HARD = cfg['HARD_PENALTY']
+        self.miss_t = cfg['MISSING_TEACHER_PENALTY']
+        self.miss_co = cfg['MISSING_CO_TEACHER_PENALTY']
+        # 软约束分项内核所用的整数化模型 (与 constraint_model.soft_score 共用)
+        self.prob = compiled_model(data)
+        # 全局时段轴 (data.SLOT_AXIS): slot = class_offset + idx, 教师不可用为位图
+        self.class_offset = data.SLOT_AXIS.class_offset
+        self.teacher_busy = data.SLOT_AXIS.teacher_busy
+        self.course_two = {c: v.get('is_two_teacher', False) for c, v in data.COURSE_DATA.items()}
+        self.required = {
+            (cid, c): data.COURSE_DATA[c]['blocks']
+            for cid in data.CLASSES for c in data.CLASSES[cid]['courses']
+        }
+
+    def abs_slot(self, class_id, idx):
+        if idx is None or idx < 0:
+            return None
+        return self.class_offset[class_id] + idx
+
+    def new_state(self, individual) -> 'EvalState':
+        return EvalState(self, individual)
+
+    def state_for(self, individual) -> 'EvalState':
+        """取得与 individual 同步后的状态 (必要时新建或写时复制)。"""
+        state = getattr(individual, 'inc_state', None)
+        if state is None or state.ev is not self:
+            state = EvalState(self, individual)
+        else:
+            if state.shares > 0:
+                state.shares -= 1
+                state = state.copy()
+            state.sync(individual)
+        try:
+            individual.inc_state = state
+        except AttributeError:
+            # 普通 list 无法挂属性, 每次整体评估
+            pass
+        return state
+
+    def evaluate(self, individual):
+        return (self.state_for(individual).total(),)
+
+    def breakdown(self, individual):
+        """返回 (hard, soft_total, soft_details), 数值与 hard_penalties/soft_adjust 一致。"""
+        st = self.state_for(individual)
+        return st.hard(), st.soft(), st.soft_details()
+
+
+class EvalState:
+    """单个个体的增量评估状态。"""
+
+    def __init__(self, ev: IncrementalEvaluator, individual=None):
+        self.ev = ev
+        self.shares = 0
+        if individual is not None:
+            self.rebuild(individual)
+
+    # ---- 克隆: 共享引用, 写时复制 ----
+    def __deepcopy__(self, memo):
+        self.shares += 1
+        return self
+
+    def copy(self) -> 'EvalState':
+        st = EvalState(self.ev)
+        st.genes = list(self.genes)
+        st.rows = self.rows.copy()
+        st.slots = list(self.slots)
+        st.gene_pen = list(self.gene_pen)
+        st.gene_pen_total = self.gene_pen_total
+        st.slot_members = {s: list(m) for s, m in self.slot_members.items()}
+        st.slot_pen = dict(self.slot_pen)
+        st.slot_pen_total = self.slot_pen_total
+        st.counts = dict(self.counts)
+        st.mismatch_total = self.mismatch_total
+        st.missing_blocks = self.missing_blocks
+        st.class_members = {c: set(m) for c, m in self.class_members.items()}
+        st.class_soft = dict(self.class_soft)
+        st.class_soft_sum = list(self.class_soft_sum)
+        st.day_reward = dict(self.day_reward)
+        st.day_reward_total = self.day_reward_total
+        st.teacher_load = dict(self.teacher_load)
+        return st
+
+    # ---- 全量构建 ----
+    def rebuild(self, individual):
+        ev = self.ev
+        self.genes = list(individual)
+        n = len(self.genes)
+        # 各基因的整数编码行 (vectorized.EncodedProblem.encode_gene), 供软约束内核按下标取子集
+        enc = ev.prob.encode_gene
+        self.rows = np.array([enc(g) for g in self.genes], dtype=np.int64).reshape(-1, 5)
+        self.slots = [None] * n
+        self.gene_pen = [0] * n
+        self.gene_pen_total = 0
+        self.slot_members: Dict[int, List[int]] = {}
+        self.slot_pen: Dict[int, int] = {}
+        self.slot_pen_total = 0
+        self.counts = {k: 0 for k in ev.required}
+        self.mismatch_total = sum(ev.HARD * r for r in ev.required.values())
+        self.missing_blocks = 0
+        self.class_members: Dict[str, set] = {}
+        # class_soft[cid] = (adjust, *vectorized.CLASS_SOFT_KEYS 各项)
+        self.class_soft: Dict[str, tuple] = {}
+        self.class_soft_sum = [0, 0, 0, 0, 0, 0]
+        self.day_reward: Dict[int, int] = {}
+        self.day_reward_total = 0
+        self.teacher_load: Dict[str, int] = {}
+        dirty_slots, dirty_classes = set(), set()
+        for i, gene in enumerate(self.genes):
+            self._add(i, gene, dirty_slots, dirty_classes)
+        self._refresh(dirty_slots, dirty_classes)
+
+    # ---- 同步 ----
+    def sync(self, individual):
+        old = self.genes
+        if len(old) != len(individual):
+            self.rebuild(individual)
+            return
+        changed = [i for i, (a, b) in enumerate(zip(old, individual)) if a is not b and a != b]
+        if not changed:
+            return
+        if len(changed) > len(old) * _REBUILD_RATIO:
+            self.rebuild(individual)
+            return
+        self.apply({i: individual[i] for i in changed})
+
+    def apply(self, changes: Dict[int, tuple]):
+        """将 {基因下标: 新基因} 应用到状态 (O(变化基因 × 时段/班级规模))。"""
+        dirty_slots, dirty_classes = set(), set()
+        for i in changes:
+            self._remove(i, dirty_slots, dirty_classes)
+        enc = self.ev.prob.encode_gene
+        for i, gene in changes.items():
+            self.genes[i] = gene
+            self.rows[i] = enc(gene)
+            self._add(i, gene, dirty_slots, dirty_classes)
+        self._refresh(dirty_slots, dirty_classes)
+
+    # ---- 单基因增删 ----
+    def _gene_penalty(self, gene, slot):
+        ev = self.ev
+        class_id, course, t1, t2, _ = gene
+        is_two = ev.course_two.get(course, False)
+        pen = 0
+        if slot is None:
+            if t1 is None:
+                pen += ev.miss_t
+            if is_two:
+                pen += ev.miss_co
+            return pen
+        busy = ev.teacher_busy
+        if t1 and (busy.get(t1, 0) >> slot) & 1:
+            pen += ev.HARD
+        if t2 and (busy.get(t2, 0) >> slot) & 1:
+            pen += ev.HARD
+        if t1 is None:
+            pen += ev.miss_t
+        if is_two and (t2 is None or t2 == t1):
+            pen += ev.miss_co
+        if (not is_two) and t2 is not None:
+            pen += ev.HARD
+        return pen
+
+    def _bump_count(self, key, delta):
+        ev = self.ev
+        old = self.counts.get(key, 0)
+        new = old + delta
+        self.counts[key] = new
+        req = ev.required.get(key)
+        if req is not None:
+            self.mismatch_total += ev.HARD * (abs(req - new) - abs(req - old))
+
+    def _bump_load(self, t, delta):
+        if not t:
+            return
+        v = self.teacher_load.get(t, 0) + delta
+        if v:
+            self.teacher_load[t] = v
+        else:
+            self.teacher_load.pop(t, None)
+
+    def _add(self, i, gene, dirty_slots, dirty_classes):
+        class_id, course, t1, t2, idx = gene
+        slot = self.ev.abs_slot(class_id, idx)
+        self.slots[i] = slot
+        pen = self._gene_penalty(gene, slot)
+        self.gene_pen[i] = pen
+        self.gene_pen_total += pen
+        if slot is None:
+            self.missing_blocks += 1
+            return
+        self.slot_members.setdefault(slot, []).append(i)
+        dirty_slots.add(slot)
+        self.class_members.setdefault(class_id, set()).add(i)
+        dirty_classes.add(class_id)
+        self._bump_count((class_id, course), 1)
+        self._bump_load(t1, 1)
+        self._bump_load(t2, 1)
+
+    def _remove(self, i, dirty_slots, dirty_classes):
+        class_id, course, t1, t2, _ = self.genes[i]
+        slot = self.slots[i]
+        self.gene_pen_total -= self.gene_pen[i]
+        self.gene_pen[i] = 0
+        self.slots[i] = None
+        if slot is None:
+            self.missing_blocks -= 1
+            return
+        members = self.slot_members[slot]
+        members.remove(i)
+        if not members:
+            del self.slot_members[slot]
+        dirty_slots.add(slot)
+        self.class_members[class_id].discard(i)
+        dirty_classes.add(class_id)
+        self._bump_count((class_id, course), -1)
+        self._bump_load(t1, -1)
+        self._bump_load(t2, -1)
+
+    # ---- 局部重算 ----
+    def _refresh(self, dirty_slots, dirty_classes):
+        days = set()
+        for s in dirty_slots:
+            pen = self._slot_penalty(s)
+            self.slot_pen_total += pen - self.slot_pen.get(s, 0)
+            if pen:
+                self.slot_pen[s] = pen
+            else:
+                self.slot_pen.pop(s, None)
+            days.add(s // 2)
+        if days:
+            members = self.slot_members
+            a, pos = self._encoded([i for d in days for s in (d * 2, d * 2 + 1) for i in members.get(s, ())])
+            rewards = consecutive_np(a[:, 4], a[:, 0], a[:, 1], pos)
+            for d in days:
+                r = rewards.get(d, 0)
+                self.day_reward_total += r - self.day_reward.get(d, 0)
+                if r:
+                    self.day_reward[d] = r
+                else:
+                    self.day_reward.pop(d, None)
+        if dirty_classes:
+            self._refresh_classes(dirty_classes)
+
+    def _slot_penalty(self, slot):
+        """同一时段内教师/班级冲突 (按基因顺序, 与 hard_penalties 判定方式一致)。"""
+        members = self.slot_members.get(slot)
+        if not members or len(members) == 1:
+            return 0
+        HARD = self.ev.HARD
+        genes = self.genes
+        teachers, classes = set(), set()
+        pen = 0
+        for i in sorted(members):
+            class_id, _, t1, t2, _ = genes[i]
+            if t1 in teachers:
+                pen += HARD
+            if t2 and t2 in teachers:
+                pen += HARD
+            if class_id in classes:
+                pen += HARD
+            if t1:
+                teachers.add(t1)
+            if t2:
+                teachers.add(t2)
+            classes.add(class_id)
+        return pen
+
+    def _encoded(self, idxs):
+        """基因下标 (均为已排) -> (编码数组 (n, 5), 基因顺序 pos)。"""
+        pos = np.array(idxs, dtype=np.int64)
+        return self.rows[pos], pos
+
+    def _refresh_classes(self, dirty_classes):
+        """受影响班级的时间线软约束 (一次 class_soft_np 调用重算全部受影响班级)。"""
+        prob = self.ev.prob
+        members = self.class_members
+        idxs = [i for cid in dirty_classes for i in members.get(cid, ())]
+        a, pos = self._encoded(idxs)
+        mat = class_soft_np(a[:, 0], a[:, 1], a[:, 2], a[:, 4], pos, prob).tolist()
+        acc = self.class_soft_sum
+        for cid in dirty_classes:
+            old = self.class_soft.get(cid)
+            row = mat[prob.class_index[cid]]
+            new = (sum(row), *row)
+            for k in range(6):
+                acc[k] += new[k] - (old[k] if old else 0)
+            self.class_soft[cid] = new
+
+    # ---- 汇总 ----
+    def hard(self):
+        return (self.gene_pen_total + self.slot_pen_total + self.mismatch_total
+                + self.ev.HARD * self.missing_blocks)
+
+    def balance_penalty(self):
+        return balance_penalty(self.teacher_load.values())
+
+    def soft(self):
+        return self.day_reward_total + self.class_soft_sum[0] + self.balance_penalty()
+
+    def total(self):
+        return self.hard() + self.soft()
+
+    def soft_details(self):
+        details = {'consecutive_reward': self.day_reward_total}
+        details.update(zip(CLASS_SOFT_KEYS, self.class_soft_sum[1:]))
+        details['teacher_balance_penalty'] = self.balance_penalty()
+        return details
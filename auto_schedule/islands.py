@@ -0,0 +1,191 @@
+"""岛屿模型 GA
+
+包含:
+run_islands: K 个子种群各占一个进程 (各自随机种子), 每 M 代按环形拓扑迁移最优个体, 返回全局最优
+
+流程: 各岛构造并评估初始种群后回报 ready; 主进程按 "纪元" 调度 — 向每个岛发送
+('run', M 代, 迁入个体, 迁出数, 剩余秒数), 收回 (迁出个体, 岛内最优, 实际完成代数);
+岛 i 的迁入个体来自岛 i-1 的迁出个体, 替换本岛最差个体。
+时间预算: 剩余时间以秒数发给各岛 (perf_counter 跨进程不可比), 岛内每代开始前与精英局部搜索中检查截止时间;
+尚无每代耗时估计时首个纪元只跑 1 代。
+种子由主种子派生, 迁移顺序固定, 因此固定 seed 时结果可复现。
+早停以全局最优连续 EARLY_STOP_PATIENCE 代无改进为准。
+"""
+from __future__ import annotations
+
+import multiprocessing
+import random
+import time
+from typing import List, Tuple
+
+from deap import creator, tools
+
+from .config import CONFIG
+from .data_model import TimetableData
+
+__all__ = ['run_islands']
+
+# 等待各岛结果时调用 check_cancel 的间隔 (秒)
+_POLL_INTERVAL = 0.5
+
+
+def _island_main(conn, data: TimetableData, seed: int, pop_size: int, config: dict):
+    from .ga_engine import build_toolbox, evaluate_invalid, init_population, next_generation, improve_elite
+    CONFIG.update(config)
+    random.seed(seed)
+    toolbox = build_toolbox(data)
+    # 岛内已是独立进程, SEEDING = 'parallel' 时只沿用派生种子的构造方式, 不再嵌套进程池 (workers=1 即串行)
+    pop = init_population(data, toolbox, pop_size, workers=1)
+    gen = 0
+    try:
+        evaluate_invalid(pop, toolbox)
+        conn.send(('ready',))
+        while True:
+            msg = conn.recv()
+            if msg[0] == 'stop':
+                break
+            _, n_gens, immigrants, n_emigrants, remaining = msg
+            deadline = None if remaining is None else time.perf_counter() + remaining
+            if immigrants:
+                evaluate_invalid(pop, toolbox)
+                worst = sorted(range(len(pop)), key=lambda i: pop[i].fitness.values[0], reverse=True)
+                for i, (genes, fit) in zip(worst, immigrants):
+                    ind = creator.Individual(genes)
+                    ind.fitness.values = fit
+                    pop[i] = ind
+            best = None
+            ran = 0
+            for _ in range(n_gens):
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+                evaluate_invalid(pop, toolbox)
+                improve_elite(pop, toolbox, gen, deadline)
+                gen += 1
+                ran += 1
+                cur = tools.selBest(pop, 1)[0]
+                if best is None or cur.fitness.values[0] < best.fitness.values[0]:
+                    best = toolbox.clone(cur)
+                pop[:] = next_generation(pop, toolbox)
+            evaluate_invalid(pop, toolbox)
+            cur = tools.selBest(pop, 1)[0]
+            if best is None or cur.fitness.values[0] < best.fitness.values[0]:
+                best = toolbox.clone(cur)
+            emigrants = [(list(ind), ind.fitness.values) for ind in tools.selBest(pop, n_emigrants)]
+            ls_stats = toolbox.local_search.stats if toolbox.local_search is not None else None
+            conn.send((emigrants, list(best), best.fitness.values[0], ls_stats, ran))
+    finally:
+        conn.close()
+
+
+def _recv(conn, check_cancel):
+    if check_cancel is not None:
+        while not conn.poll(_POLL_INTERVAL):
+            check_cancel()
+    return conn.recv()
+
+
+def run_islands(data: TimetableData, pop_size: int, ngen: int, seed: int | None, n_islands: int,
+                migration_interval: int, migrants: int, verbose=1, ls_stats=None, budget=None,
+                telemetry=None, check_cancel=None) -> Tuple[List[tuple], float]:
+    """运行岛屿模型; pop_size 为每个岛的种群大小。返回 (全局最优基因, 适配度)。
+
+    ls_stats: 传入 memetic.LocalSearchStats 时合并各岛精英局部搜索的统计。
+    budget: budget.TimeBudget; 按每代耗时估计缩短纪元 (首个纪元 1 代), 预算内一代都跑不完时停止;
+            各岛另按剩余秒数在代间与局部搜索中截止。
+    telemetry: telemetry.GATelemetry; 每个迁移纪元输出一条记录 (全局最优与各岛最优)。
+    check_cancel: 等待各岛期间周期性调用, 抛出异常时立即终止各岛进程并向上传播。
+    """
+    master = random.Random(seed)
+    seeds = [master.randrange(2**31) for _ in range(n_islands)]
+    ctx = multiprocessing.get_context()
+    conns, procs = [], []
+    for sd in seeds:
+        parent, child = ctx.Pipe()
+        p = ctx.Process(target=_island_main, args=(child, data, sd, pop_size, dict(CONFIG)), daemon=True)
+        p.start()
+        child.close()
+        conns.append(parent)
+        procs.append(p)
+    if verbose:
+        print(f'[INFO] 岛屿模型: islands={n_islands} 每岛 pop={pop_size} 迁移间隔={migration_interval} 迁移数={migrants}')
+    best_genes, best_fit = None, float('inf')
+    patience = CONFIG.get('EARLY_STOP_PATIENCE', None)
+    no_improve = 0
+    immigrants: List[list] = [[] for _ in range(n_islands)]
+    done = 0
+    island_stats = [None] * n_islands
+    limited = budget is not None and budget.limited
+    try:
+        # 等各岛完成初始种群, 避免把进程启动与种群构造计入首个纪元的每代耗时
+        for conn in conns:
+            _recv(conn, check_cancel)
+        t_start = time.perf_counter()
+        if budget is not None:
+            budget.mark()
+        while done < ngen:
+            step = min(migration_interval, ngen - done)
+            if limited:
+                # 尚无每代耗时估计时 gens_left 为 1: 首个纪元只跑 1 代
+                left = budget.gens_left()
+                if left < 1:
+                    if best_genes is not None:
+                        if verbose:
+                            print(f'[INFO] 时间预算用尽: 已完成 {done} 代')
+                        break
+                    # 尚无结果: 只收回各岛当前最优
+                    left = 0
+                step = min(step, left)
+            remaining = max(budget.remaining(), 0.0) if limited else None
+            for i, conn in enumerate(conns):
+                conn.send(('run', step, immigrants[i], migrants, remaining))
+            results = [_recv(conn, check_cancel) for conn in conns]
+            ran = max(r[4] for r in results)
+            done += ran
+            if budget is not None:
+                budget.record(ran)
+            improved = False
+            for i, (emigrants, genes, fit, stats, _) in enumerate(results):
+                island_stats[i] = stats
+                if fit < best_fit:
+                    best_genes, best_fit = genes, fit
+                    improved = True
+            no_improve = 0 if improved else no_improve + ran
+            # 环形迁移: 岛 i 接收岛 i-1 的最优个体
+            immigrants = [results[i - 1][0] for i in range(n_islands)]
+            if telemetry is not None and telemetry.enabled:
+                telemetry.emit({
+                    'gen': done - 1, 'ngen': ngen, 'elapsed_s': round(time.perf_counter() - t_start, 6),
+                    'best_so_far': best_fit, 'island_best': [r[2] for r in results],
+                })
+            if verbose >= 2:
+                island_best = ', '.join(f'{r[2]}' for r in results)
+                print(f'[INFO] Gen {done} best={best_fit} 各岛=[{island_best}]')
+            if patience is not None and no_improve >= patience:
+                if verbose:
+                    print(f'[INFO] 早停: 全局连续 {no_improve} 代无改进')
+                break
+            if ran < step or step == 0:
+                # 岛内已到截止时间
+                if verbose:
+                    print(f'[INFO] 时间预算用尽: 已完成 {done} 代')
+                break
+    except BaseException:
+        # 取消或出错: 各岛可能正在纪元中途, 不再等待其响应 stop
+        for p in procs:
+            p.terminate()
+        raise
+    finally:
+        for conn in conns:
+            try:
+                conn.send(('stop',))
+            except Exception:
+                pass
+        for p in procs:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+    if ls_stats is not None:
+        for stats in island_stats:
+            if stats is not None:
+                ls_stats.merge(stats)
+    return best_genes, best_fit
@@ -0,0 +1,213 @@
+"""后台 GA 作业
+
+包含:
+1. JobRunner: 本机进程式作业管理 — submit / status / cancel / list_jobs
+2. _job_main: 子进程入口 (spawn), 调用 run_scheduler 并把进度写入状态文件
+
+每个作业一个状态文件 <jobs_dir>/<job_id>.json (原子替换写入), 字段:
+  job_id / owner / status (running / done / failed / cancelled) / progress {gen, ngen, best_so_far}
+  result_path / metrics (hard_ok, total_fitness) / error / created / updated
+取消: 写入 <job_id>.cancel 标记, 作业通过 run_scheduler(check_cancel=...) 在每代、岛屿模型/分组求解等待结果期间
+      与最终局部搜索中检查并退出; force=True 时直接终止进程。
+状态: 有本进程的进程句柄时按句柄判断退出; 没有句柄 (如界面服务重启后) 时按状态文件中的 pid 判断进程是否存活。
+结果先导出到临时文件, 完成后在 FileLock 保护下原子替换到 result_path (与界面原有交接方式一致)。
+
+作业进程以 spawn 方式启动且非 daemon, 因此可继续使用 --workers 进程池 / 岛屿模型;
+Streamlit 脚本重跑不会中断作业, 界面只需按 job_id 轮询状态。
+"""
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+import traceback
+import uuid
+from typing import Any, Dict, List, Optional
+
+from .config import CONFIG
+
+__all__ = [
+    'JobRunner',
+    'JobCancelled',
+    'ACTIVE_STATES',
+]
+
+ACTIVE_STATES = ('running',)
+# 进度写盘的最小间隔 (秒)
+_PROGRESS_INTERVAL = 0.5
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def _write_json(path: str, payload: Dict[str, Any]):
+    d = os.path.dirname(path)
+    fd, tmp = tempfile.mkstemp(dir=d, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, default=str)
+    os.replace(tmp, path)
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _job_main(status_path: str, cancel_path: str, result_path: str, kwargs: Dict[str, Any], config: dict):
+    # spawn 子进程中 CONFIG 为默认值, 同步提交时的覆盖参数
+    CONFIG.update(config)
+    state = _read_json(status_path) or {}
+    last_write = [0.0]
+
+    def update(**fields):
+        state.update(fields)
+        state['updated'] = time.time()
+        _write_json(status_path, state)
+
+    def check_cancel():
+        if os.path.exists(cancel_path):
+            raise JobCancelled()
+
+    def on_generation(rec):
+        now = time.perf_counter()
+        if now - last_write[0] >= _PROGRESS_INTERVAL:
+            last_write[0] = now
+            update(progress={'gen': rec.get('gen'), 'ngen': rec.get('ngen'), 'best_so_far': rec.get('best_so_far')})
+
+    root, ext = os.path.splitext(result_path)
+    tmp_result = f'{root}.{state.get("job_id", "job")}.tmp{ext or ".xlsx"}'
+    update(status='running', pid=os.getpid())
+    try:
+        from filelock import FileLock
+        from .ga_engine import run_scheduler
+        _, metrics = run_scheduler(excel_out=tmp_result, on_generation=on_generation, check_cancel=check_cancel,
+                                   **kwargs)
+        with FileLock(result_path + '.lock'):
+            os.replace(tmp_result, result_path)
+        update(status='done', result_path=result_path,
+               metrics={'hard_ok': bool(metrics['hard_ok']), 'total_fitness': float(metrics['total_fitness'])})
+    except JobCancelled:
+        update(status='cancelled')
+    except BaseException as e:
+        update(status='failed', error=f'{type(e).__name__}: {e}', traceback=traceback.format_exc(limit=20))
+    finally:
+        if os.path.exists(tmp_result):
+            try:
+                os.remove(tmp_result)
+            except OSError:
+                pass
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == 'nt':
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        code = ctypes.c_ulong()
+        ok = kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+        kernel32.CloseHandle(handle)
+        return bool(ok) and code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobRunner:
+    """作业管理器; 同一进程内按目录共享 (见 JobRunner.shared)。"""
+
+    _shared: Dict[str, 'JobRunner'] = {}
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._procs: Dict[str, multiprocessing.process.BaseProcess] = {}
+        self._ctx = multiprocessing.get_context('spawn')
+
+    @classmethod
+    def shared(cls, directory: str) -> 'JobRunner':
+        """按目录复用同一实例 (Streamlit 各会话/重跑共享进程句柄)。"""
+        key = os.path.abspath(directory)
+        runner = cls._shared.get(key)
+        if runner is None:
+            runner = cls._shared[key] = cls(directory)
+        return runner
+
+    def _status_path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f'{job_id}.json')
+
+    def _cancel_path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f'{job_id}.cancel')
+
+    def submit(self, result_path: str, owner: str | None = None, **kwargs) -> str:
+        """提交作业, kwargs 原样传给 run_scheduler (excel_out / on_generation 由作业设置)。返回 job_id。"""
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        _write_json(self._status_path(job_id), {
+            'job_id': job_id, 'owner': owner, 'status': 'running', 'progress': {},
+            'result_path': result_path, 'params': kwargs, 'created': now, 'updated': now,
+        })
+        proc = self._ctx.Process(
+            target=_job_main,
+            args=(self._status_path(job_id), self._cancel_path(job_id), result_path, kwargs, dict(CONFIG)),
+            daemon=False,
+        )
+        proc.start()
+        self._procs[job_id] = proc
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        st = _read_json(self._status_path(job_id))
+        if st is None:
+            return None
+        proc = self._procs.get(job_id)
+        if proc is not None:
+            if proc.is_alive():
+                return st
+            proc.join(timeout=0)
+            self._procs.pop(job_id, None)
+            reason = f'作业进程意外退出 (exitcode={proc.exitcode})'
+        elif st.get('status') in ACTIVE_STATES and st.get('pid') and not _pid_alive(st['pid']):
+            reason = f'作业进程已不存在 (pid={st["pid"]})'
+        else:
+            return st
+        # 进程已退出但状态未落定: 被终止或崩溃
+        st = _read_json(self._status_path(job_id)) or st
+        if st.get('status') in ACTIVE_STATES:
+            st['status'] = 'cancelled' if os.path.exists(self._cancel_path(job_id)) else 'failed'
+            st.setdefault('error', reason)
+            st['updated'] = time.time()
+            _write_json(self._status_path(job_id), st)
+        return st
+
+    def cancel(self, job_id: str, force: bool = False):
+        with open(self._cancel_path(job_id), 'w', encoding='utf-8') as f:
+            f.write(str(time.time()))
+        proc = self._procs.get(job_id)
+        if force and proc is not None and proc.is_alive():
+            proc.terminate()
+
+    def list_jobs(self, owner: str | None = None) -> List[Dict[str, Any]]:
+        jobs = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            st = self.status(name[:-5])
+            if st is not None and (owner is None or st.get('owner') == owner):
+                jobs.append(st)
+        jobs.sort(key=lambda j: j.get('created', 0), reverse=True)
+        return jobs
+
+    def running(self) -> int:
+        return sum(1 for job_id in list(self._procs) if self._procs[job_id].is_alive())
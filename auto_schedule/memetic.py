@@ -0,0 +1,230 @@
+"""模因局部搜索 (memetic local search)
+
+包含:
+1. LocalSearch: 对单个个体做邻域搜索, 邻域为
+   move    — 某块换到本班另一可用时间下标
+   swap    — 同班两块互换时间下标 (班级时间线顺序调整, 针对先修/前置类软约束)
+   teacher — 重新指派教师 (优先取同班同课其它块的教师, 针对 teacher_switch_penalty)
+   策略: hill (首次改进爬山) / tabu (每步取采样邻域中最优的非禁忌移动, 允许变差, 记录历史最优)
+2. LocalSearchStats: 按阶段 (elite: 每代精英 / final: 最终最优) 与邻域统计尝试数、接受数与适配度改进量
+
+每次候选移动通过 incremental.EvalState.apply 做增量评估, 不接受时再 apply 旧基因回滚,
+代价只与受影响时段/班级规模相关。CONFIG['LOCAL_SEARCH'] 选择策略 (none 关闭)。
+"""
+from __future__ import annotations
+
+import random
+import time
+from collections import deque
+from typing import Dict, List, Tuple
+
+from .config import CONFIG
+from .data_model import TimetableData
+from .incremental import IncrementalEvaluator
+
+__all__ = [
+    'LocalSearch',
+    'LocalSearchStats',
+    'NEIGHBORHOODS',
+]
+
+NEIGHBORHOODS = ('move', 'swap', 'teacher')
+
+
+class LocalSearchStats:
+    """各阶段 / 邻域的尝试数、接受数与累计改进量 (改进量为适配度下降值, 正数为变好)。"""
+
+    def __init__(self):
+        self.calls: Dict[str, int] = {}
+        self.gain: Dict[str, float] = {}
+        self.tried: Dict[Tuple[str, str], int] = {}
+        self.accepted: Dict[Tuple[str, str], int] = {}
+        self.move_gain: Dict[Tuple[str, str], float] = {}
+
+    def record_call(self, stage: str, gain: float):
+        self.calls[stage] = self.calls.get(stage, 0) + 1
+        self.gain[stage] = self.gain.get(stage, 0) + gain
+
+    def record_move(self, stage: str, kind: str, accepted: bool, gain: float):
+        key = (stage, kind)
+        self.tried[key] = self.tried.get(key, 0) + 1
+        if accepted:
+            self.accepted[key] = self.accepted.get(key, 0) + 1
+            self.move_gain[key] = self.move_gain.get(key, 0) + gain
+
+    def merge(self, other: 'LocalSearchStats'):
+        for src, dst in ((other.calls, self.calls), (other.gain, self.gain), (other.tried, self.tried),
+                         (other.accepted, self.accepted), (other.move_gain, self.move_gain)):
+            for k, v in src.items():
+                dst[k] = dst.get(k, 0) + v
+
+    def summary(self) -> List[str]:
+        lines = []
+        for stage in sorted(self.calls):
+            parts = []
+            for kind in NEIGHBORHOODS:
+                key = (stage, kind)
+                if key in self.tried:
+                    parts.append(f"{kind}={self.accepted.get(key, 0)}/{self.tried[key]}(-{self.move_gain.get(key, 0):g})")
+            lines.append(f"{stage}: 调用={self.calls[stage]} 改进={self.gain[stage]:g} " + ' '.join(parts))
+        return lines
+
+
+class LocalSearch:
+    """局部搜索器; 每个 TimetableData / 进程构建一次。"""
+
+    def __init__(self, data: TimetableData, mode: str | None = None, evaluator: IncrementalEvaluator | None = None):
+        self.data = data
+        self.mode = mode or CONFIG.get('LOCAL_SEARCH', 'none')
+        if self.mode not in ('hill', 'tabu'):
+            raise ValueError(f"未知局部搜索策略: {self.mode}")
+        self.ev = evaluator or IncrementalEvaluator(data)
+        self.tenure = CONFIG.get('LS_TABU_TENURE', 10)
+        self.sample = CONFIG.get('LS_TABU_SAMPLE', 20)
+        self.stats = LocalSearchStats()
+        self.deadline: float | None = None
+        self.check_cancel = None
+        self.course_two = self.ev.course_two
+        self.course_theory = {c: v.get('is_theory', False) for c, v in data.COURSE_DATA.items()}
+        self.teachers = {c: list(dict.fromkeys(v['available_teachers'])) for c, v in data.COURSE_DATA.items()}
+
+    # ---- 邻域 ----
+    def _propose(self, genes, by_class: Dict[str, List[int]], by_key: Dict[Tuple[str, str], List[int]]):
+        """随机生成一个候选移动, 返回 (邻域名, {下标: 新基因}) 或 None。"""
+        i = random.randrange(len(genes))
+        cid, course, t1, t2, idx = genes[i]
+        kind = random.choice(NEIGHBORHOODS)
+        if kind == 'move':
+            cands = self.data.CLASS_SLOT_CACHE.get(cid)
+            if not cands:
+                return None
+            new_idx = random.choice(cands)
+            if new_idx == idx:
+                return None
+            return kind, {i: (cid, course, t1, t2, new_idx)}
+        if kind == 'swap':
+            members = by_class[cid]
+            if len(members) < 2:
+                return None
+            j = random.choice(members)
+            g = genes[j]
+            if j == i or g[4] == idx or g[1] == course:
+                return None
+            return kind, {i: (cid, course, t1, t2, g[4]), j: (g[0], g[1], g[2], g[3], idx)}
+        # teacher: 理论单师固定第一教师, 不参与
+        is_two = self.course_two.get(course, False)
+        if self.course_theory.get(course, False) and not is_two:
+            return None
+        pool = self.teachers.get(course, [])
+        if is_two:
+            if len(pool) < 2:
+                return None
+            ta, tb = random.sample(pool, 2)
+        else:
+            siblings = by_key[(cid, course)]
+            # 一半概率沿用同班同课另一块的教师, 直接消除教师切换
+            if len(siblings) > 1 and random.random() < 0.5:
+                ta = genes[random.choice(siblings)][2]
+            else:
+                ta = random.choice(pool) if pool else None
+            tb = None
+        if ta is None or (ta == t1 and tb == t2):
+            return None
+        return kind, {i: (cid, course, ta, tb, idx)}
+
+    # ---- 搜索 ----
+    def improve(self, genes, steps: int, stage: str = 'elite', deadline: float | None = None, check_cancel=None):
+        """对基因列表做 steps 次候选移动, 返回 (改进后的基因列表, 适配度, 改进量)。
+
+        deadline 为 time.perf_counter() 截止时刻, 到期后提前结束;
+        check_cancel 与查时钟同频调用, 抛出的异常原样向上传播。
+        """
+        self.deadline = deadline
+        self.check_cancel = check_cancel
+        state = self.ev.new_state(genes)
+        start = cur = state.total()
+        by_class: Dict[str, List[int]] = {}
+        by_key: Dict[Tuple[str, str], List[int]] = {}
+        for i, g in enumerate(state.genes):
+            by_class.setdefault(g[0], []).append(i)
+            by_key.setdefault((g[0], g[1]), []).append(i)
+        if not state.genes:
+            return list(state.genes), cur, 0
+        if self.mode == 'hill':
+            best_genes, best = self._hill(state, cur, steps, stage, by_class, by_key)
+        else:
+            best_genes, best = self._tabu(state, cur, steps, stage, by_class, by_key)
+        gain = start - best
+        self.stats.record_call(stage, gain)
+        return best_genes, best, gain
+
+    def _expired(self, n):
+        # 每 64 步查一次时钟 (及取消标记)
+        if n % 64:
+            return False
+        if self.check_cancel is not None:
+            self.check_cancel()
+        return self.deadline is not None and time.perf_counter() >= self.deadline
+
+    def _try(self, state, changes):
+        """应用移动并返回 (新适配度, 回滚用的旧基因)。"""
+        old = {i: state.genes[i] for i in changes}
+        state.apply(changes)
+        return state.total(), old
+
+    def _hill(self, state, cur, steps, stage, by_class, by_key):
+        genes = state.genes
+        for n in range(steps):
+            if self._expired(n):
+                break
+            prop = self._propose(genes, by_class, by_key)
+            if prop is None:
+                continue
+            kind, changes = prop
+            fit, old = self._try(state, changes)
+            if fit < cur:
+                self.stats.record_move(stage, kind, True, cur - fit)
+                cur = fit
+            else:
+                self.stats.record_move(stage, kind, False, 0)
+                state.apply(old)
+        return list(genes), cur
+
+    def _tabu(self, state, cur, steps, stage, by_class, by_key):
+        genes = state.genes
+        best, best_genes = cur, list(genes)
+        tabu = deque(maxlen=self.tenure)
+        done = 0
+        while done < steps:
+            # 每批采样查一次时钟
+            if self._expired(0):
+                break
+            chosen = None
+            for _ in range(self.sample):
+                done += 1
+                prop = self._propose(genes, by_class, by_key)
+                if prop is None:
+                    continue
+                kind, changes = prop
+                fit, old = self._try(state, changes)
+                state.apply(old)
+                # 禁忌: 近期改动过的基因下标; 优于历史最优时特赦
+                if any(i in tabu for i in changes) and fit >= best:
+                    self.stats.record_move(stage, kind, False, 0)
+                    continue
+                if chosen is None or fit < chosen[0]:
+                    if chosen is not None:
+                        self.stats.record_move(stage, chosen[1], False, 0)
+                    chosen = (fit, kind, changes)
+                else:
+                    self.stats.record_move(stage, kind, False, 0)
+            if chosen is None:
+                continue
+            fit, kind, changes = chosen
+            state.apply(changes)
+            tabu.extend(changes)
+            self.stats.record_move(stage, kind, True, max(0, cur - fit))
+            cur = fit
+            if cur < best:
+                best, best_genes = cur, list(genes)
+        return best_genes, best
@@ -0,0 +1,82 @@
+"""进程池并行评估
+
+包含:
+1. EvaluationPool: 多进程评估池, TimetableData 通过 initializer 在每个工作进程只传输一次
+2. evaluate_in_worker: 工作进程内的评估函数 (注册为 toolbox.evaluate)
+EvaluationPool.generate 复用同一批工作进程并行构造初始种群 (CONFIG['SEEDING'] = 'parallel')。
+
+run_scheduler(workers=N) 时注册 toolbox.map = EvaluationPool.map。
+只向工作进程发送基因列表 (不带 fitness / 增量状态), 结果按输入顺序返回;
+评估本身不消耗随机数, 因此固定 seed 时结果与单进程完全一致。
+"""
+from __future__ import annotations
+
+import multiprocessing
+
+from .config import CONFIG
+from .data_model import TimetableData
+
+__all__ = [
+    'EvaluationPool',
+    'evaluate_in_worker',
+]
+
+_WORKER_EVALUATE = None
+_WORKER_DATA = None
+
+
+def _init_worker(data: TimetableData, backend: str | None, config: dict):
+    global _WORKER_EVALUATE, _WORKER_DATA
+    from .ga_engine import make_evaluator
+    # spawn 模式下子进程 CONFIG 为默认值, 同步主进程的覆盖参数
+    CONFIG.update(config)
+    _WORKER_DATA = data
+    _WORKER_EVALUATE = make_evaluator(data, backend)
+
+
+def evaluate_in_worker(genes):
+    return _WORKER_EVALUATE(genes)
+
+
+def _generate_in_worker(task):
+    from .seeding import generate_seeded
+    seed, order = task
+    return generate_seeded(_WORKER_DATA, seed, order)
+
+
+class EvaluationPool:
+    """评估进程池; map(func, individuals) 与内置 map 语义一致 (按序返回)。"""
+
+    def __init__(self, data: TimetableData, workers: int, backend: str | None = None):
+        backend = backend or CONFIG.get('EVAL_BACKEND', 'incremental')
+        if backend == 'incremental':
+            # 工作进程拿到的是无状态的基因列表, 增量状态无法复用; 改用整体向量化评估
+            backend = 'numpy'
+        self.workers = workers
+        self._pool = multiprocessing.get_context().Pool(
+            processes=workers,
+            initializer=_init_worker,
+            initargs=(data, backend, dict(CONFIG)),
+        )
+
+    def map(self, func, individuals):
+        batch = [list(ind) for ind in individuals]
+        if not batch:
+            return []
+        chunksize = max(1, len(batch) // (self.workers * 4))
+        return self._pool.map(func, batch, chunksize=chunksize)
+
+    def generate(self, tasks):
+        """并行构造初始个体; tasks 为 [(seed, order), ...], 按序返回基因列表 (见 seeding.generate_population)。"""
+        return self._pool.map(_generate_in_worker, tasks, chunksize=1)
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._pool.terminate()
+        self._pool.join()
@@ -0,0 +1,133 @@
+"""按教师连通分组分解求解
+
+包含:
+1. solve_partitioned: 对 TimetableData.CLASS_COMPONENTS 中的每组班级 (TimetableData.subset 子问题)
+   在进程池中独立求解, 合并为全量个体 (规范基因顺序)
+2. ENGINES: 子问题求解器 — ga (单种群 GA, 与不分解时相同的算子/局部搜索) / construct (构造 pop_size 个个体取最优)
+
+组间没有共同可授教师, 教师冲突/班级冲突/班级时间线软约束互不影响;
+教师负载均衡 (全体教师 max-min) 与跨班级的连排奖励判定是全局量, 各组只在组内优化,
+合并后由 run_scheduler 在全量数据上重新评分。
+各组种子由主种子派生, 结果与进程数无关。子进程中初始种群固定串行构造 (进程池工作进程不能再建进程池)。
+"""
+from __future__ import annotations
+
+import math
+import multiprocessing
+import os
+import random
+import time
+from typing import Callable, Dict, List, Tuple
+
+from .config import CONFIG, config_scope
+from .data_model import TimetableData
+from .budget import TimeBudget
+
+__all__ = [
+    'ENGINES',
+    'solve_partitioned',
+]
+
+
+def _solve_ga(sub: TimetableData, pop_size: int, ngen: int, budget: TimeBudget, check_cancel=None):
+    from .ga_engine import _evolve_single
+    best, _, stats = _evolve_single(sub, pop_size, ngen, verbose=0, workers=None, budget=budget,
+                                    check_cancel=check_cancel)
+    return list(best), stats
+
+
+def _solve_construct(sub: TimetableData, pop_size: int, ngen: int, budget: TimeBudget, check_cancel=None):
+    from .ga_engine import generate_individual, make_evaluator
+    evaluate = make_evaluator(sub, 'full')
+    best, best_fit = None, float('inf')
+    for _ in range(max(1, pop_size)):
+        if best is not None and budget.expired():
+            break
+        if check_cancel is not None:
+            check_cancel()
+        genes = generate_individual(sub)
+        fit = evaluate(genes)[0]
+        if fit < best_fit:
+            best, best_fit = genes, fit
+    return best, None
+
+
+# 进程池模式下等待结果时调用 check_cancel 的间隔 (秒)
+_POLL_INTERVAL = 0.5
+
+ENGINES: Dict[str, Callable] = {
+    'ga': _solve_ga,
+    'construct': _solve_construct,
+}
+
+
+def _component_main(task, check_cancel=None):
+    index, sub, engine, pop_size, ngen, seed, time_limit, config = task
+    with config_scope(dict(config, SEEDING='serial')):
+        random.seed(seed)
+        t0 = time.perf_counter()
+        genes, stats = ENGINES[engine](sub, pop_size, ngen, TimeBudget(time_limit), check_cancel)
+        from .ga_engine import make_evaluator
+        fit = make_evaluator(sub, 'full')(genes)[0]
+        return index, genes, fit, stats, time.perf_counter() - t0
+
+
+def _next_result(it, check_cancel):
+    if check_cancel is None:
+        return next(it)
+    while True:
+        try:
+            return it.next(timeout=_POLL_INTERVAL)
+        except multiprocessing.TimeoutError:
+            check_cancel()
+
+
+def solve_partitioned(data: TimetableData, pop_size: int, ngen: int, seed: int | None, engine: str = 'ga',
+                      workers: int | None = None, verbose=1, ls_stats=None,
+                      budget: TimeBudget | None = None, check_cancel=None) -> List[tuple]:
+    """分组求解并合并, 返回全量基因列表 (规范顺序)。
+
+    workers: 进程数 (默认 CPU 核数, 不超过分组数; 1 为当前进程串行)。
+    budget: 剩余时间按 "轮数 = ceil(分组数 / 进程数)" 均分给每个分组。
+    ls_stats: 传入 memetic.LocalSearchStats 时合并各组精英局部搜索统计。
+    check_cancel: 串行时在各组每代调用, 进程池时在等待结果期间每 _POLL_INTERVAL 秒调用;
+                  抛出异常即中止 (退出 with 时终止进程池)。
+    """
+    from .crossover import canonicalize
+    if engine not in ENGINES:
+        raise ValueError(f'未知分组求解器: {engine}')
+    comps = data.CLASS_COMPONENTS
+    master = random.Random(seed)
+    seeds = [master.randrange(2**31) for _ in comps]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(comps)))
+    per_task = None
+    if budget is not None and budget.limited:
+        per_task = max(budget.remaining(), 0.0) / math.ceil(len(comps) / workers)
+    config = dict(CONFIG)
+    # 大组先提交, 减少尾部等待
+    tasks = [(i, data.subset(cids), engine, pop_size, ngen, seeds[i], per_task, config) for i, cids in enumerate(comps)]
+    if verbose:
+        sizes = ', '.join(str(len(c)) for c in comps)
+        print(f'[INFO] 按教师连通分组求解: {len(comps)} 组 (班级数 {sizes}), engine={engine} workers={workers}')
+    results: List[Tuple] = [None] * len(comps)
+    if workers > 1:
+        with multiprocessing.get_context().Pool(processes=workers) as pool:
+            it = pool.imap_unordered(_component_main, tasks)
+            for _ in tasks:
+                res = _next_result(it, check_cancel)
+                results[res[0]] = res
+    else:
+        for task in tasks:
+            res = _component_main(task, check_cancel)
+            results[res[0]] = res
+    merged = []
+    for index, genes, fit, stats, elapsed in results:
+        merged.extend(genes)
+        if ls_stats is not None and stats is not None:
+            ls_stats.merge(stats)
+        if verbose >= 2:
+            print(f'[INFO] 分组 {index}: 班级={len(comps[index])} 基因={len(genes)} 适配度={fit} 耗时={elapsed:.2f}s')
+    if verbose:
+        total = sum(r[2] for r in results)
+        print(f'[INFO] 分组求解完成: 各组适配度之和={total}')
+    return canonicalize(merged, data)
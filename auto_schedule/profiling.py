@@ -0,0 +1,216 @@
+"""性能剖析 (--profile)
+
+包含:
+1. Profiler: cProfile + 分阶段累计计时 (次数 / 总耗时), 输出汇总表、.pstats 与折叠栈文件
+2. phase / instrument: 供 ga_engine 打点; 未启用 Profiler 时为空操作, 不影响正常运行
+
+阶段:
+  load             TimetableData 加载
+  init_population  初始种群构造
+  select / clone   选择 / toolbox.clone
+  mate             交叉 (toolbox.mate, 见 crossover.make_crossover)
+  mutate / repair  变异 / 变异后修复 (repair_mutated -> repair_individual)
+  evaluate         适配度评估 (toolbox.evaluate; 并行评估时为 toolbox.map 的等待时间)
+  local_search     精英与最终局部搜索
+  self_check       quick_self_check
+  export           导出 Excel
+阶段可能嵌套 (如 init_population 内部的 evaluate 不单独计入), 占比按总墙钟时间计算。
+
+折叠栈 (<prefix>.collapsed) 由 cProfile 调用图按调用边耗时比例展开得到, 每行 "f1;f2;f3 微秒",
+可直接交给 flamegraph.pl / speedscope / inferno。cProfile 只记录当前进程,
+--workers / --islands 时子进程中的工作表现为主进程中的等待时间。
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import os
+import pstats
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+__all__ = [
+    'Profiler',
+    'phase',
+    'instrument',
+    'active',
+    'collapsed_stacks',
+]
+
+_ACTIVE: Optional['Profiler'] = None
+
+
+def active() -> Optional['Profiler']:
+    return _ACTIVE
+
+
+@contextmanager
+def phase(name: str):
+    prof = _ACTIVE
+    if prof is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        prof.add(name, time.perf_counter() - t0)
+
+
+def instrument(toolbox, names: Iterable[str], label: str | None = None):
+    """把 toolbox 上的函数替换为计时包装 (未启用 Profiler 时不做任何事)。
+
+    label: 统一记入的阶段名 (默认与属性名相同)。
+    """
+    prof = _ACTIVE
+    if prof is None:
+        return toolbox
+    for name in names:
+        fn = getattr(toolbox, name, None)
+        if fn is not None and not getattr(fn, '_profiled', False):
+            setattr(toolbox, name, prof.wrap(label or name, fn))
+    return toolbox
+
+
+class Profiler:
+    """with Profiler() as prof: ...; 之后 prof.report() / prof.write(prefix)。"""
+
+    def __init__(self, cprofile: bool = True):
+        self.totals: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.wall = 0.0
+        self._cprof = cProfile.Profile() if cprofile else None
+        self._t0 = None
+
+    def add(self, name: str, seconds: float):
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def wrap(self, name: str, fn: Callable) -> Callable:
+        add = self.add
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            t0 = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                add(name, clock() - t0)
+        # 各阶段包装使用独立的代码对象, cProfile / 折叠栈中显示为 phase:<name> 而非同一个 timed
+        timed.__code__ = timed.__code__.replace(co_name=f'phase:{name}')
+        timed._profiled = True
+        timed.__wrapped__ = fn
+        return timed
+
+    def __enter__(self):
+        global _ACTIVE
+        _ACTIVE = self
+        self._t0 = time.perf_counter()
+        if self._cprof is not None:
+            self._cprof.enable()
+        return self
+
+    def __exit__(self, *exc):
+        global _ACTIVE
+        if self._cprof is not None:
+            self._cprof.disable()
+        self.wall += time.perf_counter() - self._t0
+        _ACTIVE = None
+        return False
+
+    def stats(self) -> Optional[pstats.Stats]:
+        if self._cprof is None:
+            return None
+        return pstats.Stats(self._cprof)
+
+    def phase_rows(self) -> List[Tuple[str, int, float, float, float]]:
+        """(阶段, 次数, 总耗时秒, 平均毫秒, 占墙钟%) 按总耗时降序。"""
+        rows = []
+        for name, total in sorted(self.totals.items(), key=lambda kv: -kv[1]):
+            n = self.calls.get(name, 0)
+            rows.append((name, n, total, total / n * 1000 if n else 0.0, total / self.wall * 100 if self.wall else 0.0))
+        return rows
+
+    def report(self, top: int = 25) -> str:
+        out = io.StringIO()
+        out.write(f'总墙钟时间: {self.wall:.3f}s\n')
+        out.write(f"{'阶段':<16}{'次数':>10}{'总耗时s':>12}{'平均ms':>12}{'占比%':>9}\n")
+        for name, n, total, mean_ms, pct in self.phase_rows():
+            out.write(f'{name:<16}{n:>10}{total:>12.3f}{mean_ms:>12.3f}{pct:>9.1f}\n')
+        st = self.stats()
+        if st is not None and top:
+            out.write(f'\ncProfile 累计耗时前 {top} 项:\n')
+            st.stream = out
+            st.sort_stats('cumulative').print_stats(top)
+        return out.getvalue()
+
+    def write(self, prefix: str) -> List[str]:
+        """写出 <prefix>.txt (汇总表) / .pstats / .collapsed, 返回文件列表。"""
+        d = os.path.dirname(prefix)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        paths = [prefix + '.txt']
+        with open(paths[0], 'w', encoding='utf-8') as f:
+            f.write(self.report())
+        st = self.stats()
+        if st is not None:
+            paths.append(prefix + '.pstats')
+            st.dump_stats(paths[-1])
+            paths.append(prefix + '.collapsed')
+            with open(paths[-1], 'w', encoding='utf-8') as f:
+                for stack, us in sorted(collapsed_stacks(st).items()):
+                    f.write(f'{stack} {us}\n')
+        return paths
+
+
+def _frame(func: Tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == '~':
+        label = name
+    else:
+        label = f'{os.path.basename(filename)}:{name}:{line}'
+    return label.replace(';', ',').replace(' ', '_')
+
+
+def collapsed_stacks(st: pstats.Stats, max_depth: int = 64, min_us: int = 1) -> Dict[str, int]:
+    """由 cProfile 调用图展开折叠栈 {"a;b;c": 自身耗时微秒}。
+
+    cProfile 只记录 调用者 -> 被调用者 的边, 同一函数在不同调用路径上的自身耗时
+    按该路径调用边的累计耗时占比分摊; 递归 (路径中已出现) 的边不再展开。
+    """
+    raw = st.stats  # func -> (cc, nc, tt, ct, callers{caller: (cc, nc, tt, ct)})
+    children: Dict[tuple, List[Tuple[tuple, float]]] = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            if caller != func:
+                children.setdefault(caller, []).append((func, edge[3]))
+    out: Dict[str, int] = {}
+
+    def visit(func, frames: List[str], seen: set, share: float):
+        _, _, tt, ct, _ = raw[func]
+        own = int(tt * share * 1e6)
+        path = ';'.join(frames)
+        if own >= min_us:
+            out[path] = out.get(path, 0) + own
+        if len(frames) >= max_depth:
+            return
+        for child, edge_ct in children.get(func, ()):
+            if child in seen:
+                continue
+            child_ct = raw[child][3]
+            if not child_ct:
+                continue
+            child_share = edge_ct * share / child_ct
+            if edge_ct * share * 1e6 < min_us:
+                continue
+            seen.add(child)
+            frames.append(_frame(child))
+            visit(child, frames, seen, min(child_share, 1.0))
+            frames.pop()
+            seen.discard(child)
+
+    for func, (_, _, _, _, callers) in raw.items():
+        if not callers or set(callers) == {func}:
+            visit(func, [_frame(func)], {func}, 1.0)
+    return out
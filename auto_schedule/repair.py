@@ -0,0 +1,261 @@
+"""修复算子 (未排基因重新落位)
+
+包含:
+1. Occupancy: 挂在个体上的占用状态 (班级×下标 计数 / 全局时段教师位图 / 未排基因下标集合),
+   与基因快照逐位比较后只增删变化的基因; 克隆时按引用共享, 首次修改时复制 (与 incremental.EvalState 相同)
+2. RepairEngine: repair(individual, max_pass) 把未排基因 (idx < 0 或缺第一教师) 放到随机的可行时段,
+   返回修复数量并累计到 RepairStats
+3. repair_engine: 每个 TimetableData 一个默认引擎 (缓存在 data 上)
+
+候选时段先在 data.CLASS_SLOT_CACHE 中随机抽样若干次, 都不可行时再对班级空闲的候选按随机排列完整扫描,
+两种方式得到的都是可行时段中的均匀随机一个; 同一轮内 (班级, 课程) 扫描失败后不再重复扫描; 不打乱、不修改 CLASS_SLOT_CACHE 本身。
+状态以列表/位图存放, 写时复制只需几次连续内存拷贝; 变异 + 修复之间不再整体重建占用。
+"""
+from __future__ import annotations
+
+import random
+from typing import Dict, List, Optional
+
+from .data_model import TimetableData
+from .teacher_pairs import teacher_pair_table
+
+__all__ = [
+    'Occupancy',
+    'RepairEngine',
+    'RepairStats',
+    'repair_engine',
+]
+
+_CACHE_ATTR = '_repair_engine'
+# 随机抽样尝试次数, 之后改为随机排列完整扫描
+_SAMPLE_TRIES = 8
+# 变化基因超过该比例时整体重建
+_REBUILD_RATIO = 0.5
+
+
+class RepairStats:
+    def __init__(self):
+        self.calls = 0
+        self.fixed = 0
+        self.unfixed = 0
+
+    def record(self, fixed: int, unfixed: int):
+        self.calls += 1
+        self.fixed += fixed
+        self.unfixed += unfixed
+
+    def snapshot(self) -> Dict[str, int]:
+        return {'calls': self.calls, 'fixed': self.fixed, 'unfixed': self.unfixed}
+
+    def summary(self) -> str:
+        return f'调用 {self.calls} 次, 修复基因 {self.fixed} 个, 仍未排 {self.unfixed} 个 (各次调用结束时累计)'
+
+
+class Occupancy:
+    """单个个体的占用状态。"""
+
+    __slots__ = ('engine', 'genes', 'cls', 'tmask', 'textra', 'unplaced', 'shares')
+
+    def __init__(self, engine: 'RepairEngine', individual=None):
+        self.engine = engine
+        self.shares = 0
+        if individual is not None:
+            self.rebuild(individual)
+
+    # ---- 克隆: 共享引用, 写时复制 ----
+    def __deepcopy__(self, memo):
+        self.shares += 1
+        return self
+
+    def copy(self) -> 'Occupancy':
+        st = Occupancy(self.engine)
+        st.genes = list(self.genes)
+        st.cls = {cid: list(v) for cid, v in self.cls.items()}
+        st.tmask = list(self.tmask)
+        st.textra = dict(self.textra)
+        st.unplaced = set(self.unplaced)
+        return st
+
+    def rebuild(self, individual):
+        eng = self.engine
+        self.genes = list(individual)
+        self.cls = {cid: [0] * n for cid, n in eng.class_len.items()}
+        self.tmask = [0] * eng.n_slots
+        self.textra = {}
+        self.unplaced = set()
+        for i, gene in enumerate(self.genes):
+            self._add(i, gene)
+
+    def sync(self, individual):
+        old = self.genes
+        if len(old) != len(individual):
+            self.rebuild(individual)
+            return
+        changed = [i for i, (a, b) in enumerate(zip(old, individual)) if a is not b]
+        if len(changed) > len(old) * _REBUILD_RATIO:
+            self.rebuild(individual)
+            return
+        for i in changed:
+            self.set(i, individual[i])
+
+    # ---- 单基因增删 ----
+    def set(self, i: int, gene):
+        self._remove(i)
+        self.genes[i] = gene
+        self._add(i, gene)
+
+    def _add(self, i: int, gene):
+        cid, _, t1, t2, idx = gene
+        if idx is None or idx < 0 or t1 is None:
+            self.unplaced.add(i)
+        if idx is None or idx < 0:
+            return
+        self.cls[cid][idx] += 1
+        s = self.engine.offset[cid] + idx
+        bit = self.engine.pairs.bit
+        for t in (t1, t2):
+            b = bit(t)
+            if not b:
+                continue
+            if self.tmask[s] & b:
+                key = (s, b)
+                self.textra[key] = self.textra.get(key, 0) + 1
+            else:
+                self.tmask[s] |= b
+
+    def _remove(self, i: int):
+        cid, _, t1, t2, idx = self.genes[i]
+        self.unplaced.discard(i)
+        if idx is None or idx < 0:
+            return
+        self.cls[cid][idx] -= 1
+        s = self.engine.offset[cid] + idx
+        bit = self.engine.pairs.bit
+        for t in (t1, t2):
+            b = bit(t)
+            if not b:
+                continue
+            key = (s, b)
+            extra = self.textra.get(key)
+            if extra:
+                if extra == 1:
+                    del self.textra[key]
+                else:
+                    self.textra[key] = extra - 1
+            else:
+                self.tmask[s] &= ~b
+
+
+class RepairEngine:
+    def __init__(self, data: TimetableData):
+        self.data = data
+        axis = data.SLOT_AXIS
+        self.pairs = teacher_pair_table(data)
+        self.offset = axis.class_offset
+        self.class_busy = axis.class_busy
+        self.n_slots = axis.n_slots
+        self.class_len = {cid: ((info['end_date'] - info['start_date']).days + 1) * 2 for cid, info in data.CLASSES.items()}
+        self.slots = data.CLASS_SLOT_CACHE
+        self.course_two = {c: v.get('is_two_teacher', False) for c, v in data.COURSE_DATA.items()}
+        # 理论单师固定第一教师, 其余每次修复时打乱顺序
+        self.fixed_teacher = {
+            c: (v.get('is_theory', False) and not v.get('is_two_teacher', False))
+            for c, v in data.COURSE_DATA.items()
+        }
+        self.teachers = {c: list(v['available_teachers']) for c, v in data.COURSE_DATA.items()}
+        self.stats = RepairStats()
+
+    def state_for(self, individual) -> Occupancy:
+        """取得与 individual 同步后的占用状态 (必要时新建或写时复制)。"""
+        state = getattr(individual, 'occ_state', None)
+        if state is None or state.engine is not self:
+            state = Occupancy(self, individual)
+        else:
+            if state.shares > 0:
+                state.shares -= 1
+                state = state.copy()
+            state.sync(individual)
+        try:
+            individual.occ_state = state
+        except AttributeError:
+            # 普通 list 无法挂属性, 每次新建
+            pass
+        return state
+
+    def _try(self, st: Occupancy, cid, course, idx, teachers, is_two):
+        s = self.offset[cid] + idx
+        if (self.class_busy.get(cid, 0) >> s) & 1 or st.cls[cid][idx]:
+            return None
+        occupied = st.tmask[s]
+        if is_two:
+            pair = self.pairs.first_pair(course, s, teachers, occupied)
+            if pair:
+                return (cid, course, pair[0], pair[1], idx)
+            return None
+        t = self.pairs.first_single(s, teachers, occupied)
+        if t is not None:
+            return (cid, course, t, None, idx)
+        return None
+
+    def _place(self, st: Occupancy, gene) -> Optional[tuple]:
+        cid, course = gene[0], gene[1]
+        cands: List[int] = self.slots.get(cid, [])
+        if not cands:
+            return None
+        teachers = self.teachers[course]
+        if self.fixed_teacher[course]:
+            teachers = teachers[:1]
+        else:
+            teachers = list(teachers)
+            random.shuffle(teachers)
+        is_two = self.course_two[course]
+        for _ in range(_SAMPLE_TRIES):
+            new = self._try(st, cid, course, random.choice(cands), teachers, is_two)
+            if new is not None:
+                return new
+        # 完整扫描只针对班级空闲的候选 (多数失败源于班级时段已满, 先批量过滤)
+        row = st.cls[cid]
+        free = [idx for idx in cands if not row[idx]]
+        random.shuffle(free)
+        for idx in free:
+            new = self._try(st, cid, course, idx, teachers, is_two)
+            if new is not None:
+                return new
+        return None
+
+    def repair(self, individual, max_pass: int = 2) -> int:
+        """原地修复未排基因, 返回修复数量。"""
+        st = self.state_for(individual)
+        fixed = 0
+        for _ in range(max_pass):
+            progress = False
+            # 本轮内占用只增不减: 某 (班级, 课程) 完整扫描失败后, 同组其余未落位基因也必然失败
+            failed = set()
+            for i in sorted(st.unplaced):
+                old = st.genes[i]
+                key = (old[0], old[1])
+                if key in failed and (old[4] is None or old[4] < 0):
+                    continue
+                # 先移出自身占用, 原时段也可作为候选
+                st.set(i, (old[0], old[1], None, None, -1))
+                new = self._place(st, old)
+                if new is None:
+                    st.set(i, old)
+                    failed.add(key)
+                    continue
+                st.set(i, new)
+                individual[i] = new
+                fixed += 1
+                progress = True
+            if not progress or not st.unplaced:
+                break
+        self.stats.record(fixed, len(st.unplaced))
+        return fixed
+
+
+def repair_engine(data: TimetableData) -> RepairEngine:
+    engine = getattr(data, _CACHE_ATTR, None)
+    if engine is None:
+        engine = RepairEngine(data)
+        setattr(data, _CACHE_ATTR, engine)
+    return engine
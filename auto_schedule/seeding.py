@@ -0,0 +1,105 @@
+"""初始种群构造
+
+包含:
+1. SeedCandidates: 每班预排序的候选时间下标 (理论课升序=靠前, 非理论课降序=靠后) 与基因受限程度,
+   每个 TimetableData 构建一次 (seed_candidates 缓存在 data 上)
+2. order_positions: 基因构造顺序; random (默认, 与原实现一致) / constrained (最受限优先)
+3. generate_population: 并行构造模式; 由主随机流为每个个体派生独立种子, 在进程池中生成,
+   结果只取决于主种子, 与进程数无关
+
+CONFIG['SEED_ORDER'] 选择构造顺序, CONFIG['SEEDING'] = 'parallel' 时 run_scheduler 使用 generate_population。
+"""
+from __future__ import annotations
+
+import random
+from math import comb
+from typing import Dict, List, Tuple
+
+from .config import CONFIG
+from .data_model import TimetableData
+from .parallel import EvaluationPool
+
+__all__ = [
+    'SeedCandidates',
+    'seed_candidates',
+    'order_positions',
+    'generate_seeded',
+    'generate_population',
+]
+
+_CACHE_ATTR = '_seed_candidates'
+
+
+class SeedCandidates:
+    def __init__(self, data: TimetableData):
+        self.ascending: Dict[str, List[int]] = {}
+        self.descending: Dict[str, List[int]] = {}
+        for cid, indices in data.CLASS_SLOT_CACHE.items():
+            self.ascending[cid] = sorted(indices)
+            self.descending[cid] = sorted(indices, reverse=True)
+        # 受限程度 = 班级可用时段数 × 教师选择数 (理论单师固定首位教师, 双师为教师组合数), 越小越受限
+        self.options: Dict[Tuple[str, str], int] = {}
+        for cid, info in data.CLASSES.items():
+            n_slots = len(data.CLASS_SLOT_CACHE.get(cid, []))
+            for course in info['courses']:
+                cinfo = data.COURSE_DATA[course]
+                n_teachers = len(set(cinfo['available_teachers']))
+                if cinfo.get('is_two_teacher', False):
+                    choices = comb(n_teachers, 2)
+                elif cinfo.get('is_theory', False):
+                    choices = 1
+                else:
+                    choices = n_teachers
+                self.options[(cid, course)] = n_slots * max(choices, 1)
+
+    def ordered(self, class_id: str, is_theory: bool) -> List[int]:
+        """只读的候选下标列表 (调用方不得原地修改)。"""
+        return (self.ascending if is_theory else self.descending).get(class_id, [])
+
+
+def seed_candidates(data: TimetableData) -> SeedCandidates:
+    cands = getattr(data, _CACHE_ATTR, None)
+    if cands is None:
+        cands = SeedCandidates(data)
+        setattr(data, _CACHE_ATTR, cands)
+    return cands
+
+
+def order_positions(positions: List[Tuple[str, str]], data: TimetableData, order: str | None = None):
+    """原地打乱 positions; constrained 时再按受限程度稳定排序 (同级内仍保持随机)。"""
+    order = order or CONFIG.get('SEED_ORDER', 'random')
+    random.shuffle(positions)
+    if order == 'constrained':
+        options = seed_candidates(data).options
+        positions.sort(key=lambda p: options[p])
+    elif order != 'random':
+        raise ValueError(f"未知构造顺序: {order}")
+    return positions
+
+
+def generate_seeded(data: TimetableData, seed: int, order: str | None = None) -> list:
+    """以独立种子构造一个个体, 不影响调用方的全局随机流。"""
+    from .ga_engine import generate_individual
+    state = random.getstate()
+    try:
+        random.seed(seed)
+        return generate_individual(data, order)
+    finally:
+        random.setstate(state)
+
+
+def generate_population(data: TimetableData, n: int, workers: int | None = None, order: str | None = None,
+                        pool=None) -> List[list]:
+    """构造 n 个个体 (基因列表)。
+
+    pool: 已持有 data 的进程池 (如 parallel.EvaluationPool), 提供 generate(tasks);
+    否则 workers>1 时临时创建 EvaluationPool, 否则串行。每个个体的种子都由当前全局随机流派生。
+    """
+    order = order or CONFIG.get('SEED_ORDER', 'random')
+    tasks = [(random.randrange(2**31), order) for _ in range(n)]
+    if pool is not None:
+        return pool.generate(tasks)
+    if workers and workers > 1 and n > 1:
+        with EvaluationPool(data, min(workers, n)) as p:
+            return p.generate(tasks)
+    return [generate_seeded(data, seed, o) for seed, o in tasks]
@@ -0,0 +1,80 @@
+"""双师课程可行教师对表
+
+包含:
+TeacherPairTable: 按 (课程, 全局 slot) 预计算可用教师位图, 生成/修复时与占用位图按位与即得可行教师对
+teacher_pair_table: 每个 TimetableData 构建一次并缓存在 data 上
+
+原实现对每个候选时段遍历 permutations(teachers, 2) 并逐对检查不可用/占用;
+按排列顺序第一个可行对恰为 (打乱后顺序中第一个空闲教师, 第二个空闲教师),
+因此只需按序取前两个空闲位, 结果 (含随机数消耗) 与原实现完全一致。
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+from .data_model import TimetableData
+
+__all__ = [
+    'TeacherPairTable',
+    'teacher_pair_table',
+]
+
+_CACHE_ATTR = '_teacher_pair_table'
+
+
+class TeacherPairTable:
+    def __init__(self, data: TimetableData):
+        axis = data.SLOT_AXIS
+        # 与 SLOT_AXIS 共用教师位空间: 教师 -> 位 (1 << teacher_bit); 不在轴上的教师 (如外部导入) 不参与占用判定
+        self.tbit: Dict[str, int] = {t: 1 << i for t, i in axis.teacher_bit.items()}
+        # 全局 slot -> 该时段不可用教师位图
+        self.slot_busy: Dict[int, int] = axis.slot_busy_teachers
+        self.course_mask: Dict[str, int] = {}
+        self.course_unique: Dict[str, bool] = {}
+        # 双师课程: 仅记录有教师不可用的 slot, 其余 slot 的可用位图即 course_mask
+        self.dual_avail: Dict[str, Dict[int, int]] = {}
+        for c, info in data.COURSE_DATA.items():
+            ts = info['available_teachers']
+            mask = 0
+            for t in ts:
+                mask |= self.tbit[t]
+            self.course_mask[c] = mask
+            self.course_unique[c] = len(set(ts)) == len(ts)
+            if info.get('is_two_teacher', False):
+                self.dual_avail[c] = {s: mask & ~busy for s, busy in self.slot_busy.items() if busy & mask}
+
+    def bit(self, teacher) -> int:
+        return self.tbit.get(teacher, 0) if teacher else 0
+
+    def first_pair(self, course: str, s: int, teachers: List[str], occupied: int) -> Optional[Tuple[str, str]]:
+        """teachers 顺序下第一个可行 (t1, t2); occupied 为该时段已占用教师位图。"""
+        free = self.dual_avail[course].get(s, self.course_mask[course]) & ~occupied
+        # 可行教师不足两人时直接排除 (教师列表含重复名时同名可成对, 不做此剪枝)
+        if not free & (free - 1) and self.course_unique[course]:
+            return None
+        tbit = self.tbit
+        first = None
+        for t in teachers:
+            if free & tbit[t]:
+                if first is None:
+                    first = t
+                else:
+                    return first, t
+        return None
+
+    def first_single(self, s: int, teachers: List[str], occupied: int) -> Optional[str]:
+        """teachers 顺序下第一个在 slot s 可用且未被占用的教师。"""
+        blocked = self.slot_busy.get(s, 0) | occupied
+        tbit = self.tbit
+        for t in teachers:
+            if not blocked & tbit[t]:
+                return t
+        return None
+
+
+def teacher_pair_table(data: TimetableData) -> TeacherPairTable:
+    table = getattr(data, _CACHE_ATTR, None)
+    if table is None:
+        table = TeacherPairTable(data)
+        setattr(data, _CACHE_ATTR, table)
+    return table
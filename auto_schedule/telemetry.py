@@ -0,0 +1,139 @@
+"""GA 逐代遥测
+
+包含:
+1. PhaseTimer: 按阶段 (select / vary / repair / evaluate / local_search) 累计耗时
+2. GATelemetry: 每代一条记录, 写入 JSON Lines 文件和/或回调 (如 Streamlit 进度条)
+
+记录字段:
+  gen / ngen / elapsed_s
+  best / mean / worst         当前种群适配度
+  best_hard / best_soft       当前代最优个体的硬/软分拆 (incremental.IncrementalEvaluator.breakdown)
+  best_so_far                 历史最优
+  diversity                   各个体与当前最优逐位不同的基因比例的均值 (规范基因顺序下可比)
+  unique                      不同基因组数
+  evaluations / evaluations_total   实际评估次数 (不含适配度缓存命中)
+  repair                      变异后修复累计 calls / fixed / unfixed (repair.RepairStats)
+  fitness_cache               启用缓存时的累计 hits / misses / hit_rate / entries / evictions / approx_mb
+  time_s                      本代各阶段耗时 {select, vary, repair, evaluate, local_search}
+"""
+from __future__ import annotations
+
+import json
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+from .data_model import TimetableData
+from .incremental import IncrementalEvaluator
+
+__all__ = [
+    'PhaseTimer',
+    'GATelemetry',
+    'PHASES',
+]
+
+PHASES = ('select', 'vary', 'repair', 'evaluate', 'local_search')
+
+
+class PhaseTimer:
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.totals[name] = self.totals.get(name, 0.0) + time.perf_counter() - t0
+
+    def add(self, name: str, seconds: float):
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+
+    def take(self) -> Dict[str, float]:
+        """返回并清零各阶段累计耗时。"""
+        out = {k: round(self.totals.get(k, 0.0), 6) for k in PHASES}
+        self.totals = {}
+        return out
+
+
+class GATelemetry:
+    """逐代遥测; path 与 callback 至少给一个才会输出, 否则只计时。"""
+
+    def __init__(self, path: Optional[str] = None, callback: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.path = path
+        self.callback = callback
+        self.timer = PhaseTimer()
+        self.evaluations_total = 0
+        self._ev: IncrementalEvaluator | None = None
+        self._fh = None
+        self._t0 = time.perf_counter()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path or self.callback)
+
+    def bind(self, data: TimetableData):
+        self._t0 = time.perf_counter()
+        if self.enabled and self._ev is None:
+            self._ev = IncrementalEvaluator(data)
+        if self.path and self._fh is None:
+            self._fh = open(self.path, 'a', encoding='utf-8')
+        return self
+
+    def record(self, gen: int, pop, evaluations: int, best_so_far: float, ngen: int | None = None,
+               **extra) -> Optional[Dict[str, Any]]:
+        self.evaluations_total += evaluations
+        phases = self.timer.take()
+        if not self.enabled:
+            return None
+        fits = [ind.fitness.values[0] for ind in pop if ind.fitness.valid]
+        rec: Dict[str, Any] = {
+            'gen': gen,
+            'ngen': ngen,
+            'elapsed_s': round(time.perf_counter() - self._t0, 6),
+            'best': min(fits) if fits else None,
+            'mean': sum(fits) / len(fits) if fits else None,
+            'worst': max(fits) if fits else None,
+            'best_so_far': best_so_far,
+            'evaluations': evaluations,
+            'evaluations_total': self.evaluations_total,
+            'time_s': phases,
+        }
+        valid = [ind for ind in pop if ind.fitness.valid]
+        if valid:
+            best = min(valid, key=lambda ind: ind.fitness.values[0])
+            if self._ev is not None:
+                hard, soft, _ = self._ev.breakdown(list(best))
+                rec['best_hard'] = hard
+                rec['best_soft'] = soft
+            rec['diversity'] = _diversity(pop, best)
+        rec['unique'] = len({tuple(ind) for ind in pop})
+        rec.update(extra)
+        self.emit(rec)
+        return rec
+
+    def emit(self, rec: Dict[str, Any]):
+        if self._fh is not None:
+            self._fh.write(json.dumps(rec, ensure_ascii=False, default=str) + '\n')
+            self._fh.flush()
+        if self.callback is not None:
+            self.callback(rec)
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+def _diversity(pop, ref) -> float:
+    n = len(ref)
+    if not n or len(pop) < 2:
+        return 0.0
+    total = 0.0
+    for ind in pop:
+        if len(ind) != n:
+            total += 1.0
+            continue
+        total += sum(1 for a, b in zip(ind, ref) if a != b) / n
+    return round(total / len(pop), 6)
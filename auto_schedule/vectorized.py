@@ -0,0 +1,355 @@
+"""NumPy 向量化表示与约束评分
+
+包含:
+1. EncodedProblem: 将 TimetableData 中的班级/课程/教师名称映射为整数编号, 并预计算课程属性数组、
+   先修矩阵、班级需求矩阵、教师不可用矩阵 (教师 × 全局时段)
+2. encode_individual / decode_individual: 5 元组列表 <-> 整型数组 (n, 5)
+   列: class, course, t1, t2, slot; 教师 None 记 -1, 空串记 -2; 未排 slot 记 -1
+   slot 为全局时段下标 (data.SLOT_AXIS 原点, 每天 2 个时段), 由班级 start_date 预先换算
+3. hard_penalties_np / soft_adjust_np: 使用 bincount / lexsort 代替 dict-of-sets 循环,
+   返回值与 constraints.hard_penalties / soft_adjust 完全一致 (soft_details 键与顺序相同)
+4. consecutive_np / class_soft_np / balance_penalty: soft_adjust_np 的分项内核
+   (连排奖励按日期 / 时间线软约束按班级 / 教师负载均衡), 增量评估只对变化的日期与班级调用
+5. VectorizedEvaluator: 可注册为 toolbox.evaluate 的评估器 (CONFIG['EVAL_BACKEND'] = 'numpy')
+soft_adjust_np 同时是 constraint_model.soft_score 的内核 (GA 与手动排课共用);
+incremental.EvalState 与 manual_soft.IncrementalSoftScorer 也只调用上述分项内核, 软约束规则只有这一份实现。
+"""
+from __future__ import annotations
+
+from typing import Dict, Tuple
+import numpy as np
+
+from .config import CONFIG, soft_weights
+from .data_model import TimetableData
+
+__all__ = [
+    'EncodedProblem',
+    'encode_individual',
+    'decode_individual',
+    'hard_penalties_np',
+    'soft_adjust_np',
+    'CLASS_SOFT_KEYS',
+    'consecutive_np',
+    'class_soft_np',
+    'balance_penalty',
+    'VectorizedEvaluator',
+]
+
+COL_CLASS, COL_COURSE, COL_T1, COL_T2, COL_SLOT = range(5)
+T_NONE = -1
+T_EMPTY = -2
+
+
+class EncodedProblem:
+    """TimetableData 的整数化视图 (每个 TimetableData 构建一次)。"""
+
+    def __init__(self, data: TimetableData):
+        self.data = data
+        self.class_ids = list(data.CLASSES.keys())
+        self.class_index = {cid: i for i, cid in enumerate(self.class_ids)}
+        self.course_names = list(data.COURSE_DATA.keys())
+        self.course_index = {c: i for i, c in enumerate(self.course_names)}
+        teachers = set(data.TEACHER_UNAVAILABLE_SLOTS.keys())
+        for c in data.COURSE_DATA.values():
+            teachers.update(c['available_teachers'])
+        self.teacher_names = sorted(teachers)
+        self.teacher_index = {t: i for i, t in enumerate(self.teacher_names)}
+        K, C = len(self.class_ids), len(self.course_names)
+        # 全局时段轴: 与 data.SLOT_AXIS 共用原点; 无该属性 (手动排课视图) 时以最早开班日期为原点
+        starts = [data.CLASSES[cid]['start_date'].toordinal() for cid in self.class_ids]
+        ends = [data.CLASSES[cid]['end_date'].toordinal() for cid in self.class_ids]
+        axis = getattr(data, 'SLOT_AXIS', None)
+        self.origin_day = axis.origin if axis is not None else (min(starts) if starts else 0)
+        self.class_offset = np.array([(s - self.origin_day) * 2 for s in starts], dtype=np.int64)
+        self.n_slots = ((max(ends) - self.origin_day + 1) * 2) if ends else 0
+        # 课程属性
+        self.course_two = np.array([bool(data.COURSE_DATA[c].get('is_two_teacher', False)) for c in self.course_names], dtype=bool)
+        self.course_theory = np.array([bool(data.COURSE_DATA[c].get('is_theory', False)) for c in self.course_names], dtype=bool)
+        self.prereq = np.zeros((C, C), dtype=bool)
+        for c in self.course_names:
+            for p in data.COURSE_DATA[c].get('prerequisites', []):
+                if p in self.course_index:
+                    self.prereq[self.course_index[c], self.course_index[p]] = True
+        self.course_has_prereq = self.prereq.any(axis=1)
+        # 班级 × 课程 需求块数 (仅班级课程列表内的组合参与块数校验)
+        self.required = np.zeros((K, C), dtype=np.int64)
+        self.in_plan = np.zeros((K, C), dtype=bool)
+        for cid in self.class_ids:
+            k = self.class_index[cid]
+            for c in data.CLASSES[cid]['courses']:
+                j = self.course_index[c]
+                self.required[k, j] = data.COURSE_DATA[c]['blocks']
+                self.in_plan[k, j] = True
+        # 教师不可用矩阵
+        self.teacher_unavail = np.zeros((len(self.teacher_names), max(self.n_slots, 1)), dtype=bool)
+        for t, slots in data.TEACHER_UNAVAILABLE_SLOTS.items():
+            ti = self.teacher_index[t]
+            for date, p in slots:
+                s = (date.toordinal() - self.origin_day) * 2 + p
+                if 0 <= s < self.n_slots:
+                    self.teacher_unavail[ti, s] = True
+        # 5 元组 -> 编码行 缓存 (基因元组不可变, 同一元组重复出现频繁)
+        self._row_cache: Dict[tuple, tuple] = {}
+
+    def __getstate__(self):
+        # 发往工作进程时不携带基因编码缓存
+        state = self.__dict__.copy()
+        state['_row_cache'] = {}
+        return state
+
+    def class_code(self, class_id):
+        code = self.class_index.get(class_id)
+        if code is None:
+            # 不在班级表中的班级 (如导入的历史结果): 追加为无课程计划的空行
+            code = len(self.class_ids)
+            self.class_ids.append(class_id)
+            self.class_index[class_id] = code
+            self.class_offset = np.append(self.class_offset, 0)
+            C = self.required.shape[1]
+            self.required = np.vstack([self.required, np.zeros((1, C), dtype=np.int64)])
+            self.in_plan = np.vstack([self.in_plan, np.zeros((1, C), dtype=bool)])
+        return code
+
+    def teacher_code(self, t):
+        if t is None:
+            return T_NONE
+        if t == '':
+            return T_EMPTY
+        code = self.teacher_index.get(t)
+        if code is None:
+            # 未在课程/不可用表中出现的教师: 动态追加 (无不可用时段)
+            code = len(self.teacher_names)
+            self.teacher_names.append(t)
+            self.teacher_index[t] = code
+        return code
+
+    def encode_gene(self, gene) -> tuple:
+        row = self._row_cache.get(gene)
+        if row is None:
+            class_id, course, t1, t2, idx = gene
+            k = self.class_index[class_id]
+            slot = -1 if (idx is None or idx < 0) else int(self.class_offset[k]) + idx
+            row = (k, self.course_index[course], self.teacher_code(t1), self.teacher_code(t2), slot)
+            if len(self._row_cache) > 500_000:
+                self._row_cache.clear()
+            self._row_cache[gene] = row
+        return row
+
+    def teacher_name(self, code):
+        if code == T_NONE:
+            return None
+        if code == T_EMPTY:
+            return ''
+        return self.teacher_names[code]
+
+
+def encode_individual(individual, prob: EncodedProblem) -> np.ndarray:
+    """个体 -> int64 数组 (n, 5)。"""
+    rows = [prob.encode_gene(g) for g in individual]
+    if not rows:
+        return np.zeros((0, 5), dtype=np.int64)
+    return np.array(rows, dtype=np.int64)
+
+
+def decode_individual(arr: np.ndarray, prob: EncodedProblem):
+    """整型数组 -> 个体 (5 元组列表, 相对班级的时间索引)。"""
+    out = []
+    for k, j, t1, t2, slot in arr.tolist():
+        idx = -1 if slot < 0 else slot - int(prob.class_offset[k])
+        out.append((prob.class_ids[k], prob.course_names[j], prob.teacher_name(t1), prob.teacher_name(t2), idx))
+    return out
+
+
+def _group_starts(keys: np.ndarray) -> np.ndarray:
+    """已排序 keys 中每个元素所在分组的首元素下标。"""
+    n = len(keys)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    is_start = np.ones(n, dtype=bool)
+    is_start[1:] = keys[1:] != keys[:-1]
+    return np.maximum.accumulate(np.where(is_start, np.arange(n), 0))
+
+
+def hard_penalties_np(arr: np.ndarray, prob: EncodedProblem) -> int:
+    cfg = CONFIG
+    HARD = cfg['HARD_PENALTY']
+    miss_t = cfg['MISSING_TEACHER_PENALTY']
+    miss_co = cfg['MISSING_CO_TEACHER_PENALTY']
+    n = len(arr)
+    pos = np.arange(n)
+    cls, course, t1, t2, slot = (arr[:, i] for i in range(5))
+    is_two = prob.course_two[course]
+    placed = slot >= 0
+    penalty = 0
+    # 未排块
+    missing = ~placed
+    n_missing = int(missing.sum())
+    penalty += miss_t * int((missing & (t1 == T_NONE)).sum())
+    penalty += miss_co * int((missing & is_two).sum())
+    penalty += HARD * n_missing
+    # 以下仅针对已排块
+    cls, course, t1, t2, slot, pos, is_two = (x[placed] for x in (cls, course, t1, t2, slot, pos, is_two))
+    # 教师冲突: 同一时段同一教师, 除首个出现该教师的基因外, 其余每次出现计一次
+    m_slot = np.concatenate([slot[t1 >= 0], slot[t2 >= 0]])
+    m_teacher = np.concatenate([t1[t1 >= 0], t2[t2 >= 0]])
+    m_pos = np.concatenate([pos[t1 >= 0], pos[t2 >= 0]])
+    if len(m_slot):
+        key = m_slot * (len(prob.teacher_names) + 1) + m_teacher
+        order = np.lexsort((m_pos, key))
+        key, m_pos_s = key[order], m_pos[order]
+        first = m_pos_s[_group_starts(key)]
+        penalty += HARD * int((m_pos_s != first).sum())
+    # 班级冲突: 同一时段同一班级, 每多一块计一次
+    if len(slot):
+        ck = slot * len(prob.class_ids) + cls
+        penalty += HARD * int(len(ck) - len(np.unique(ck)))
+    # 教师不可用
+    width = prob.teacher_unavail.shape[1]
+    rows_t = prob.teacher_unavail.shape[0]
+    for t in (t1, t2):
+        ok = (t >= 0) & (t < rows_t) & (slot < width)
+        penalty += HARD * int(prob.teacher_unavail[t[ok], slot[ok]].sum())
+    # 教师缺失 / 双师缺第二教师 / 单师多余第二教师
+    penalty += miss_t * int((t1 == T_NONE).sum())
+    penalty += miss_co * int((is_two & ((t2 == T_NONE) | (t2 == t1))).sum())
+    penalty += HARD * int((~is_two & (t2 != T_NONE)).sum())
+    # 块数不符
+    K, C = prob.required.shape
+    counts = np.bincount(cls * C + course, minlength=K * C).reshape(K, C)
+    penalty += HARD * int(np.abs(prob.required - counts)[prob.in_plan].sum())
+    return int(penalty)
+
+
+# class_soft_np 输出矩阵的列 (与 soft_details 中对应键同序)
+CLASS_SOFT_KEYS = (
+    'theory_early_reward',
+    'non_theory_early_penalty',
+    'prereq_violation_penalty',
+    'teacher_switch_penalty',
+    'theory_teacher_inconsistent_penalty',
+)
+
+
+def consecutive_np(slot: np.ndarray, cls: np.ndarray, course: np.ndarray, pos: np.ndarray) -> Dict[int, int]:
+    """连排奖励 {日期序号: 奖励(负值)}: 按 (时段, 基因顺序) 排序后相邻的 上午->下午 同班同课。
+
+    只需传入已排块; 传入若干完整日期的块时结果与全量计算中这些日期的部分相同。
+    """
+    if len(slot) < 2:
+        return {}
+    reward = -soft_weights()['CONSECUTIVE_REWARD']
+    g = np.lexsort((pos, slot))
+    gs, gc, gk = slot[g], course[g], cls[g]
+    consec = (gk[:-1] == gk[1:]) & (gc[:-1] == gc[1:]) & (gs[:-1] // 2 == gs[1:] // 2) \
+        & (gs[:-1] % 2 == 0) & (gs[1:] % 2 == 1)
+    return {int(d): reward for d in (gs[:-1][consec] // 2).tolist()}
+
+
+def class_soft_np(cls: np.ndarray, course: np.ndarray, t1: np.ndarray, slot: np.ndarray, pos: np.ndarray,
+                  prob: EncodedProblem) -> np.ndarray:
+    """每班时间线软约束, 返回 int64 矩阵 (班级数, 5), 列为 CLASS_SOFT_KEYS。
+
+    只需传入已排块; 传入若干完整班级的块时, 这些班级所在行与全量计算相同 (其余行为 0)。
+    """
+    w = soft_weights()
+    prereq_pen = w['SOFT_PREREQ_PENALTY']
+    theory_reward = w['THEORY_EARLY_REWARD']
+    non_theory_late_thr = w['NON_THEORY_LATE_THRESHOLD']
+    switch_pen = w['TEACHER_SWITCH_PENALTY']
+    theory_change_pen = w['THEORY_TEACHER_CHANGE_HARD']
+    K, C = prob.required.shape
+    out = np.zeros((K, len(CLASS_SOFT_KEYS)), dtype=np.int64)
+    if len(cls) == 0:
+        return out
+    # 每班时间线: 按 (班级, 时段, 基因顺序) 排序, idx 为班内名次
+    o = np.lexsort((pos, slot, cls))
+    oc, ocourse = cls[o], course[o]
+    idx = np.arange(len(o)) - _group_starts(oc)
+    total = np.bincount(oc, minlength=K)[oc]
+    theory = prob.course_theory[ocourse]
+    rew = np.floor(theory_reward * (total - idx) / total).astype(np.int64)
+    sel = theory & (rew > 0)
+    out[:, 0] = -np.bincount(oc[sel], weights=rew[sel], minlength=K).astype(np.int64)
+    ideal_start = np.floor(total * non_theory_late_thr).astype(np.int64)
+    early = np.maximum(ideal_start - idx, 0)
+    out[:, 1] = np.bincount(oc[~theory], weights=early[~theory], minlength=K).astype(np.int64)
+    # 先修顺序: 当前名次 <= 同班先修课程最后名次 -> 违规 (每块至多计一次)
+    has_pre = prob.course_has_prereq[ocourse]
+    if has_pre.any():
+        last = np.full((K, C), -1, dtype=np.int64)
+        np.maximum.at(last, (oc, ocourse), idx)
+        sel = np.nonzero(has_pre)[0]
+        viol = (prob.prereq[ocourse[sel]] & (last[oc[sel]] >= idx[sel, None])).any(axis=1)
+        out[:, 2] = prereq_pen * np.bincount(oc[sel], weights=viol, minlength=K).astype(np.int64)
+    # 教师切换: 同班同课按时间顺序相邻 t1 不同计一次切换 (在班内时间线上按课程稳定排序)
+    gkey = oc * C + ocourse
+    o2 = np.argsort(gkey, kind='stable')
+    gkey, ts = gkey[o2], t1[o][o2]
+    sw = np.zeros(len(o2), dtype=bool)
+    sw[1:] = (gkey[1:] == gkey[:-1]) & (ts[1:] != ts[:-1])
+    if sw.any():
+        keys = gkey[sw]
+        th = prob.course_theory[keys % C]
+        out[:, 3] = switch_pen * np.bincount(keys[~th] // C, minlength=K)
+        # 理论课: 每个 (班级, 课程) 有切换即计一次 (keys 已有序, 取各组首个)
+        keys = keys[th]
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = keys[1:] != keys[:-1]
+        out[:, 4] = theory_change_pen * np.bincount(keys[first] // C, minlength=K)
+    return out
+
+
+def balance_penalty(loads) -> int:
+    """教师负载均衡罚分: (最大负载 - 最小负载) × TEACHER_BALANCE_WEIGHT; loads 为有课教师的负载。"""
+    loads = list(loads)
+    if not loads:
+        return 0
+    return int((max(loads) - min(loads)) * soft_weights()['TEACHER_BALANCE_WEIGHT'])
+
+
+def soft_adjust_np(arr: np.ndarray, prob: EncodedProblem) -> Tuple[int, Dict[str, int]]:
+    details: Dict[str, int] = {
+        'consecutive_reward': 0,
+        'theory_early_reward': 0,
+        'non_theory_early_penalty': 0,
+        'prereq_violation_penalty': 0,
+        'teacher_switch_penalty': 0,
+        'theory_teacher_inconsistent_penalty': 0,
+        'teacher_balance_penalty': 0,
+    }
+    pos = np.arange(len(arr))
+    placed = arr[:, COL_SLOT] >= 0
+    a = arr[placed]
+    pos = pos[placed]
+    if len(a) == 0:
+        return 0, details
+    cls, course, t1, t2, slot = (a[:, i] for i in range(5))
+    details['consecutive_reward'] = sum(consecutive_np(slot, cls, course, pos).values())
+    per_class = class_soft_np(cls, course, t1, slot, pos, prob).sum(axis=0)
+    for key, v in zip(CLASS_SOFT_KEYS, per_class.tolist()):
+        details[key] = int(v)
+    # 教师负载均衡
+    T = len(prob.teacher_names)
+    loads = np.bincount(t1[t1 >= 0], minlength=T) + np.bincount(t2[t2 >= 0], minlength=T)
+    details['teacher_balance_penalty'] = balance_penalty(loads[loads > 0].tolist())
+    adjust = sum(details.values())
+    return int(adjust), details
+
+
+class VectorizedEvaluator:
+    """NumPy 评估器: 可直接注册为 toolbox.evaluate。"""
+
+    def __init__(self, data: TimetableData):
+        from .constraint_model import compiled_model
+        self.prob = compiled_model(data)
+
+    def evaluate(self, individual):
+        arr = encode_individual(individual, self.prob)
+        hard = hard_penalties_np(arr, self.prob)
+        soft_total, _ = soft_adjust_np(arr, self.prob)
+        return (hard + soft_total,)
+
+    def breakdown(self, individual):
+        arr = encode_individual(individual, self.prob)
+        soft_total, details = soft_adjust_np(arr, self.prob)
+        return hard_penalties_np(arr, self.prob), soft_total, details
@@ -0,0 +1,184 @@
+"""基准测试套件
+
+按 synthetic.TIERS 中的规模 (small / medium / large / departments)生成合成实例 (benchmarks.synthetic), 计时:
+  load_cold        TimetableData 解析 Excel (关闭快照缓存)
+  load_cached      TimetableData 命中快照缓存
+  generate         generate_individual
+  evaluate         evaluate_schedule (整体重建评估)
+  repair           repair_individual (每个个体随机清空 10% 的块后修复)
+  ga               固定种子 run_scheduler (不导出)
+  manual_export    ManualSession.export_excel (载入一个 GA 构造个体后导出)
+
+每项取 --repeat 次中的最小值 (秒/次)。--json 写出结果, --baseline 与历史结果比较,
+慢于基线 --tolerance 倍的项目标记为 REGRESSION 并以退出码 1 结束。
+
+示例:
+  python -m benchmarks.run --tiers small,medium --json bench.json
+  python -m benchmarks.run --tiers small --baseline bench.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from auto_schedule.config import CONFIG
+from auto_schedule.data_model import TimetableData
+from auto_schedule.ga_engine import (
+    generate_individual, evaluate_schedule, repair_individual, run_scheduler,
+)
+from auto_schedule.constraints import build_absolute
+
+from .synthetic import TIERS, generate_workbook
+
+__all__ = ['run_tier', 'main']
+
+# 各规模的每项循环次数与 GA 参数
+_SIZES = {
+    'small': {'n': 20, 'pop': 20, 'gen': 20},
+    'medium': {'n': 10, 'pop': 30, 'gen': 15},
+    'large': {'n': 4, 'pop': 30, 'gen': 8},
+    'departments': {'n': 4, 'pop': 30, 'gen': 8},
+}
+
+
+def _size_for(tier: str) -> Dict[str, int]:
+    """未在 _SIZES 中列出的 synthetic.TIERS 规模按班级数取最接近的已列出规模。"""
+    if tier in _SIZES:
+        return _SIZES[tier]
+    classes = TIERS[tier].classes
+    return _SIZES[min(_SIZES, key=lambda t: abs(TIERS[t].classes - classes))]
+
+
+def _best_of(fn: Callable[[], object], repeat: int, loops: int = 1) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / loops)
+    return best
+
+
+def _load(path: str, cache: bool) -> TimetableData:
+    saved = CONFIG.get('DATA_CACHE', True)
+    CONFIG['DATA_CACHE'] = cache
+    try:
+        return TimetableData(path)
+    finally:
+        CONFIG['DATA_CACHE'] = saved
+
+
+def _manual_export(path: str, data: TimetableData, genes, out: str):
+    from manual_schedule.manual_core import TimetableData as ManualData, PlacedBlock
+    from manual_schedule.manual_state import ManualSession
+    session = ManualSession(ManualData(path))
+    for cid, course, t1, t2, date, period_idx, _ in build_absolute(genes, data):
+        if date is None:
+            continue
+        session.scheduler.append_block(PlacedBlock(cid, course, t1 or '', t2, date, period_idx))
+    return lambda: session.export_excel(out)
+
+
+def run_tier(tier: str, workdir: str, repeat: int = 3, verbose: int = 1) -> Dict[str, float]:
+    size = _size_for(tier)
+    path = os.path.join(workdir, f'bench_{tier}.xlsx')
+    generate_workbook(path, TIERS[tier])
+    results: Dict[str, float] = {}
+
+    results['load_cold'] = _best_of(lambda: _load(path, cache=False), repeat)
+    _load(path, cache=True)
+    results['load_cached'] = _best_of(lambda: _load(path, cache=True), repeat)
+    data = _load(path, cache=True)
+
+    random.seed(0)
+    n = size['n']
+    results['generate'] = _best_of(lambda: generate_individual(data), repeat, n)
+    random.seed(0)
+    pop = [generate_individual(data) for _ in range(n)]
+    results['evaluate'] = _best_of(lambda: [evaluate_schedule(ind, data) for ind in pop], repeat) / n
+
+    def repair_batch():
+        rng = random.Random(1)
+        for ind in pop:
+            broken = [(g[0], g[1], g[2], g[3], -1) if rng.random() < 0.1 else g for g in ind]
+            repair_individual(broken, data)
+    results['repair'] = _best_of(repair_batch, repeat) / n
+
+    def ga():
+        run_scheduler(pop_size=size['pop'], ngen=size['gen'], excel_out=None, seed=42, verbose=0, excel_path=path)
+    saved_patience = CONFIG.get('EARLY_STOP_PATIENCE')
+    CONFIG['EARLY_STOP_PATIENCE'] = None
+    try:
+        results['ga'] = _best_of(ga, max(1, repeat // 2))
+    finally:
+        CONFIG['EARLY_STOP_PATIENCE'] = saved_patience
+
+    export = _manual_export(path, data, pop[0], os.path.join(workdir, f'bench_{tier}_export.xlsx'))
+    results['manual_export'] = _best_of(export, repeat)
+
+    genes = len(pop[0])
+    if verbose:
+        print(f"[BENCH] {tier}: 班级={len(data.CLASSES)} 课程={len(data.COURSE_DATA)} 教师={len(data.TEACHERS)} 基因={genes}")
+    return results
+
+
+def _compare(current: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    regressions = []
+    for tier, items in current.items():
+        for key, val in items.items():
+            ref = baseline.get(tier, {}).get(key)
+            if ref and val > ref * tolerance:
+                regressions.append(f'{tier}.{key}: {val:.4f}s > 基线 {ref:.4f}s × {tolerance}')
+    return regressions
+
+
+def build_parser():
+    p = argparse.ArgumentParser(description='排课性能基准测试')
+    p.add_argument('--tiers', type=str, default='small,medium', help=f"逗号分隔: {','.join(TIERS)}")
+    p.add_argument('--repeat', type=int, default=3, help='每项重复次数 (取最小值)')
+    p.add_argument('--json', type=str, default=None, help='结果写入 JSON 文件')
+    p.add_argument('--baseline', type=str, default=None, help='与之比较的历史结果 JSON')
+    p.add_argument('--tolerance', type=float, default=1.5, help='慢于基线多少倍视为回退')
+    p.add_argument('--workdir', type=str, default=None, help='合成实例与导出文件目录 (默认临时目录)')
+    return p
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    tiers = [t.strip() for t in args.tiers.split(',') if t.strip()]
+    for t in tiers:
+        if t not in TIERS:
+            raise SystemExit(f'未知规模: {t}')
+    workdir = args.workdir or tempfile.mkdtemp(prefix='seafarer_bench_')
+    # 快照缓存写到工作目录, 不污染用户缓存
+    os.environ.setdefault('SEAFARER_CACHE_DIR', os.path.join(workdir, 'cache'))
+    results = {t: run_tier(t, workdir, args.repeat) for t in tiers}
+    keys = list(next(iter(results.values())).keys()) if results else []
+    print('\n' + 'tier'.ljust(8) + ''.join(k.rjust(15) for k in keys))
+    for t, items in results.items():
+        print(t.ljust(8) + ''.join(f'{items[k]:15.4f}' for k in keys))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'platform': platform.platform(),
+                       'cpu_count': os.cpu_count(), 'results': results}, f, ensure_ascii=False, indent=2)
+        print(f'[INFO] 结果已写入 {args.json}')
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+        regressions = _compare(results, baseline, args.tolerance)
+        for r in regressions:
+            print(f'[REGRESSION] {r}')
+        if regressions:
+            sys.exit(1)
+        print('[INFO] 与基线相比无回退')
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
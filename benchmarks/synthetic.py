@@ -0,0 +1,158 @@
+"""合成排课实例生成器
+
+generate_workbook 写出与 排课数据.xlsx 结构相同的输入工作簿
+(课程数据 / 班级数据 / 教师不可用时间 / 班级不可用时间), 可直接交给 TimetableData 加载。
+
+保证通过 TimetableData.validate:
+  - 双师课程至少 2 位不同教师
+  - 班级不可用时间只引用已存在班级
+  - 每个班级需求块数 <= 容量 (不足时按课程逆序剔除, 至少保留一门)
+departments > 1 时教师与课程按院系轮流划分, 班级只选本院系课程, 各院系班级构成独立的教师连通分组。
+教师可用性只按密度随机生成, 不保证存在无冲突解 (与真实数据一致, 由 GA 罚分处理)。
+
+示例:
+  python -m benchmarks.synthetic --classes 12 --courses 15 --teachers 20 --out 合成_中.xlsx
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import random
+from dataclasses import dataclass, asdict
+
+import pandas as pd
+
+__all__ = [
+    'InstanceSpec',
+    'TIERS',
+    'generate_workbook',
+]
+
+
+@dataclass
+class InstanceSpec:
+    classes: int = 3
+    courses: int = 6
+    teachers: int = 6
+    dual_ratio: float = 0.25           # 双师课程占比
+    span_days: int = 40                # 每个班级的开课天数
+    courses_per_class: int = 5         # 每个班级选修课程数 (不超过 courses)
+    teacher_unavail: float = 0.05      # 教师不可用时段密度
+    class_unavail: float = 0.03        # 班级不可用时段密度
+    max_start_offset: int = 20         # 各班开班日期在起始日之后的随机偏移天数
+    fill: float = 0.8                  # 班级需求占可用时段的目标比例上限
+    departments: int = 1               # 院系数: 教师/课程按院系划分, 班级只选本院系课程 (>1 时产生互不共享教师的分组)
+    start: str = '2025-10-06'
+    seed: int = 0
+
+
+TIERS = {
+    'small': InstanceSpec(classes=3, courses=6, teachers=6, span_days=40, courses_per_class=4),
+    'medium': InstanceSpec(classes=12, courses=15, teachers=20, span_days=60, courses_per_class=6),
+    'large': InstanceSpec(classes=40, courses=30, teachers=60, span_days=90, courses_per_class=8),
+    # 多院系: 8 个互不共享教师的分组, 用于 --partition
+    'departments': InstanceSpec(classes=40, courses=32, teachers=64, span_days=90, courses_per_class=6, departments=8),
+}
+
+
+def generate_workbook(path: str, spec: InstanceSpec | None = None) -> str:
+    spec = spec or InstanceSpec()
+    rng = random.Random(spec.seed)
+    start = datetime.date.fromisoformat(spec.start)
+    teachers = [f'教师{i:03d}' for i in range(spec.teachers)]
+    n_dual = round(spec.courses * spec.dual_ratio)
+    if spec.teachers < 2:
+        n_dual = 0
+
+    n_dep = max(1, min(spec.departments, spec.courses, spec.teachers))
+    dep_teachers = [teachers[d::n_dep] for d in range(n_dep)]
+    dep_courses = [[] for _ in range(n_dep)]
+
+    course_rows = []
+    blocks = {}
+    for i in range(spec.courses):
+        name = f'课程{i:02d}'
+        pool = dep_teachers[i % n_dep]
+        dep_courses[i % n_dep].append(name)
+        is_two = i < n_dual and len(pool) >= 2
+        k = rng.randint(2, min(3, len(pool))) if is_two else rng.randint(1, min(2, len(pool)))
+        blocks[name] = rng.randint(4, 16) if is_two else rng.randint(4, 12)
+        course_rows.append({
+            '课程名称': name,
+            'blocks': blocks[name],
+            'available_teachers': ','.join(rng.sample(pool, k)),
+            'is_two_teacher': 'Y' if is_two else 'N',
+        })
+
+    # 每位教师至少出现在本院系一门课程中 (否则 validate 会对其不可用时间告警)
+    used = {t for row in course_rows for t in row['available_teachers'].split(',')}
+    for d, pool in enumerate(dep_teachers):
+        rows = [row for i, row in enumerate(course_rows) if i % n_dep == d]
+        for t in pool:
+            if t not in used:
+                row = rng.choice(rows)
+                row['available_teachers'] += ',' + t
+
+    class_rows, class_unavail_rows = [], []
+    last_day = start
+    for c in range(spec.classes):
+        offered = dep_courses[c % n_dep]
+        per_class = min(spec.courses_per_class, len(offered))
+        cid = f'{2500000 + c}'
+        sd = start + datetime.timedelta(days=rng.randint(0, spec.max_start_offset))
+        ed = sd + datetime.timedelta(days=spec.span_days - 1)
+        last_day = max(last_day, ed)
+        unavailable = []
+        for d in range(spec.span_days):
+            for p, label in enumerate(('上午', '下午')):
+                if rng.random() < spec.class_unavail:
+                    unavailable.append((sd + datetime.timedelta(days=d), label))
+        capacity = spec.span_days * 2 - len(unavailable)
+        chosen = rng.sample(offered, per_class)
+        while len(chosen) > 1 and sum(blocks[x] for x in chosen) > capacity * spec.fill:
+            chosen.pop()
+        if blocks[chosen[0]] > capacity:
+            # 单门课也放不下时丢弃不可用时间
+            unavailable = []
+        class_rows.append({'班级ID': cid, 'start_date': sd, 'end_date': ed, 'courses': ','.join(chosen)})
+        class_unavail_rows.extend({'班级ID': cid, '日期': d, '时间段': label} for d, label in unavailable)
+
+    teacher_rows = []
+    days = (last_day - start).days + 1
+    for t in teachers:
+        for d in range(days):
+            for label in ('上午', '下午'):
+                if rng.random() < spec.teacher_unavail:
+                    teacher_rows.append({'教师姓名': t, '日期': start + datetime.timedelta(days=d), '时间段': label})
+
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame(course_rows).to_excel(writer, sheet_name='课程数据', index=False)
+        pd.DataFrame(class_rows).to_excel(writer, sheet_name='班级数据', index=False)
+        pd.DataFrame(teacher_rows, columns=['教师姓名', '日期', '时间段']).to_excel(writer, sheet_name='教师不可用时间', index=False)
+        pd.DataFrame(class_unavail_rows, columns=['班级ID', '日期', '时间段']).to_excel(writer, sheet_name='班级不可用时间', index=False)
+    return path
+
+
+def build_parser():
+    p = argparse.ArgumentParser(description='生成合成排课输入工作簿')
+    p.add_argument('--tier', choices=sorted(TIERS), help='预设规模 (其余参数在其基础上覆盖)')
+    defaults = asdict(InstanceSpec())
+    for key, val in defaults.items():
+        p.add_argument(f'--{key}', type=type(val), default=None, help=f'默认 {val}')
+    p.add_argument('--out', type=str, default='合成排课数据.xlsx', help='输出路径')
+    return p
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    spec = asdict(TIERS[args.tier]) if args.tier else asdict(InstanceSpec())
+    for key in spec:
+        val = getattr(args, key)
+        if val is not None:
+            spec[key] = val
+    path = generate_workbook(args.out, InstanceSpec(**spec))
+    print(f'[INFO] 已生成 {path}: {spec}')
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -144,6 +144,10 @@ with st.sidebar:
             # 显示当前会话/数据层选用的文件
             active = getattr(data, 'excel_file_path', None)
             st.caption(f"data.excel_file_path: {active}")
+            # 数据加载耗时分解（工作簿仅读取一次；命中快照缓存时无 read_workbook 项）
+            _timings = getattr(data, 'load_timings', None) or {}
+            if _timings:
+                st.caption('加载耗时: ' + ' '.join(f"{k}={v*1000:.0f}ms" for k, v in _timings.items()))
             # 版本信息
             try:
                 import pandas as _pd
@@ -299,108 +303,136 @@ def render_ga_section():
         gen = cols[1].number_input('迭代代数', 50, 2000, 200, 50)
         seed = cols[2].number_input('随机种子', 0, 999999, 42, 1)
         verbose = cols[3].selectbox('日志级别', [0, 1, 2], index=1)
+        ga_time_limit = st.number_input('时间上限(秒, 0 为不限)', 0, 36000, 0, 10, help='到期后返回并载入当前最优结果')
+        # 断点文件按会话隔离; Streamlit 进程重启后可勾选续跑, 迭代代数为总代数
+        ga_ckpt_path = str(get_writable_upload_dir() / f"{st.session_state.get('session_id')}__ui_ga.ckpt")
+        resume_ga = False
+        if os.path.exists(ga_ckpt_path):
+            resume_ga = st.checkbox('从上次断点续跑', value=False, help='沿用断点中的参数与种群继续进化, “迭代代数”为总代数')
 
-        if cols[4].button('🚀 开始运行', type='primary', use_container_width=True):
-            with st.spinner('正在运行遗传算法...'):
+        # 后台作业: 运行在独立进程中, 界面按 job_id 轮询, 不阻塞本会话脚本线程
+        from auto_schedule.jobs import JobRunner, ACTIVE_STATES
+        out_dir = get_writable_upload_dir()
+        SESSION_ID = st.session_state.get('session_id')
+        # 导出路径改为可写上传目录（会话隔离），避免云端根目录不可写
+        auto_result_path = str(out_dir / f"{SESSION_ID}__ui_auto_result.xlsx")
+        runner = JobRunner.shared(str(out_dir / 'ga_jobs'))
+        job_id = st.session_state.get('ga_job')
+        job = runner.status(job_id) if job_id else None
+        job_active = bool(job and job.get('status') in ACTIVE_STATES)
+
+        if cols[4].button('🚀 开始运行', type='primary', use_container_width=True, disabled=job_active):
+            try:
+                # 兼容旧版引擎：在运行前将当前数据文件同步到项目根的默认文件名
                 try:
-                    # 导出路径改为可写上传目录（会话隔离），避免云端根目录不可写
-                    out_dir = get_writable_upload_dir()
-                    SESSION_ID = st.session_state.get('session_id')
-                    auto_result_path = str(out_dir / f"{SESSION_ID}__ui_auto_result.xlsx")
-                    tmp_result_path = str(out_dir / f"{SESSION_ID}__ui_auto_result.tmp.xlsx")
-                    # 兼容旧版引擎：在运行前将当前数据文件同步到项目根的默认文件名
-                    try:
-                        src_excel = getattr(data, 'excel_file_path', None)
-                        if src_excel and os.path.exists(src_excel):
-                            default_excel = str(ROOT_DIR / '排课数据.xlsx')
-                            # 若源文件与目标不同路径，则拷贝覆盖
-                            if os.path.abspath(src_excel) != os.path.abspath(default_excel):
-                                shutil.copy2(src_excel, default_excel)
-                    except Exception:
-                        # 同步失败不阻断流程（新引擎会使用 excel_path）
-                        pass
-                    # 运行前做一次数据体检（容量与双师教师数）
-                    fatal_msgs = []
-                    # 容量 vs 需求
-                    class_unavail = getattr(data, 'class_unavailable', {}) or {}
-                    for cid, info in data.classes.items():
-                        days = (info.end_date - info.start_date).days + 1
-                        capacity = days * 2 - len(class_unavail.get(cid, set()))
-                        demand = sum(data.courses[c].blocks for c in info.courses if c in data.courses)
-                        if demand > capacity:
-                            fatal_msgs.append(f"班级 {cid} 需求 {demand} > 容量 {capacity}")
-                    # 双师课程教师数量
-                    for cname, cinfo in data.courses.items():
-                        if getattr(cinfo, 'is_two', False) and len(set(cinfo.teachers)) < 2:
-                            fatal_msgs.append(f"课程 {cname} 标记双师但教师数量不足2")
-                    if fatal_msgs:
-                        raise RuntimeError('数据不可行：' + '；'.join(fatal_msgs))
+                    src_excel = getattr(data, 'excel_file_path', None)
+                    if src_excel and os.path.exists(src_excel):
+                        default_excel = str(ROOT_DIR / '排课数据.xlsx')
+                        # 若源文件与目标不同路径，则拷贝覆盖
+                        if os.path.abspath(src_excel) != os.path.abspath(default_excel):
+                            shutil.copy2(src_excel, default_excel)
+                except Exception:
+                    # 同步失败不阻断流程（新引擎会使用 excel_path）
+                    pass
+                # 运行前做一次数据体检（容量与双师教师数）
+                fatal_msgs = []
+                # 容量 vs 需求
+                class_unavail = getattr(data, 'class_unavailable', {}) or {}
+                for cid, info in data.classes.items():
+                    days = (info.end_date - info.start_date).days + 1
+                    capacity = days * 2 - len(class_unavail.get(cid, set()))
+                    demand = sum(data.courses[c].blocks for c in info.courses if c in data.courses)
+                    if demand > capacity:
+                        fatal_msgs.append(f"班级 {cid} 需求 {demand} > 容量 {capacity}")
+                # 双师课程教师数量
+                for cname, cinfo in data.courses.items():
+                    if getattr(cinfo, 'is_two', False) and len(set(cinfo.teachers)) < 2:
+                        fatal_msgs.append(f"课程 {cname} 标记双师但教师数量不足2")
+                if fatal_msgs:
+                    raise RuntimeError('数据不可行：' + '；'.join(fatal_msgs))
 
-                    from auto_schedule.ga_engine import run_scheduler, build_absolute
-                    from auto_schedule.data_model import TimetableData as AutoData
-                    from manual_schedule.manual_core import PlacedBlock as MBlock
+                job_id = runner.submit(
+                    auto_result_path,
+                    owner=SESSION_ID,
+                    pop_size=int(pop),
+                    ngen=int(gen),
+                    seed=int(seed),
+                    verbose=int(verbose),
+                    # 确保 GA 使用与界面相同的数据源（修复云端数据传输不一致）
+                    excel_path=getattr(data, 'excel_file_path', None),
+                    checkpoint=ga_ckpt_path,
+                    resume=ga_ckpt_path if resume_ga else None,
+                    time_limit=float(ga_time_limit) or None,
+                )
+                st.session_state['ga_job'] = job_id
+                force_rerun()
+            except Exception as e:
+                st.error(f"❌ 自动排课提交失败: {e}")
 
-                    try:
-                        best, metrics = run_scheduler(
-                            pop_size=int(pop),
-                            ngen=int(gen),
-                            excel_out=tmp_result_path,
-                            seed=int(seed),
-                            verbose=int(verbose),
-                            # 确保 GA 使用与界面相同的数据源（修复云端数据传输不一致）
-                            excel_path=getattr(data, 'excel_file_path', None)
-                        )
-                    except TypeError as te:
-                        # 兼容旧版本 run_scheduler 不支持 excel_path 的情况
-                        if 'unexpected keyword argument' in str(te) and 'excel_path' in str(te):
-                            st.info('检测到当前环境的排程引擎不支持 excel_path 参数，已回退到默认数据源逻辑。')
-                            best, metrics = run_scheduler(
-                                pop_size=int(pop),
-                                ngen=int(gen),
-                                excel_out=tmp_result_path,
-                                seed=int(seed),
-                                verbose=int(verbose)
-                            )
-                        else:
-                            raise
-                    # 原子替换，防止并发读取到半成品
-                    try:
-                        lock = FileLock(auto_result_path + '.lock')
-                        with lock:
-                            os.replace(tmp_result_path, auto_result_path)
-                    except Exception:
-                        # 如果替换失败，回退直接使用 tmp 路径
-                        auto_result_path = tmp_result_path
+        if job_id:
+            render_ga_job(runner, job_id)
 
-                    # 优先从导出的 Excel 回读，确保云端 rerun 后也能恢复状态
-                    session.scheduler.placed.clear()
-                    try:
-                        imported = session.import_from_excel(auto_result_path)
-                    except Exception:
-                        # 回退到内存导入
-                        auto_data = AutoData(getattr(session.data, 'excel_file_path', '排课数据.xlsx'))
-                        abs_best = build_absolute(best, auto_data)
-                        imported = 0
-                        for cid, course, t1, t2, date, period_idx, _ in abs_best:
-                            if date is None:
-                                continue
-                            blk = MBlock(cid, course, t1 or '', t2, date, period_idx)
-                            session.scheduler.placed.append(blk)
-                            imported += 1
 
-                    st.success(f"✅ 自动排课完成！导入 {imported} 个课程块")
-                    st.metric("硬约束满足", "是" if metrics['hard_ok'] else "否")
-                    st.metric("适应度得分", f"{metrics['total_fitness']:.2f}")
-                    # 记录到 session_state 以便刷新后仍能看到摘要
-                    st.session_state['ga_last'] = {
-                        'imported': imported,
-                        'metrics': metrics,
-                        'path': auto_result_path,
-                    }
-                    force_rerun()
+def _ga_job_progress(runner, job_id):
+    """运行中作业的进度与取消按钮; 作业结束后触发整页重跑以载入结果。"""
+    from auto_schedule.jobs import ACTIVE_STATES
+    job = runner.status(job_id)
+    if job is None or job.get('status') not in ACTIVE_STATES:
+        st.rerun()
+    prog = job.get('progress') or {}
+    total = prog.get('ngen') or 0
+    done = (prog['gen'] + 1) if prog.get('gen') is not None else 0
+    best = prog.get('best_so_far')
+    text = f"正在后台运行遗传算法: 第 {done}/{total} 代" + (f" · 当前最优 {best:.0f}" if best is not None else '')
+    st.progress(min(1.0, done / total) if total else 0.0, text=text)
+    c1, c2 = st.columns(2)
+    if c1.button('⏹ 取消运行', key=f'ga_cancel_{job_id}', use_container_width=True):
+        runner.cancel(job_id)
+        st.rerun()
+    # 无 st.fragment 的旧版 Streamlit 手动刷新
+    c2.button('🔄 刷新进度', key=f'ga_refresh_{job_id}', use_container_width=True)
+
 
-                except Exception as e:
-                    st.error(f"❌ 自动排课失败: {e}")
+def render_ga_job(runner, job_id):
+    """渲染后台 GA 作业状态; 完成后从导出的 Excel 载入结果 (每个作业只载入一次)。"""
+    from auto_schedule.jobs import ACTIVE_STATES
+    job = runner.status(job_id)
+    if job is None:
+        st.session_state.pop('ga_job', None)
+        return
+    status = job.get('status')
+    if status in ACTIVE_STATES:
+        if hasattr(st, 'fragment'):
+            st.fragment(run_every=2)(_ga_job_progress)(runner, job_id)
+        else:
+            _ga_job_progress(runner, job_id)
+    elif status == 'done':
+        if st.session_state.get('ga_job_imported') == job_id:
+            return
+        st.session_state['ga_job_imported'] = job_id
+        auto_result_path = job.get('result_path')
+        try:
+            # 从导出的 Excel 回读，确保云端 rerun 后也能恢复状态
+            session.scheduler.clear()
+            imported = session.import_from_excel(auto_result_path)
+        except Exception as e:
+            st.error(f"❌ 载入自动排课结果失败: {e}")
+            return
+        metrics = job.get('metrics') or {}
+        st.success(f"✅ 自动排课完成！导入 {imported} 个课程块")
+        st.metric("硬约束满足", "是" if metrics.get('hard_ok') else "否")
+        st.metric("适应度得分", f"{metrics.get('total_fitness', 0):.2f}")
+        # 记录到 session_state 以便刷新后仍能看到摘要
+        st.session_state['ga_last'] = {
+            'imported': imported,
+            'metrics': metrics,
+            'path': auto_result_path,
+        }
+        force_rerun()
+    elif status == 'failed':
+        st.error(f"❌ 自动排课失败: {job.get('error')}")
+    elif status == 'cancelled':
+        st.warning('⏹ 自动排课已取消')
 
 def render_legend():
     """渲染图例"""
@@ -498,16 +530,11 @@ def render_global_add_panel(current_class_id: str):
         if course:
             cinfo = data.courses[course]
             # 计算占用与不可用
-            occupied = {b.teacher1 for b in session.scheduler.placed if b.date == sel_date and b.period == period_idx}
-            occupied.update({b.teacher2 for b in session.scheduler.placed if b.date == sel_date and b.period == period_idx and b.teacher2})
-            teacher_unavail = data.teacher_unavailable
+            occupied = session.scheduler.teachers_at(sel_date, period_idx)
+            free = set(data.free_teachers(cinfo.teachers, sel_date, period_idx))
 
             def is_available(t: str) -> bool:
-                if t in occupied:
-                    return False
-                if t in teacher_unavail and (sel_date, period_idx) in teacher_unavail[t]:
-                    return False
-                return True
+                return t in free and t not in occupied
 
             only_avail = st.checkbox('仅显示可用教师', value=True, key=f'ga_only_avail_{class_id}')
             base_teachers = list(cinfo.teachers)
@@ -546,13 +573,7 @@ def render_global_add_panel(current_class_id: str):
                 else:
                     # 2) 软约束评估（前后对比，仅提示，不阻止）
                     try:
-                        try:
-                            from manual_schedule.manual_soft import evaluate_soft as _eval_soft
-                        except Exception:
-                            from manual_soft import evaluate_soft as _eval_soft  # type: ignore
-                        before_adj, _ = _eval_soft(session.scheduler.placed, data)
-                        after_adj, _ = _eval_soft(session.scheduler.placed + [new_blk], data)
-                        delta = after_adj - before_adj
+                        delta = session.scheduler.soft_scorer.preview_delta(new_blk)
                         if delta > 0:
                             st.warning(f'软约束变化：+{delta}（越大越差）')
                         elif delta < 0:
@@ -703,8 +724,7 @@ def render_time_slot_improved(class_id, date, period, class_df):
     ]
     
     container_key = f"cell_{class_id}_{date}_{period}"
-    class_unavail = data.class_unavailable.get(class_id, set())
-    slot_unavail = (date, period) in class_unavail
+    slot_unavail = not data.class_free(class_id, date, period)
     
     # 检查编辑状态
     if 'editing_cell' not in st.session_state:
@@ -856,23 +876,12 @@ def render_add_form(class_id, date, period, container_key):
         course_info = data.courses[course]
         
         # 获取可用教师
-        occupied = {
-            b.teacher1 for b in session.scheduler.placed 
-            if b.date == date and b.period == period
-        }
-        occupied.update({
-            b.teacher2 for b in session.scheduler.placed 
-            if b.date == date and b.period == period and b.teacher2
-        })
+        occupied = session.scheduler.teachers_at(date, period)
         
-        teacher_unavail = data.teacher_unavailable
+        free = set(data.free_teachers(course_info.teachers, date, period))
         
         def is_available(t):
-            if t in occupied:
-                return False
-            if t in teacher_unavail and (date, period) in teacher_unavail[t]:
-                return False
-            return True
+            return t in free and t not in occupied
         
         available = [t for t in course_info.teachers if is_available(t)]
         
@@ -914,13 +923,7 @@ def render_add_form(class_id, date, period, container_key):
                 else:
                     # 2) 软约束评估变化
                     try:
-                        try:
-                            from manual_schedule.manual_soft import evaluate_soft as _eval_soft
-                        except Exception:
-                            from manual_soft import evaluate_soft as _eval_soft  # type: ignore
-                        before_adj, _ = _eval_soft(session.scheduler.placed, data)
-                        after_adj, _ = _eval_soft(session.scheduler.placed + [new_blk], data)
-                        delta = after_adj - before_adj
+                        delta = session.scheduler.soft_scorer.preview_delta(new_blk)
                         if delta > 0:
                             st.warning(f'软约束变化：+{delta}（越大越差）')
                         elif delta < 0:
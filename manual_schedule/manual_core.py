@@ -6,15 +6,17 @@ import sys, pathlib, re
 
 # 现已优先使用 auto_schedule.data_model.TimetableData；若在 manual_schedule 目录直接运行需补 parent 路径。
 try:
-    from auto_schedule.data_model import TimetableData as _AutoTimetableData  # type: ignore
+    from auto_schedule.data_model import TimetableData as _AutoTimetableData, WorkbookReader as _WorkbookReader, SlotAxis as _SlotAxis  # type: ignore
 except ImportError:  # 尝试将父目录加入 sys.path 再试
     try:
         parent = pathlib.Path(__file__).resolve().parents[1]
         if str(parent) not in sys.path:
             sys.path.insert(0, str(parent))
-        from auto_schedule.data_model import TimetableData as _AutoTimetableData  # type: ignore
+        from auto_schedule.data_model import TimetableData as _AutoTimetableData, WorkbookReader as _WorkbookReader, SlotAxis as _SlotAxis  # type: ignore
     except ImportError:
         _AutoTimetableData = None  # 最终失败，后续走 legacy 路径
+        _WorkbookReader = None
+        _SlotAxis = None
 
 @dataclass
 class CourseInfo:
@@ -42,6 +44,12 @@ class PlacedBlock:
     date: datetime.date
     period: int  # 0 上午 1 下午
 
+class _SheetNames:
+    """legacy 解析中 pick_sheet 只需要 sheet_names 属性。"""
+    def __init__(self, names):
+        self.sheet_names = list(names)
+
+
 class TimetableData:
     """手动排课适配数据模型: 封装 auto_schedule 的 TimetableData.
 
@@ -52,20 +60,24 @@ class TimetableData:
     """
     def __init__(self, excel_file_path='排课数据.xlsx'):
         import os, glob
+        self.load_timings: Dict[str, float] = {}
         # 若传入了绝对路径且存在，直接使用（避免跨会话串改）
         if excel_file_path and os.path.isabs(excel_file_path) and os.path.exists(excel_file_path):
             self._excel_file_path = excel_file_path
+            # 同一工作簿只读取一次：自动数据模型与 legacy 回退共享
+            workbook = _WorkbookReader(excel_file_path) if _WorkbookReader else None
             auto = None
             if _AutoTimetableData:
                 try:
-                    auto = _AutoTimetableData(excel_file_path)
+                    auto = _AutoTimetableData(excel_file_path, workbook=workbook)
                 except Exception:
                     # 若自动数据模型校验失败（例如不可用时间包含未知班级），回退到兼容旧版的解析方式
                     auto = None
             if auto is None:
-                self._legacy_load(excel_file_path)
+                self._legacy_load(excel_file_path, workbook)
                 return
             self._auto = auto
+            self.load_timings = dict(auto.LOAD_TIMINGS)
             # 下方构建 courses/classes 同原逻辑
             self.courses: Dict[str, CourseInfo] = {}
             for name, c in auto.COURSE_DATA.items():
@@ -91,6 +103,7 @@ class TimetableData:
                 )
             self.teacher_unavailable = auto.TEACHER_UNAVAILABLE_SLOTS
             self.class_unavailable = auto.CLASS_UNAVAILABLE_SLOTS
+            self.slot_axis = auto.SLOT_AXIS
             return
         # 否则：优先从 SEAFARER_UPLOAD_DIR、/mount/data/uploaded_data、项目根 uploaded_data 查找最新上传文件
         root_dir = os.path.dirname(os.path.dirname(__file__))
@@ -125,17 +138,19 @@ class TimetableData:
 
         self._excel_file_path = excel_file_path  # Store the determined path internally
 
+        workbook = _WorkbookReader(excel_file_path) if _WorkbookReader else None
         if _AutoTimetableData is None:
             # Legacy 回退：直接解析 Excel（与早期版本逻辑类似）
-            self._legacy_load(excel_file_path)
+            self._legacy_load(excel_file_path, workbook)
             return
         # 优先尝试使用自动数据模型；失败则回退到 legacy 解析，避免应用直接崩溃
         try:
-            auto = _AutoTimetableData(excel_file_path)
+            auto = _AutoTimetableData(excel_file_path, workbook=workbook)
         except Exception:
-            self._legacy_load(excel_file_path)
+            self._legacy_load(excel_file_path, workbook)
             return
         self._auto = auto
+        self.load_timings = dict(auto.LOAD_TIMINGS)
         self.courses: Dict[str, CourseInfo] = {}
         for name, c in auto.COURSE_DATA.items():
             is_two = bool(c.get('is_two_teacher', False))
@@ -161,13 +176,37 @@ class TimetableData:
             )
         self.teacher_unavailable = auto.TEACHER_UNAVAILABLE_SLOTS
         self.class_unavailable = auto.CLASS_UNAVAILABLE_SLOTS
+        self.slot_axis = auto.SLOT_AXIS
 
     @property
     def excel_file_path(self):
         """Provides read-only access to the excel file path."""
         return self._excel_file_path
 
-    def _legacy_load(self, excel_file_path: str):
+    def auto_view(self):
+        """供 auto_schedule.constraint_model 编译的视图 (CLASSES / COURSE_DATA / TEACHER_UNAVAILABLE_SLOTS)。
+        优先返回封装的自动数据模型; legacy 解析时按 courses/classes 构造一次并缓存。"""
+        if getattr(self, '_auto', None) is not None:
+            return self._auto
+        view = getattr(self, '_auto_view', None)
+        if view is None:
+            from types import SimpleNamespace
+            view = SimpleNamespace(
+                CLASSES={cid: {'courses': list(c.courses), 'start_date': c.start_date, 'end_date': c.end_date}
+                         for cid, c in self.classes.items()},
+                COURSE_DATA={name: {'blocks': c.blocks, 'available_teachers': list(c.teachers),
+                                    'is_two_teacher': c.is_two, 'prerequisites': list(c.prerequisites),
+                                    'is_theory': c.is_theory}
+                             for name, c in self.courses.items()},
+                TEACHER_UNAVAILABLE_SLOTS=self.teacher_unavailable,
+            )
+            self._auto_view = view
+        return view
+
+    def _legacy_load(self, excel_file_path: str, workbook=None):
+        """兼容旧版的解析方式; workbook 为已读取的 WorkbookReader 时直接复用, 不再重复打开 Excel。"""
+        import time
+        t_start = time.perf_counter()
         self._auto = None
         self.courses = {}
         self.classes = {}
@@ -213,105 +252,138 @@ class TimetableData:
                 raise ValueError(f"缺少必要列: {missing}")
             return df
 
-        # --- 打开 Excel，一次性选择各表 ---
-        with pd.ExcelFile(excel_file_path) as xls:
-            # 课程数据表
-            course_sheet = pick_sheet(xls, ['课程数据', '课程', '课程信息', '课程表'])
-            dfc = pd.read_excel(xls, sheet_name=course_sheet)
-            dfc = normalize_columns(
-                dfc,
+        # --- 读取 Excel（若自动数据模型已读取过则复用），一次性选择各表 ---
+        if workbook is not None and workbook.same_file(excel_file_path):
+            sheet_names, sheets = workbook.sheet_names, workbook.sheets
+            read_elapsed = workbook.elapsed
+        else:
+            t0 = time.perf_counter()
+            with pd.ExcelFile(excel_file_path) as xls:
+                sheet_names = list(xls.sheet_names)
+                sheets = pd.read_excel(xls, sheet_name=None)
+            read_elapsed = time.perf_counter() - t0
+        xls = _SheetNames(sheet_names)
+        # 课程数据表
+        course_sheet = pick_sheet(xls, ['课程数据', '课程', '课程信息', '课程表'])
+        dfc = sheets[course_sheet].copy()
+        dfc = normalize_columns(
+            dfc,
+            alias_map={
+                '课程名称': ['课程名称', '课程名', '名称', '课程'],
+                'blocks': ['blocks', '课时数', '总块数', '时长'],
+                'available_teachers': ['available_teachers', '教师', '可选教师', '授课教师'],
+                'is_two_teacher': ['is_two_teacher', '双师', '双师课程', '双教师', '是否双师'],
+                'prereq': ['prereq', '先修课', '前置课程', '先决条件'],
+            },
+            required=['课程名称', 'blocks', 'available_teachers']
+        )
+
+        has_prereq = 'prereq' in dfc.columns
+        for _, r in dfc.iterrows():
+            name = r['课程名称']
+            blocks = int(r['blocks'])
+            raw_teachers = str(r['available_teachers'])
+            teachers = [t.strip() for t in re.split(r'[，,、;；/\\ ]+', raw_teachers) if t and t.strip()]
+            raw_two = str(r.get('is_two_teacher', '')).strip().lower()
+            is_two = raw_two in {'y', 'yes', 'true', '双', '2', 'two', '是', 'true'}
+            prereqs = []
+            if has_prereq:
+                prereqs = [p.strip() for p in re.split(r'[，,、;；/\\ ]+', str(r.get('prereq', ''))) if p.strip()]
+            is_practical = is_two
+            is_theory = (not is_two)
+            self.courses[name] = CourseInfo(name, blocks, teachers, is_two, prereqs, is_practical, is_theory)
+
+        # 班级数据表
+        class_sheet = pick_sheet(xls, ['班级数据', '班级', '班级信息', '班级表'])
+        dfcl = sheets[class_sheet].copy()
+        dfcl = normalize_columns(
+            dfcl,
+            alias_map={
+                '班级ID': ['班级ID', '班级', '班级名称', '班级名', 'class_id'],
+                'courses': ['courses', '课程列表', '课程', '课程安排'],
+                'start_date': ['start_date', '开始日期', '开始', '起始日期', 'start'],
+                'end_date': ['end_date', '结束日期', '结束', '截止日期', 'end'],
+            },
+            required=['班级ID', 'courses', 'start_date', 'end_date']
+        )
+        for _, r in dfcl.iterrows():
+            cid = str(r['班级ID']).strip()
+            courses = [c.strip() for c in re.split(r'[，,、;；/\\ ]+', str(r['courses'])) if c.strip()]
+            sd = pd.to_datetime(r['start_date']).date()
+            ed = pd.to_datetime(r['end_date']).date()
+            self.classes[cid] = ClassInfo(cid, courses, sd, ed)
+
+        # 教师不可用
+        try:
+            tea_un_sheet = pick_sheet(xls, ['教师不可用时间', '教师不可用', '教师请假', '教师占用'])
+            dft = sheets[tea_un_sheet].copy()
+            dft = normalize_columns(
+                dft,
                 alias_map={
-                    '课程名称': ['课程名称', '课程名', '名称', '课程'],
-                    'blocks': ['blocks', '课时数', '总块数', '时长'],
-                    'available_teachers': ['available_teachers', '教师', '可选教师', '授课教师'],
-                    'is_two_teacher': ['is_two_teacher', '双师', '双师课程', '双教师', '是否双师'],
-                    'prereq': ['prereq', '先修课', '前置课程', '先决条件'],
+                    '教师姓名': ['教师姓名', '教师', '老师', '教师名', 'teacher'],
+                    '日期': ['日期', 'date', 'day'],
+                    '时间段': ['时间段', '时段', '上午/下午', 'period'],
                 },
-                required=['课程名称', 'blocks', 'available_teachers']
+                required=['教师姓名', '日期', '时间段']
             )
+            time_map = {'上午': 0, '下午': 1, 'am': 0, 'pm': 1}
+            for _, r in dft.iterrows():
+                t = str(r['教师姓名']).strip()
+                date = pd.to_datetime(r['日期']).date()
+                p = time_map.get(str(r['时间段']).strip().lower())
+                if p is None:
+                    continue
+                self.teacher_unavailable.setdefault(t, set()).add((date, p))
+        except Exception:
+            pass
 
-            has_prereq = 'prereq' in dfc.columns
-            for _, r in dfc.iterrows():
-                name = r['课程名称']
-                blocks = int(r['blocks'])
-                raw_teachers = str(r['available_teachers'])
-                teachers = [t.strip() for t in re.split(r'[，,、;；/\\ ]+', raw_teachers) if t and t.strip()]
-                raw_two = str(r.get('is_two_teacher', '')).strip().lower()
-                is_two = raw_two in {'y', 'yes', 'true', '双', '2', 'two', '是', 'true'}
-                prereqs = []
-                if has_prereq:
-                    prereqs = [p.strip() for p in re.split(r'[，,、;；/\\ ]+', str(r.get('prereq', ''))) if p.strip()]
-                is_practical = is_two
-                is_theory = (not is_two)
-                self.courses[name] = CourseInfo(name, blocks, teachers, is_two, prereqs, is_practical, is_theory)
-
-            # 班级数据表
-            class_sheet = pick_sheet(xls, ['班级数据', '班级', '班级信息', '班级表'])
-            dfcl = pd.read_excel(xls, sheet_name=class_sheet)
-            dfcl = normalize_columns(
-                dfcl,
+        # 班级不可用
+        try:
+            cls_un_sheet = pick_sheet(xls, ['班级不可用时间', '班级不可用', '班级占用'])
+            dfu = sheets[cls_un_sheet].copy()
+            dfu = normalize_columns(
+                dfu,
                 alias_map={
                     '班级ID': ['班级ID', '班级', '班级名称', '班级名', 'class_id'],
-                    'courses': ['courses', '课程列表', '课程', '课程安排'],
-                    'start_date': ['start_date', '开始日期', '开始', '起始日期', 'start'],
-                    'end_date': ['end_date', '结束日期', '结束', '截止日期', 'end'],
+                    '日期': ['日期', 'date', 'day'],
+                    '时间段': ['时间段', '时段', '上午/下午', 'period'],
                 },
-                required=['班级ID', 'courses', 'start_date', 'end_date']
+                required=['班级ID', '日期', '时间段']
             )
-            for _, r in dfcl.iterrows():
+            time_map = {'上午': 0, '下午': 1, 'am': 0, 'pm': 1}
+            for _, r in dfu.iterrows():
                 cid = str(r['班级ID']).strip()
-                courses = [c.strip() for c in re.split(r'[，,、;；/\\ ]+', str(r['courses'])) if c.strip()]
-                sd = pd.to_datetime(r['start_date']).date()
-                ed = pd.to_datetime(r['end_date']).date()
-                self.classes[cid] = ClassInfo(cid, courses, sd, ed)
+                date = pd.to_datetime(r['日期']).date()
+                p = time_map.get(str(r['时间段']).strip().lower())
+                if p is None:
+                    continue
+                self.class_unavailable.setdefault(cid, set()).add((date, p))
+        except Exception:
+            pass
+        self.slot_axis = _SlotAxis(
+            {cid: (c.start_date, c.end_date) for cid, c in self.classes.items()},
+            self.teacher_unavailable, self.class_unavailable) if _SlotAxis else None
+        self.load_timings = {'read_workbook': read_elapsed, 'total': time.perf_counter() - t_start}
 
-            # 教师不可用
-            try:
-                tea_un_sheet = pick_sheet(xls, ['教师不可用时间', '教师不可用', '教师请假', '教师占用'])
-                dft = pd.read_excel(xls, sheet_name=tea_un_sheet)
-                dft = normalize_columns(
-                    dft,
-                    alias_map={
-                        '教师姓名': ['教师姓名', '教师', '老师', '教师名', 'teacher'],
-                        '日期': ['日期', 'date', 'day'],
-                        '时间段': ['时间段', '时段', '上午/下午', 'period'],
-                    },
-                    required=['教师姓名', '日期', '时间段']
-                )
-                time_map = {'上午': 0, '下午': 1, 'am': 0, 'pm': 1}
-                for _, r in dft.iterrows():
-                    t = str(r['教师姓名']).strip()
-                    date = pd.to_datetime(r['日期']).date()
-                    p = time_map.get(str(r['时间段']).strip().lower())
-                    if p is None:
-                        continue
-                    self.teacher_unavailable.setdefault(t, set()).add((date, p))
-            except Exception:
-                pass
+    # --- 可用性查询 (优先走全局时段轴位图) ---
+    def teacher_free(self, teacher, date: datetime.date, period: int) -> bool:
+        axis = self.slot_axis
+        if axis is not None:
+            return axis.teacher_free(teacher, axis.slot(date, period))
+        return not (teacher in self.teacher_unavailable and (date, period) in self.teacher_unavailable[teacher])
 
-            # 班级不可用
-            try:
-                cls_un_sheet = pick_sheet(xls, ['班级不可用时间', '班级不可用', '班级占用'])
-                dfu = pd.read_excel(xls, sheet_name=cls_un_sheet)
-                dfu = normalize_columns(
-                    dfu,
-                    alias_map={
-                        '班级ID': ['班级ID', '班级', '班级名称', '班级名', 'class_id'],
-                        '日期': ['日期', 'date', 'day'],
-                        '时间段': ['时间段', '时段', '上午/下午', 'period'],
-                    },
-                    required=['班级ID', '日期', '时间段']
-                )
-                time_map = {'上午': 0, '下午': 1, 'am': 0, 'pm': 1}
-                for _, r in dfu.iterrows():
-                    cid = str(r['班级ID']).strip()
-                    date = pd.to_datetime(r['日期']).date()
-                    p = time_map.get(str(r['时间段']).strip().lower())
-                    if p is None:
-                        continue
-                    self.class_unavailable.setdefault(cid, set()).add((date, p))
-            except Exception:
-                pass
+    def class_free(self, class_id, date: datetime.date, period: int) -> bool:
+        axis = self.slot_axis
+        if axis is not None:
+            return axis.class_free(class_id, axis.slot(date, period))
+        return not (class_id in self.class_unavailable and (date, period) in self.class_unavailable[class_id])
+
+    def free_teachers(self, candidates, date: datetime.date, period: int) -> list:
+        """candidates 中该时段未被标记不可用的教师 (保持原顺序)。"""
+        axis = self.slot_axis
+        if axis is not None:
+            return axis.free_teachers(axis.slot(date, period), candidates)
+        return [t for t in candidates if self.teacher_free(t, date, period)]
 
     def iter_class_slots(self, class_id: str):
         info = self.classes[class_id]
@@ -319,7 +391,7 @@ class TimetableData:
         for d in range(days):
             date = info.start_date + datetime.timedelta(days=d)
             for p in (0, 1):
-                if class_id in self.class_unavailable and (date, p) in self.class_unavailable[class_id]:
+                if not self.class_free(class_id, date, p):
                     continue
                 yield date, p
 
@@ -328,6 +400,80 @@ class ManualScheduler:
         self.data = data
         self.placed: List[PlacedBlock] = []
         self.history: List[Tuple[str, PlacedBlock]] = []  # ('add'/'del', block)
+        # 索引 (与 placed 同步, 列表内保持 placed 中的相对顺序):
+        #   _slot_blocks: (date, period) -> 该时段的块
+        #   _course_blocks: (class_id, course) -> 该班该课程的块
+        self._slot_blocks: Dict[Tuple[datetime.date, int], List[PlacedBlock]] = {}
+        self._course_blocks: Dict[Tuple[str, str], List[PlacedBlock]] = {}
+        self._soft = None  # IncrementalSoftScorer, 首次访问 soft_scorer 时构建
+
+    @property
+    def soft_scorer(self):
+        """增量软约束评分器 (与 placed 同步), report() 输出同 evaluate_soft。"""
+        if self._soft is None:
+            try:
+                from .manual_soft import IncrementalSoftScorer
+            except ImportError:
+                from manual_soft import IncrementalSoftScorer  # type: ignore
+            self._soft = IncrementalSoftScorer(self.data, self.placed)
+        return self._soft
+
+    # --- 索引维护 ---
+    def _index_add(self, blk: PlacedBlock):
+        self._slot_blocks.setdefault((blk.date, blk.period), []).append(blk)
+        self._course_blocks.setdefault((blk.class_id, blk.course), []).append(blk)
+        if self._soft is not None:
+            self._soft.add(blk)
+
+    def _index_remove(self, blk: PlacedBlock):
+        for index, key in ((self._slot_blocks, (blk.date, blk.period)),
+                           (self._course_blocks, (blk.class_id, blk.course))):
+            lst = index.get(key)
+            if not lst:
+                continue
+            for i, b in enumerate(lst):
+                if b is blk:
+                    lst.pop(i)
+                    break
+            if not lst:
+                del index[key]
+        if self._soft is not None:
+            self._soft.remove(blk)
+
+    def rebuild_index(self):
+        """按 placed 全量重建索引 (外部直接改动 placed 后调用)。"""
+        self._slot_blocks = {}
+        self._course_blocks = {}
+        self._soft = None
+        for b in self.placed:
+            self._index_add(b)
+
+    def clear(self):
+        """清空已排块 (不清历史, 与原先直接 placed.clear() 的行为一致)。"""
+        self.placed.clear()
+        self._slot_blocks = {}
+        self._course_blocks = {}
+        self._soft = None
+
+    def append_block(self, block: PlacedBlock):
+        """直接追加, 不做硬校验、不记历史 (用于导入可信来源的结果)。"""
+        self.placed.append(block)
+        self._index_add(block)
+
+    def blocks_at(self, date: datetime.date, period: int) -> List[PlacedBlock]:
+        return self._slot_blocks.get((date, period), [])
+
+    def course_blocks(self, class_id: str, course: str) -> List[PlacedBlock]:
+        return self._course_blocks.get((class_id, course), [])
+
+    def teachers_at(self, date: datetime.date, period: int) -> set:
+        """该时段已被占用的教师集合。"""
+        occupied = set()
+        for b in self.blocks_at(date, period):
+            occupied.add(b.teacher1)
+            if b.teacher2:
+                occupied.add(b.teacher2)
+        return occupied
 
     # --- 硬性校验 ---
     def check_hard_violation(self, block: PlacedBlock) -> List[str]:
@@ -358,27 +504,25 @@ class ManualScheduler:
         cls = self.data.classes[block.class_id]
         if not (cls.start_date <= block.date <= cls.end_date):
             errs.append('日期超出班级范围')
-        if block.class_id in self.data.class_unavailable and (block.date, block.period) in self.data.class_unavailable[block.class_id]:
+        if not self.data.class_free(block.class_id, block.date, block.period):
             errs.append('班级该时段不可用')
-        if block.teacher1 in self.data.teacher_unavailable and (block.date, block.period) in self.data.teacher_unavailable[block.teacher1]:
+        if not self.data.teacher_free(block.teacher1, block.date, block.period):
             errs.append('教师1该时段不可用')
-        if block.teacher2 and block.teacher2 in self.data.teacher_unavailable and (block.date, block.period) in self.data.teacher_unavailable[block.teacher2]:
+        if block.teacher2 and not self.data.teacher_free(block.teacher2, block.date, block.period):
             errs.append('教师2该时段不可用')
         # 冲突：同时间教师 / 班级
-        for b in self.placed:
-            if b.date == block.date and b.period == block.period:
-                if b.class_id == block.class_id:
-                    errs.append('班级时间冲突')
-                if b.teacher1 == block.teacher1 or (block.teacher2 and (b.teacher1 == block.teacher2)) or \
-                   (b.teacher2 and (b.teacher2 == block.teacher1 or (block.teacher2 and b.teacher2 == block.teacher2))):
-                    errs.append('教师时间冲突')
+        for b in self.blocks_at(block.date, block.period):
+            if b.class_id == block.class_id:
+                errs.append('班级时间冲突')
+            if b.teacher1 == block.teacher1 or (block.teacher2 and (b.teacher1 == block.teacher2)) or \
+               (b.teacher2 and (b.teacher2 == block.teacher1 or (block.teacher2 and b.teacher2 == block.teacher2))):
+                errs.append('教师时间冲突')
         # 已排块数超限
-        existing = sum(1 for b in self.placed if b.class_id==block.class_id and b.course==block.course)
-        if existing >= cinfo.blocks:
+        prev = self.course_blocks(block.class_id, block.course)
+        if len(prev) >= cinfo.blocks:
             errs.append('课程块数已达上限')
         # 理论课教师一致性
         if cinfo.is_theory:
-            prev = [b for b in self.placed if b.class_id==block.class_id and b.course==block.course]
             if prev:
                 base_t = prev[0].teacher1
                 if block.teacher1 != base_t:
@@ -390,6 +534,7 @@ class ManualScheduler:
         if errs:
             return False, errs
         self.placed.append(block)
+        self._index_add(block)
         self.history.append(('add', block))
         return True, []
 
@@ -402,16 +547,19 @@ class ManualScheduler:
             for i in range(len(self.placed)-1, -1, -1):
                 if self.placed[i] is blk:
                     self.placed.pop(i)
+                    self._index_remove(blk)
                     break
         elif act == 'del':
             # 撤销删除 -> 重新加入
             self.placed.append(blk)
+            self._index_add(blk)
         return True
 
     def delete_block(self, block_index: int) -> bool:
         """按 index 删除 placed 中的块, 并记录以便撤销。"""
         if 0 <= block_index < len(self.placed):
             blk = self.placed.pop(block_index)
+            self._index_remove(blk)
             self.history.append(('del', blk))
             return True
         return False
@@ -421,14 +569,11 @@ class ManualScheduler:
         # 计数逻辑：
         # 单师课程: 每个已放置块计 1。
         # 双师课程: 仅在该块拥有两个不同教师时才计 1 (缺第二教师视为未完成临时块)。
-        used = 0
-        for b in self.placed:
-            if b.class_id == class_id and b.course == course:
-                if cinfo.is_two:
-                    if b.teacher1 and b.teacher2 and b.teacher1 != b.teacher2:
-                        used += 1
-                else:
-                    used += 1
+        blocks = self.course_blocks(class_id, course)
+        if cinfo.is_two:
+            used = sum(1 for b in blocks if b.teacher1 and b.teacher2 and b.teacher1 != b.teacher2)
+        else:
+            used = len(blocks)
         return cinfo.blocks - used
 
     def export_rows(self):
@@ -462,16 +607,17 @@ class ManualScheduler:
         if teacher2 not in cinfo.teachers:
             return False, '教师不在可选列表'
         # 冲突与不可用校验
-        if teacher2 in self.data.teacher_unavailable and (blk.date, blk.period) in self.data.teacher_unavailable[teacher2]:
+        if not self.data.teacher_free(teacher2, blk.date, blk.period):
             return False, '教师该时段不可用'
-        for i, other in enumerate(self.placed):
-            if i == block_index:
+        for other in self.blocks_at(blk.date, blk.period):
+            if other is blk:
                 continue
-            if other.date == blk.date and other.period == blk.period:
-                if other.teacher1 == teacher2 or (other.teacher2 and other.teacher2 == teacher2):
-                    return False, '教师该时段已被占用'
+            if other.teacher1 == teacher2 or (other.teacher2 and other.teacher2 == teacher2):
+                return False, '教师该时段已被占用'
         # 通过
         old_teacher2 = blk.teacher2
         blk.teacher2 = teacher2
+        if self._soft is not None:
+            self._soft.teacher2_changed(blk, old_teacher2)
         self.history.append(('add', blk))  # 记录一条操作, 仍用 'add' 方便撤销 (撤销时移除最后变更)
         return True, '补齐成功'
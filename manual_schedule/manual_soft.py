@@ -1,12 +1,17 @@
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 from collections import defaultdict
 
+import numpy as np
+
 try:
     from .manual_core import PlacedBlock, TimetableData  # 包模式
 except ImportError:  # 脚本模式
     from manual_core import PlacedBlock, TimetableData  # type: ignore
+# manual_core 导入时已确保仓库根目录在 sys.path 中
+from auto_schedule.constraint_model import compiled_model, encode_blocks, soft_score
+from auto_schedule.vectorized import balance_penalty, consecutive_np, soft_adjust_np
 
-"""手动排课软约束评估，需与自动 GA 版本软约束字段名称保持一致。
+"""手动排课软约束评估，与自动 GA 共用 auto_schedule.constraint_model (同一实现、同一权重 CONFIG)。
 
 输出 details 中包含:
     consecutive_reward (负值奖励)
@@ -16,112 +21,137 @@ except ImportError:  # 脚本模式
     teacher_switch_penalty
     theory_teacher_inconsistent_penalty
     teacher_balance_penalty
+
+IncrementalSoftScorer: 增量版本, 挂在 ManualScheduler.soft_scorer 上, 输出与 evaluate_soft 相同。
 """
 
-CONFIG_SOFT = {
-        'CONSECUTIVE_REWARD': 2,
-        'SOFT_PREREQ_PENALTY': 2000,
-        'THEORY_EARLY_REWARD': 5,
-        'NON_THEORY_LATE_THRESHOLD': 0.75,
-        'TEACHER_SWITCH_PENALTY': 20,
-        'THEORY_TEACHER_CHANGE_HARD': 2000,
-        'TEACHER_BALANCE_WEIGHT': 5,
-}
+
+def _as_rows(blocks: List[PlacedBlock]):
+    return [(b.class_id, b.course, b.teacher1, b.teacher2, b.date, b.period) for b in blocks]
+
 
 def evaluate_soft(blocks: List[PlacedBlock], data: TimetableData) -> Tuple[int, Dict[str,int]]:
-    if not blocks:
-        return 0, {
-            'consecutive_reward':0,
-            'theory_early_reward':0,
-            'non_theory_early_penalty':0,
-            'prereq_violation_penalty':0,
-            'teacher_switch_penalty':0,
-            'theory_teacher_inconsistent_penalty':0,
-            'teacher_balance_penalty':0,
-        }
-    seq = sorted(blocks, key=lambda b: (b.date, b.period))
-    details = {
-        'consecutive_reward':0,
-        'theory_early_reward':0,
-        'non_theory_early_penalty':0,
-        'prereq_violation_penalty':0,
-        'teacher_switch_penalty':0,
-        'theory_teacher_inconsistent_penalty':0,
-        'teacher_balance_penalty':0,
-    }
-    adjust = 0
-    # 连排奖励
-    for i in range(len(seq)-1):
-        a,b = seq[i], seq[i+1]
-        if a.class_id==b.class_id and a.course==b.course and a.date==b.date and a.period==0 and b.period==1:
-            adjust -= CONFIG_SOFT['CONSECUTIVE_REWARD']
-            details['consecutive_reward'] -= CONFIG_SOFT['CONSECUTIVE_REWARD']
-    # 按班级
-    per_class = defaultdict(list)
-    for b in seq:
-        per_class[b.class_id].append(b)
-    prereq_pen = CONFIG_SOFT['SOFT_PREREQ_PENALTY']
-    theory_reward = CONFIG_SOFT['THEORY_EARLY_REWARD']
-    non_theory_late_thr = CONFIG_SOFT['NON_THEORY_LATE_THRESHOLD']
-    switch_pen = CONFIG_SOFT['TEACHER_SWITCH_PENALTY']
-    theory_change_pen = CONFIG_SOFT['THEORY_TEACHER_CHANGE_HARD']
-    for cid, lst in per_class.items():
-        lst.sort(key=lambda b:(b.date,b.period))
-        total = len(lst)
-        if total == 0:
-            continue
-        last_idx = {}
-        for i,b in enumerate(lst):
-            last_idx.setdefault(b.course, []).append(i)
-        last_idx = {c:max(v) for c,v in last_idx.items()}
-        # 遍历块
-        for i,b in enumerate(lst):
-            cinfo = data.courses[b.course]
-            prereqs = cinfo.prerequisites
-            is_theory = getattr(cinfo, 'is_theory', False)
-            if prereqs:
-                for p in prereqs:
-                    if p in last_idx and i <= last_idx[p]:
-                        adjust += prereq_pen
-                        details['prereq_violation_penalty'] += prereq_pen
-                        break
-            if is_theory:
-                reward = max(0, theory_reward * (total - i) / total)
-                if reward>0:
-                    r = int(reward)
-                    adjust -= r
-                    details['theory_early_reward'] -= r
+    return soft_score(_as_rows(blocks), data.auto_view())
+
+
+SOFT_KEYS = (
+    'consecutive_reward',
+    'theory_early_reward',
+    'non_theory_early_penalty',
+    'prereq_violation_penalty',
+    'teacher_switch_penalty',
+    'theory_teacher_inconsistent_penalty',
+    'teacher_balance_penalty',
+)
+
+
+class IncrementalSoftScorer:
+    """evaluate_soft 的增量版本, 由 ManualScheduler 在每次增删块时通知。
+
+    - 班级时间线相关项 (理论前置/非理论后置/先修/教师切换) 按班缓存, 仅对变动的班级调用向量化内核
+    - 连排奖励按日期缓存, 仅对变动的日期调用 consecutive_np
+    - 教师负载为计数字典, 均衡罚分由 balance_penalty 计算
+    各列表保持块的加入顺序 (与 placed 一致), 结果与 evaluate_soft(placed) 完全相同。
+    """
+
+    def __init__(self, data: TimetableData, blocks: List[PlacedBlock] = ()):
+        self.data = data
+        self.prob = compiled_model(data.auto_view())
+        self._per_class: Dict[str, List[PlacedBlock]] = {}
+        self._class_details: Dict[str, Dict[str, int]] = {}
+        self._dirty_classes: set = set()
+        self._slots: Dict[tuple, List[PlacedBlock]] = {}
+        self._day_reward: Dict = {}
+        self._dirty_dates: set = set()
+        self._load: Dict[str, int] = defaultdict(int)
+        for b in blocks:
+            self.add(b)
+
+    # --- 变更通知 ---
+    def add(self, blk: PlacedBlock):
+        self._per_class.setdefault(blk.class_id, []).append(blk)
+        self._dirty_classes.add(blk.class_id)
+        self._slots.setdefault((blk.date, blk.period), []).append(blk)
+        self._dirty_dates.add(blk.date)
+        self._load_inc(blk.teacher1, 1)
+        if blk.teacher2:
+            self._load_inc(blk.teacher2, 1)
+
+    def remove(self, blk: PlacedBlock):
+        for index, key in ((self._per_class, blk.class_id), (self._slots, (blk.date, blk.period))):
+            lst = index.get(key, [])
+            for i, b in enumerate(lst):
+                if b is blk:
+                    lst.pop(i)
+                    break
+            if not lst:
+                index.pop(key, None)
+        self._dirty_classes.add(blk.class_id)
+        self._dirty_dates.add(blk.date)
+        self._load_inc(blk.teacher1, -1)
+        if blk.teacher2:
+            self._load_inc(blk.teacher2, -1)
+
+    def teacher2_changed(self, blk: PlacedBlock, old_teacher2: Optional[str]):
+        """blk.teacher2 已被原地修改 (补第二教师); 时间线只看 teacher1, 仅需更新负载。"""
+        if old_teacher2:
+            self._load_inc(old_teacher2, -1)
+        if blk.teacher2:
+            self._load_inc(blk.teacher2, 1)
+
+    def _load_inc(self, teacher, n: int):
+        if not teacher:
+            return
+        self._load[teacher] += n
+        if self._load[teacher] <= 0:
+            del self._load[teacher]
+
+    # --- 计算 ---
+    def _consecutive(self, date) -> int:
+        am = self._slots.get((date, 0))
+        pm = self._slots.get((date, 1))
+        if not am or not pm:
+            return 0
+        arr = encode_blocks(_as_rows(am + pm), self.prob)
+        return sum(consecutive_np(arr[:, 4], arr[:, 0], arr[:, 1], np.arange(len(arr))).values())
+
+    def _class_soft(self, lst: List[PlacedBlock]) -> Dict[str, int]:
+        _, det = soft_adjust_np(encode_blocks(_as_rows(lst), self.prob), self.prob)
+        return {k: det[k] for k in SOFT_KEYS[1:6]}
+
+    def _flush(self):
+        for cid in self._dirty_classes:
+            lst = self._per_class.get(cid)
+            if lst:
+                self._class_details[cid] = self._class_soft(lst)
+            else:
+                self._class_details.pop(cid, None)
+        self._dirty_classes.clear()
+        for d in self._dirty_dates:
+            r = self._consecutive(d)
+            if r:
+                self._day_reward[d] = r
             else:
-                ideal_start = int(total * non_theory_late_thr)
-                if i < ideal_start:
-                    pen = (ideal_start - i)
-                    adjust += pen
-                    details['non_theory_early_penalty'] += pen
-        # 教师切换统计
-        by_course = defaultdict(list)
-        for b in lst:
-            by_course[b.course].append(b.teacher1)
-        for course, t_seq in by_course.items():
-            cinfo = data.courses[course]
-            is_theory = getattr(cinfo, 'is_theory', False)
-            switches = sum(1 for i in range(1,len(t_seq)) if t_seq[i]!=t_seq[i-1])
-            if switches>0:
-                if is_theory:
-                    adjust += theory_change_pen
-                    details['theory_teacher_inconsistent_penalty'] += theory_change_pen
-                else:
-                    pen = switches * switch_pen
-                    adjust += pen
-                    details['teacher_switch_penalty'] += pen
-    # 教师负载均衡
-    load = defaultdict(int)
-    for b in seq:
-        load[b.teacher1]+=1
-        if b.teacher2:
-            load[b.teacher2]+=1
-    if load:
-        spread = max(load.values()) - min(load.values())
-        pen = spread * CONFIG_SOFT['TEACHER_BALANCE_WEIGHT']
-        adjust += pen
-        details['teacher_balance_penalty'] = pen
-    return adjust, details
+                self._day_reward.pop(d, None)
+        self._dirty_dates.clear()
+
+    def report(self) -> Tuple[int, Dict[str, int]]:
+        """与 evaluate_soft 相同的 (adjust, details)。"""
+        self._flush()
+        details = dict.fromkeys(SOFT_KEYS, 0)
+        details['consecutive_reward'] = sum(self._day_reward.values())
+        for det in self._class_details.values():
+            for k, v in det.items():
+                details[k] += v
+        details['teacher_balance_penalty'] = balance_penalty(self._load.values())
+        return sum(details.values()), details
+
+    def preview_delta(self, blk: PlacedBlock) -> int:
+        """假设加入 blk 后软约束总分的变化 (不改变状态)。"""
+        before, _ = self.report()
+        self.add(blk)
+        try:
+            after, _ = self.report()
+        finally:
+            self.remove(blk)
+        return after - before
@@ -26,7 +26,7 @@ class ManualSession:
         return self.scheduler.delete_block(idx)
 
     def soft_report(self):
-        adjust, details = evaluate_soft(self.scheduler.placed, self.data)
+        adjust, details = self.scheduler.soft_scorer.report()
         return adjust, details
 
     def export_excel(self, path: str, class_id: str|None=None):
@@ -253,7 +253,7 @@ class ManualSession:
                 return 1  # 其余视为下午
             df['节次'] = df['时段'].apply(_map_period)
         # 清空
-        self.scheduler.placed.clear()
+        self.scheduler.clear()
         for _, row in df.iterrows():
             blk = PlacedBlock(
                 str(row['班级ID']),
@@ -264,5 +264,5 @@ class ManualSession:
                 int(row['节次'])
             )
             # 直接追加, 不重复硬校验(假设自动排课已处理) — 若需严格可改用 add_block
-            self.scheduler.placed.append(blk)
+            self.scheduler.append_block(blk)
         return len(self.scheduler.placed)